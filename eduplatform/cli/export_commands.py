@@ -5,7 +5,6 @@ import os
 from typing import Optional
 
 from ..services.export_service import ExportService
-from ..utils.export_utils import ExportUtils
 
 class ExportCommands:
     """CLI commands for data export functionality."""
@@ -20,7 +19,7 @@ class ExportCommands:
         Usage: export_my_data [format=xlsx] [output_dir=exports]
         
         Args:
-            format: Export format (xlsx, csv, sqlite)
+            format: Export format (xlsx, csv, sqlite, feather, parquet)
             output_dir: Directory to save exported files
         """
         if not hasattr(self, 'current_user') or not self.current_user:
@@ -59,7 +58,7 @@ class ExportCommands:
         
         Args:
             class_id: ID of the class to export
-            format: Export format (xlsx, csv, sqlite)
+            format: Export format (xlsx, csv, sqlite, feather, parquet)
             output_dir: Directory to save exported files
         """
         if not hasattr(self, 'current_user') or not self.current_user:
@@ -110,7 +109,7 @@ class ExportCommands:
         Usage: export_school [format=xlsx] [output_dir=exports]
         
         Args:
-            format: Export format (xlsx, csv, sqlite)
+            format: Export format (xlsx, csv, sqlite, feather, parquet)
             output_dir: Directory to save exported files
         """
         if not hasattr(self, 'current_user') or not self.current_user:
@@ -156,7 +155,7 @@ class ExportCommands:
         """Show help for the export_my_data command."""
         print("\nExport all your personal data.")
         print("Usage: export_my_data [format=xlsx] [output_dir=exports]")
-        print("  format:     Output format (xlsx, csv, or sqlite)")
+        print("  format:     Output format (xlsx, csv, sqlite, feather or parquet)")
         print("  output_dir: Directory to save exported files (default: 'exports')")
         print("\nExample: export_my_data format=csv output_dir=my_data")
     
@@ -165,7 +164,7 @@ class ExportCommands:
         print("\nExport data for a specific class (Teacher/Admin only).")
         print("Usage: export_class <class_id> [format=xlsx] [output_dir=exports]")
         print("  class_id:   ID of the class to export")
-        print("  format:     Output format (xlsx, csv, or sqlite)")
+        print("  format:     Output format (xlsx, csv, sqlite, feather or parquet)")
         print("  output_dir: Directory to save exported files (default: 'exports')")
         print("\nExample: export_class class_123 format=xlsx")
     
@@ -173,7 +172,7 @@ class ExportCommands:
         """Show help for the export_school command."""
         print("\nExport all school data (Admin only).")
         print("Usage: export_school [format=xlsx] [output_dir=exports]")
-        print("  format:     Output format (xlsx, csv, or sqlite)")
+        print("  format:     Output format (xlsx, csv, sqlite, feather or parquet)")
         print("  output_dir: Directory to save exported files (default: 'exports')")
         print("\nExample: export_school format=sqlite output_dir=school_data")
     
@@ -208,20 +208,11 @@ class EduPlatformCLI(cmd.Cmd):
                 print("Error: Registration failed - No result returned")
                 return
                 
-            if not isinstance(result, dict):
-                print(f"Error: Expected dict result, got {type(result).__name__}")
-                return
-                
-            if 'user' not in result:
-                print("Error: Registration failed - No user in result")
-                print(f"Result keys: {result.keys() if hasattr(result, 'keys') else 'Not a dictionary'}")
-                return
-                
             print("[CLI] Registration successful, processing result...")
             
-            self.current_user = result['user']
-            self.current_user_type = result.get('user_type', 'user')
-            self.auth_token = result.get('token')
+            self.current_user = result.user
+            self.current_user_type = result.user_type
+            self.auth_token = result.token
             
             print(f"\n[CLI] Successfully registered and logged in as {self.current_user._full_name} ({self.current_user_type})")
             print(f"Welcome to EduPlatform!")
@@ -254,9 +245,9 @@ class EduPlatformCLI(cmd.Cmd):
             print("Error: Invalid email or password")
             return
             
-        self.current_user = result['user']
-        self.current_user_type = result['user_type']
-        self.auth_token = result['token']
+        self.current_user = result.user
+        self.current_user_type = result.user_type
+        self.auth_token = result.token
         
         print(f"\nSuccessfully logged in as {self.current_user._full_name} ({self.current_user_type})")
         self._show_unread_notifications()
@@ -372,11 +363,11 @@ class EduPlatformCLI(cmd.Cmd):
                 
             print("\n=== Your Assignments ===")
             for i, a in enumerate(assignments, 1):
-                print(f"\n{i}. {a['title']} ({a['subject']})")
-                print(f"   Due: {a['due_date']} | Status: {a['status'].upper()}")
-                print(f"   Max Points: {a['max_points']} | Difficulty: {a['difficulty'].title()}")
-                if a['status'] == 'graded' and a['submission'] and 'grade' in a['submission']:
-                    print(f"   Grade: {a['submission']['grade']}/{a['max_points']}")
+                print(f"\n{i}. {a.title} ({a.subject})")
+                print(f"   Due: {a.due_date} | Status: {a.status.upper()}")
+                print(f"   Max Points: {a.max_points} | Difficulty: {a.difficulty.title()}")
+                if a.status == 'graded' and a.submission and 'grade' in a.submission:
+                    print(f"   Grade: {a.submission['grade']}/{a.max_points}")
         
         elif self.current_user_type == 'teacher':
             assignments = self.assignment_service.get_teacher_assignments(
@@ -391,10 +382,10 @@ class EduPlatformCLI(cmd.Cmd):
                 
             print("\n=== Your Assignments ===")
             for i, a in enumerate(assignments, 1):
-                print(f"\n{i}. {a['title']} ({a['subject']})")
-                print(f"   Class: {a['class_id']} | Due: {a['due_date']}")
-                print(f"   Submissions: {a['total_submissions']} | Graded: {a['graded_submissions']}")
-                print(f"   Status: {a['status'].upper()}")
+                print(f"\n{i}. {a.title} ({a.subject})")
+                print(f"   Class: {a.class_id} | Due: {a.due_date}")
+                print(f"   Submissions: {a.total_submissions} | Graded: {a.graded_submissions}")
+                print(f"   Status: {a.status.upper()}")
     
     def do_submit_assignment(self, arg):
         """Submit an assignment (Student only).
@@ -653,6 +644,10 @@ class EduPlatformCLI(cmd.Cmd):
     
     def do_exit(self, arg):
         """Exit the application."""
+        # Finish queued notifications and running exports before the process exits
+        self.assignment_service.close()
+        self.grade_service.close()
+        self.export_service.close()
         print("\nThank you for using EduPlatform. Goodbye!")
         return True
     
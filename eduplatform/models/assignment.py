@@ -1,6 +1,8 @@
+import copy
 from typing import Dict, List, Optional, Any
 from datetime import datetime, timedelta
 from enum import Enum
+from uuid import uuid4
 
 class AssignmentStatus(Enum):
     DRAFT = "draft"
@@ -19,6 +21,12 @@ class AssignmentDifficulty(Enum):
 class Assignment:
     """Class representing an assignment in the educational platform."""
     
+    __slots__ = ('_id', '_title', '_description', '_subject', '_teacher_id', '_class_id',
+                 '_created_at', '_due_date', '_max_points', '_difficulty', '_status',
+                 '_submissions', '_grades', '_attachments', '_version',
+                 '_graded_submissions', '_due_date_ts', '_due_date_iso', '_created_at_iso',
+                 '_difficulty_value', '_grade_total')
+    
     def __init__(self, 
                  title: str, 
                  description: str, 
@@ -40,7 +48,7 @@ class Assignment:
             max_points: Maximum points possible
             difficulty: Assignment difficulty level
         """
-        self._id = f"assgn_{len(str(hash(str(datetime.now()))))[-6:]}"
+        self._id = f"assgn_{uuid4().hex[:12]}"
         self._title = title
         self._description = description
         self._subject = subject
@@ -48,12 +56,20 @@ class Assignment:
         self._class_id = class_id
         self._created_at = datetime.now()
         self._due_date = due_date if due_date else (datetime.now() + timedelta(days=7))
-        self._max_points = max(float(max_points))
+        self._due_date_ts = self._due_date.timestamp()  # POSIX time for fast comparisons
+        # Both dates are fixed after creation, so their ISO forms are cached
+        self._due_date_iso = self._due_date.isoformat()
+        self._created_at_iso = self._created_at.isoformat()
+        self._max_points = float(max_points)
         self._difficulty = difficulty
+        self._difficulty_value = difficulty.value  # Plain str for row building
         self._status = AssignmentStatus.DRAFT.value
         self._submissions: Dict[str, Dict] = {}  # {student_id: submission_data}
         self._grades: Dict[str, Dict] = {}  # {student_id: grade_data}
         self._attachments: List[Dict] = []  # List of file attachments
+        self._version = 0  # Bumped by the repository on every update
+        self._graded_submissions = 0  # Submissions whose status is 'graded'
+        self._grade_total = 0.0  # Sum of the grades of graded submissions
     
     @property
     def id(self) -> str:
@@ -74,15 +90,16 @@ class Assignment:
     def _update_status(self) -> None:
         """Update the status based on current conditions."""
         now = datetime.now()
+        ungraded = len(self._submissions) - self._graded_submissions
         
         # If due date has passed and not all submissions are graded
-        if now > self._due_date and any(sub.get('status') != 'graded' for sub in self._submissions.values()):
+        if now > self._due_date and ungraded:
             self._status = AssignmentStatus.OVERDUE.value
         # If any submissions exist but not all are graded
-        elif self._submissions and any(sub.get('status') != 'graded' for sub in self._submissions.values()):
+        elif ungraded:
             self._status = AssignmentStatus.SUBMITTED.value
         # If all submissions are graded
-        elif self._submissions and all(sub.get('status') == 'graded' for sub in self._submissions.values()):
+        elif self._submissions:
             self._status = AssignmentStatus.GRADED.value
         # If published but no submissions yet
         elif self._status == AssignmentStatus.PUBLISHED.value:
@@ -95,26 +112,38 @@ class Assignment:
             return True
         return False
     
-    def add_submission(self, student_id: str, content: str, attachments: Optional[List[Dict]] = None) -> bool:
+    def add_submission(self,
+                       student_id: str,
+                       content: str,
+                       attachments: Optional[List[Dict]] = None,
+                       submit_time: Optional[datetime] = None,
+                       is_late: bool = False) -> Optional[str]:
         """Add a student's submission for this assignment.
         
         Args:
             student_id: ID of the student submitting
             content: Text content of the submission
             attachments: Optional list of file attachments
+            submit_time: Optional submission time (defaults to now)
+            is_late: Whether the submission came in after the due date
             
         Returns:
-            bool: True if submission was added, False if already exists or assignment not published
+            The new submission's ID, or None if the student already submitted
+            or the assignment is not published
         """
         if self._status == AssignmentStatus.DRAFT.value:
-            return False
+            return None
             
         if student_id in self._submissions:
-            return False
+            return None
             
+        submission_id = f"sub_{uuid4().hex[:12]}"
         self._submissions[student_id] = {
+            'id': submission_id,
+            'student_id': student_id,
             'content': content,
-            'submitted_at': datetime.now(),
+            'submitted_at': submit_time or datetime.now(),
+            'is_late': is_late,
             'attachments': attachments or [],
             'status': 'submitted',
             'grade': None,
@@ -122,7 +151,7 @@ class Assignment:
         }
         
         self._update_status()
-        return True
+        return submission_id
     
     def grade_submission(self, student_id: str, grade: float, feedback: str = '') -> bool:
         """Grade a student's submission.
@@ -137,9 +166,10 @@ class Assignment:
         """
         if student_id not in self._submissions:
             return False
-            
-        # Ensure grade is within valid range
-        grade = max(0, min(float(grade), self._max_points))
+        
+        submission = self._submissions[student_id]
+        grade = self._mark_graded(submission, grade)
+        submission['feedback'] = feedback
         
         self._grades[student_id] = {
             'grade': grade,
@@ -147,15 +177,42 @@ class Assignment:
             'graded_at': datetime.now(),
             'graded_by': self._teacher_id
         }
+        return True
+    
+    def _mark_graded(self, submission: Dict, grade: float) -> float:
+        """Record a grade on one of this assignment's submissions.
         
-        self._submissions[student_id].update({
-            'status': 'graded',
-            'grade': grade,
-            'feedback': feedback
-        })
+        The grade is clamped to 0..max_points. Every grading path goes
+        through here, so _graded_submissions and _grade_total always match
+        the submissions whose status is 'graded'.
         
+        Returns:
+            The grade as recorded
+        """
+        # Ensure grade is within valid range
+        grade = max(0.0, min(float(grade), self._max_points))
+        if submission.get('status') != 'graded':
+            self._graded_submissions += 1
+        else:
+            self._grade_total -= submission.get('grade') or 0.0
+        self._grade_total += grade
+        submission['status'] = 'graded'
+        submission['grade'] = grade
         self._update_status()
-        return True
+        return grade
+    
+    def copy(self) -> 'Assignment':
+        """Copy the assignment with its own submission and grade records.
+        
+        Changes to the copy, including to its submissions, leave this
+        assignment untouched.
+        """
+        clone = copy.copy(self)
+        clone._submissions = {student_id: dict(submission)
+                              for student_id, submission in self._submissions.items()}
+        clone._grades = {student_id: dict(grade) for student_id, grade in self._grades.items()}
+        clone._attachments = list(self._attachments)
+        return clone
     
     def get_submission(self, student_id: str) -> Optional[Dict]:
         """Get a student's submission."""
@@ -168,16 +225,16 @@ class Assignment:
     def get_summary(self) -> Dict[str, Any]:
         """Get a summary of the assignment."""
         submitted = len(self._submissions)
-        graded = sum(1 for s in self._submissions.values() if s.get('status') == 'graded')
+        graded = self._graded_submissions
         
         return {
             'id': self._id,
             'title': self._title,
             'subject': self._subject,
             'status': self.status,
-            'due_date': self._due_date.isoformat(),
+            'due_date': self._due_date_iso,
             'max_points': self._max_points,
-            'difficulty': self._difficulty.value,
+            'difficulty': self._difficulty_value,
             'submissions': submitted,
             'graded': graded,
             'completion_rate': (submitted / len(self._submissions)) * 100 if self._submissions else 0,
@@ -193,11 +250,11 @@ class Assignment:
             'subject': self._subject,
             'teacher_id': self._teacher_id,
             'class_id': self._class_id,
-            'created_at': self._created_at.isoformat(),
-            'due_date': self._due_date.isoformat(),
+            'created_at': self._created_at_iso,
+            'due_date': self._due_date_iso,
             'max_points': self._max_points,
-            'difficulty': self._difficulty.value,
+            'difficulty': self._difficulty_value,
             'status': self.status,
             'submission_count': len(self._submissions),
-            'graded_count': sum(1 for s in self._submissions.values() if s.get('status') == 'graded')
+            'graded_count': self._graded_submissions
         }
@@ -6,6 +6,9 @@ from uuid import uuid4
 class AbstractRole(ABC):
     """Abstract base class for all user roles in the system."""
     
+    __slots__ = ('_id', '_full_name', '_email', '_password_hash', '_salt',
+                 '_created_at', '_notifications')
+    
     def __init__(self, full_name: str, email: str, password: str):
         """Initialize a new user with basic information."""
         self._id = str(uuid4().int)[:8]  # Generate a shorter ID
@@ -1,6 +1,8 @@
 from typing import Dict, Optional, Any
 from datetime import datetime
 from enum import Enum
+from functools import cached_property
+from uuid import uuid4
 
 class GradeType(Enum):
     """Types of grades that can be recorded."""
@@ -14,6 +16,10 @@ class GradeType(Enum):
 class Grade:
     """Class representing a grade in the educational platform."""
     
+    # Score-derived values cached on first access; cleared whenever
+    # _score or _max_score changes
+    _SCORE_CACHE = ('percentage', 'letter_grade', 'gpa_points')
+    
     def __init__(self, 
                  student_id: str, 
                  subject: str, 
@@ -35,7 +41,7 @@ class Grade:
             teacher_id: ID of the teacher who assigned the grade
             comments: Optional comments about the grade
         """
-        self._id = f"grade_{len(str(hash(str(datetime.now()))))[-8:]}"
+        self._id = f"grade_{uuid4().hex[:12]}"
         self._student_id = student_id
         self._subject = subject
         self._type = grade_type
@@ -57,17 +63,26 @@ class Grade:
             return 'assessments'
         return 'other'
     
-    @property
+    def _clear_score_cache(self) -> None:
+        """Drop cached score-derived values after _score or _max_score changes."""
+        for name in self._SCORE_CACHE:
+            self.__dict__.pop(name, None)
+    
+    @cached_property
     def percentage(self) -> float:
         """Calculate the grade as a percentage."""
         if self._max_score == 0:
             return 0.0
         return (self._score / self._max_score) * 100
     
-    @property
+    @cached_property
     def letter_grade(self) -> str:
         """Convert the percentage to a letter grade."""
-        percentage = self.percentage
+        return self.percentage_to_letter_grade(self.percentage)
+    
+    @staticmethod
+    def percentage_to_letter_grade(percentage: float) -> str:
+        """Convert a percentage to a letter grade."""
         if percentage >= 90:
             return 'A'
         elif percentage >= 80:
@@ -79,7 +94,7 @@ class Grade:
         else:
             return 'F'
     
-    @property
+    @cached_property
     def gpa_points(self) -> float:
         """Convert the letter grade to GPA points (4.0 scale)."""
         letter = self.letter_grade
@@ -106,6 +121,7 @@ class Grade:
         """
         if new_score is not None:
             self._score = float(new_score)
+            self._clear_score_cache()
             
         if new_comments is not None:
             if self._comments:
@@ -152,6 +168,53 @@ class Grade:
             
         return result
     
+    @cached_property
+    def created_at_iso(self) -> str:
+        """The creation time in ISO format (cached; it never changes)."""
+        return self._created_at.isoformat()
+    
+    def get_grade_details(self,
+                          teacher_name: str,
+                          include_student_id: bool = False,
+                          iso: bool = True) -> Dict[str, Any]:
+        """Get the grade with its derived values, as listed by GradeService.
+        
+        Args:
+            teacher_name: Name of the teacher who assigned the grade
+            include_student_id: Whether to include the student's ID
+            iso: Whether to give timestamps as ISO strings rather than datetimes
+            
+        Returns:
+            Dictionary with the grade details
+        """
+        updated_at = self._updated_at
+        if iso:
+            created_at = self.created_at_iso
+            if updated_at:
+                updated_at = updated_at.isoformat()
+        else:
+            created_at = self._created_at
+            
+        result = {'id': self._id}
+        if include_student_id:
+            result['student_id'] = self._student_id
+        result.update(
+            subject=self._subject,
+            type=self._type.value,
+            score=self._score,
+            max_score=self._max_score,
+            percentage=self.percentage,
+            letter_grade=self.letter_grade,
+            gpa_points=self.gpa_points,
+            comments=self._comments,
+            teacher_id=self._teacher_id,
+            teacher_name=teacher_name,
+            assignment_id=self._assignment_id,
+            created_at=created_at,
+            updated_at=updated_at or None
+        )
+        return result
+    
     def get_grade_summary(self) -> Dict[str, Any]:
         """Get a summary of the grade."""
         return {
@@ -1,4 +1,4 @@
-from typing import Dict, Any, Optional
+from typing import Callable, Dict, Any, Optional
 from datetime import datetime
 from enum import Enum
 
@@ -22,6 +22,10 @@ class NotificationType(Enum):
 class Notification:
     """Class representing a notification in the educational platform."""
     
+    # Called with the notification whenever its read state changes; set by
+    # the repository storing it so its unread counts stay in step
+    _read_listener: Optional[Callable[['Notification'], None]] = None
+    
     def __init__(self, 
                  recipient_id: str,
                  title: str,
@@ -55,6 +59,7 @@ class Notification:
         self._related_entity_id = related_entity_id
         self._related_entity_type = related_entity_type
         self._metadata: Dict[str, Any] = {}
+        self._cached_dict: Optional[Dict[str, Any]] = None
     
     @property
     def id(self) -> str:
@@ -76,11 +81,18 @@ class Notification:
         if not self._is_read:
             self._is_read = True
             self._read_at = datetime.now()
+            self._cached_dict = None
+            if self._read_listener is not None:
+                self._read_listener(self)
     
     def mark_as_unread(self) -> None:
         """Mark the notification as unread."""
-        self._is_read = False
-        self._read_at = None
+        if self._is_read:
+            self._is_read = False
+            self._read_at = None
+            self._cached_dict = None
+            if self._read_listener is not None:
+                self._read_listener(self)
     
     def archive(self) -> None:
         """Archive the notification."""
@@ -98,6 +110,26 @@ class Notification:
         """Get metadata value by key."""
         return self._metadata.get(key, default)
     
+    def to_summary_dict(self) -> Dict[str, Any]:
+        """Get the inbox summary of the notification.
+        
+        The dictionary is built once and reused until the read state changes,
+        so callers must not modify it.
+        """
+        if self._cached_dict is None:
+            self._cached_dict = {
+                'id': self._id,
+                'title': self._title,
+                'message': self._message,
+                'type': self._type.value,
+                'priority': self._priority.value,
+                'is_read': self._is_read,
+                'created_at': self._created_at.isoformat(),
+                'related_entity_id': self._related_entity_id,
+                'related_entity_type': self._related_entity_type
+            }
+        return self._cached_dict
+    
     def to_dict(self, include_metadata: bool = False) -> Dict[str, Any]:
         """Convert the notification to a dictionary.
         
@@ -1,6 +1,7 @@
 from typing import Dict, List, Optional, Any
 from datetime import time, datetime, timedelta
 from enum import Enum
+from operator import itemgetter
 
 class Weekday(Enum):
     """Days of the week for scheduling."""
@@ -12,6 +13,19 @@ class Weekday(Enum):
     SATURDAY = "saturday"
     SUNDAY = "sunday"
 
+# Weekdays indexed by date.weekday() (Monday is 0)
+WEEKDAY_BY_INT = (
+    Weekday.MONDAY,
+    Weekday.TUESDAY,
+    Weekday.WEDNESDAY,
+    Weekday.THURSDAY,
+    Weekday.FRIDAY,
+    Weekday.SATURDAY,
+    Weekday.SUNDAY,
+)
+
+_by_start_time = itemgetter('start_time')
+
 class Schedule:
     """Class representing a schedule for classes in the educational platform."""
     
@@ -28,7 +42,8 @@ class Schedule:
             end_date: When the schedule expires
             schedule_type: Type of schedule (weekly, daily, custom)
         """
-        self._id = f"sched_{len(str(hash(str(datetime.now()))))[-8:]}"
+        now = datetime.now()
+        self._id = f"sched_{len(str(hash(str(now))))[-8:]}"
         self._class_id = class_id
         self._start_date = start_date
         self._end_date = end_date
@@ -37,7 +52,7 @@ class Schedule:
             day.value: [] for day in Weekday
         }
         self._exceptions: List[Dict] = []  # For holidays, special events
-        self._last_updated = datetime.now()
+        self._last_updated = now
     
     def add_class_session(self,
                         subject: str,
@@ -64,19 +79,23 @@ class Schedule:
         if self._has_conflict(day.value, start_time, end_time, teacher_id=teacher_id):
             return False
             
+        now = datetime.now()
         session = {
-            'id': f"sess_{len(str(hash(str(datetime.now()))))[-6:]}",
+            'id': f"sess_{len(str(hash(str(now))))[-6:]}",
             'subject': subject,
             'teacher_id': teacher_id,
             'start_time': start_time.strftime('%H:%M'),
             'end_time': end_time.strftime('%H:%M'),
+            # Parsed copies of the times above for comparisons; not exported
+            '_start_t': time(start_time.hour, start_time.minute),
+            '_end_t': time(end_time.hour, end_time.minute),
             'room': room,
             'recurring': recurring,
-            'created_at': datetime.now().isoformat()
+            'created_at': now.isoformat()
         }
         
         self._schedule[day.value].append(session)
-        self._last_updated = datetime.now()
+        self._last_updated = now
         return True
     
     def _has_conflict(self, 
@@ -105,10 +124,7 @@ class Schedule:
             # Check teacher availability
             if teacher_id and session.get('teacher_id') == teacher_id:
                 # Check time overlap
-                existing_start = datetime.strptime(session['start_time'], '%H:%M').time()
-                existing_end = datetime.strptime(session['end_time'], '%H:%M').time()
-                
-                if (start_time < existing_end and end_time > existing_start):
+                if (start_time < session['_end_t'] and end_time > session['_start_t']):
                     return True
                     
         return False
@@ -149,8 +165,8 @@ class Schedule:
             
         # Check for conflicts with the new time
         day = new_day.value if new_day else day_found
-        start_time = new_start_time or datetime.strptime(session['start_time'], '%H:%M').time()
-        end_time = new_end_time or datetime.strptime(session['end_time'], '%H:%M').time()
+        start_time = new_start_time or session['_start_t']
+        end_time = new_end_time or session['_end_t']
         
         if self._has_conflict(day, start_time, end_time, 
                             teacher_id=session['teacher_id'],
@@ -165,13 +181,16 @@ class Schedule:
             
         if new_start_time:
             session['start_time'] = new_start_time.strftime('%H:%M')
+            session['_start_t'] = time(new_start_time.hour, new_start_time.minute)
         if new_end_time:
             session['end_time'] = new_end_time.strftime('%H:%M')
+            session['_end_t'] = time(new_end_time.hour, new_end_time.minute)
         if new_room is not None:
             session['room'] = new_room
             
-        session['updated_at'] = datetime.now().isoformat()
-        self._last_updated = datetime.now()
+        now = datetime.now()
+        session['updated_at'] = now.isoformat()
+        self._last_updated = now
         return True
     
     def remove_class_session(self, session_id: str) -> bool:
@@ -195,7 +214,7 @@ class Schedule:
         """Get the schedule for a specific day."""
         return sorted(
             self._schedule.get(day.value, []),
-            key=lambda x: x['start_time']
+            key=_by_start_time
         )
     
     def get_teacher_schedule(self, teacher_id: str) -> Dict[str, List[Dict]]:
@@ -209,7 +228,7 @@ class Schedule:
                     
         # Sort each day's sessions by start time
         for day in result:
-            result[day].sort(key=lambda x: x['start_time'])
+            result[day].sort(key=_by_start_time)
             
         return result
     
@@ -229,7 +248,8 @@ class Schedule:
         Returns:
             str: ID of the created exception
         """
-        exception_id = f"exc_{len(str(hash(str(datetime.now()))))[-6:]}"
+        now = datetime.now()
+        exception_id = f"exc_{len(str(hash(str(now))))[-6:]}"
         
         self._exceptions.append({
             'id': exception_id,
@@ -237,10 +257,10 @@ class Schedule:
             'reason': reason,
             'is_holiday': is_holiday,
             'make_up_date': make_up_date.date().isoformat() if make_up_date else None,
-            'created_at': datetime.now().isoformat()
+            'created_at': now.isoformat()
         })
         
-        self._last_updated = datetime.now()
+        self._last_updated = now
         return exception_id
     
     def to_dict(self) -> Dict[str, Any]:
@@ -252,6 +272,12 @@ class Schedule:
             'end_date': self._end_date.isoformat(),
             'type': self._type,
             'last_updated': self._last_updated.isoformat(),
-            'schedule': self._schedule,
+            'schedule': {
+                day: [
+                    {key: value for key, value in session.items() if not key.startswith('_')}
+                    for session in sessions
+                ]
+                for day, sessions in self._schedule.items()
+            },
             'exceptions': self._exceptions
         }
@@ -1,10 +1,17 @@
 from typing import Dict, List, Optional, Any
+from bisect import bisect_right
 from .user import User, UserRole
 from datetime import datetime, timedelta
 
+# Lower percentage bounds for grades 2-5; anything below the first is a 1
+_GRADE_THRESHOLDS = (40, 60, 75, 90)
+_GRADE_VALUES = (1, 2, 3, 4, 5)
+
 class Teacher(User):
     """Teacher class representing a teacher in the educational platform."""
     
+    __slots__ = ('_subjects', '_classes', '_assignments', '_workload')
+    
     def __init__(self, full_name: str, email: str, password: str):
         """Initialize a new teacher.
         
@@ -139,16 +146,7 @@ class Teacher(User):
     
     def _calculate_grade(self, percentage: float) -> int:
         """Convert percentage to a 1-5 grade scale."""
-        if percentage >= 90:
-            return 5
-        elif percentage >= 75:
-            return 4
-        elif percentage >= 60:
-            return 3
-        elif percentage >= 40:
-            return 2
-        else:
-            return 1
+        return _GRADE_VALUES[bisect_right(_GRADE_THRESHOLDS, percentage)]
     
     def view_student_progress(self, student_id: str, subject: Optional[str] = None) -> Dict[str, Any]:
         """View a student's progress in the teacher's classes.
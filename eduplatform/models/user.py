@@ -12,6 +12,8 @@ class UserRole(Enum):
 class User(AbstractRole):
     """Base user class that extends AbstractRole with common user functionality."""
     
+    __slots__ = ('_role', '_phone', '_address')
+    
     def __init__(self, full_name: str, email: str, password: str, role: UserRole):
         """Initialize a new user with a specific role."""
         super().__init__(full_name, email, password)
@@ -1,22 +1,152 @@
-from typing import Dict, List, Optional, Any
-from datetime import datetime
+import threading
+from bisect import bisect_left, insort
+from typing import Dict, List, Optional, Any, Set, Tuple
+from datetime import datetime, timedelta
 from ..models.assignment import Assignment, AssignmentStatus, AssignmentDifficulty
 from .base import BaseRepository
 
+_STATUS_PUBLISHED = AssignmentStatus.PUBLISHED.value
+_STATUS_IN_PROGRESS = AssignmentStatus.IN_PROGRESS.value
+# Statuses in which an assignment is still open for student work
+_ACTIVE_STATUSES = frozenset((_STATUS_PUBLISHED, _STATUS_IN_PROGRESS))
+
+# Submission statuses
+_SUBMITTED = 'submitted'
+_GRADED = 'graded'
+
+class ConcurrencyConflict(Exception):
+    """Raised when an assignment changed since the caller read it."""
+    
+    def __init__(self, current_version: int):
+        super().__init__(f"Assignment was modified concurrently (current version {current_version})")
+        self.current_version = current_version
+
 class AssignmentRepository(BaseRepository[Assignment]):
     """Repository for managing Assignment entities."""
     
+    def __init__(self):
+        super().__init__()
+        # Makes the version compare-and-bump and the save in update() atomic
+        self._version_lock = threading.Lock()
+        # (due_ts, assignment_id) entries per teacher and per class, each list
+        # kept sorted by due date so lookups come back in due-date order
+        self._by_teacher_due: Dict[str, List[Tuple[float, str]]] = {}
+        self._by_class_due: Dict[str, List[Tuple[float, str]]] = {}
+        # assignment_id -> (teacher_id, class_id, entry) as last indexed
+        self._due_entries: Dict[str, Tuple[str, str, Tuple[float, str]]] = {}
+        # submission_id -> (assignment_id, student_id), the assignment IDs
+        # each student submitted to, and the (submission_id, student_id)
+        # pairs of each assignment as last indexed
+        self._submission_keys: Dict[str, Tuple[str, str]] = {}
+        self._submitted_by_student: Dict[str, Set[str]] = {}
+        self._submission_entries: Dict[str, List[Tuple[str, str]]] = {}
+    
     def _get_key(self, item: Assignment) -> str:
         """Get the unique key for an assignment (its ID)."""
         return item._id
     
+    def _index(self, key: str, item: Assignment) -> None:
+        entry = (item._due_date_ts, key)
+        insort(self._by_teacher_due.setdefault(item._teacher_id, []), entry)
+        insort(self._by_class_due.setdefault(item._class_id, []), entry)
+        self._due_entries[key] = (item._teacher_id, item._class_id, entry)
+        
+        entries = [(submission['id'], student_id) for student_id, submission in item._submissions.items()]
+        for submission_id, student_id in entries:
+            self._submission_keys[submission_id] = (key, student_id)
+            self._submitted_by_student.setdefault(student_id, set()).add(key)
+        self._submission_entries[key] = entries
+    
+    def _unindex(self, key: str) -> None:
+        for submission_id, student_id in self._submission_entries.pop(key, ()):
+            self._submission_keys.pop(submission_id, None)
+            submitted = self._submitted_by_student[student_id]
+            submitted.discard(key)
+            if not submitted:
+                del self._submitted_by_student[student_id]
+        
+        indexed = self._due_entries.pop(key, None)
+        if indexed is None:
+            return
+        teacher_id, class_id, entry = indexed
+        for index, value in ((self._by_teacher_due, teacher_id), (self._by_class_due, class_id)):
+            bucket = index[value]
+            del bucket[bisect_left(bucket, entry)]
+            if not bucket:
+                del index[value]
+    
+    def clear(self) -> None:
+        """Remove all assignments from the repository."""
+        super().clear()
+        self._by_teacher_due.clear()
+        self._by_class_due.clear()
+        self._due_entries.clear()
+        self._submission_keys.clear()
+        self._submitted_by_student.clear()
+        self._submission_entries.clear()
+    
+    def _get_by_due(self, index: Dict[str, List[Tuple[float, str]]], value: str) -> List[Assignment]:
+        """Get the assignments in one bucket of a due-date index, soonest first."""
+        storage = self._storage
+        return [storage[key] for _, key in index.get(value, ())]
+    
+    def update(self, item: Assignment, expected_version: Optional[int] = None) -> bool:
+        """Update an existing assignment and bump its version.
+        
+        Args:
+            item: The assignment to save
+            expected_version: Version the caller read before changing the
+                assignment; if given, the update only succeeds when the stored
+                assignment still has this version
+            
+        Returns:
+            bool: True if the assignment was updated, False if it doesn't exist
+            
+        Raises:
+            ConcurrencyConflict: If the stored version differs from expected_version
+        """
+        with self._version_lock:
+            stored = self._storage.get(item._id)
+            if stored is None:
+                return False
+            if expected_version is not None and stored._version != expected_version:
+                raise ConcurrencyConflict(stored._version)
+            item._version = stored._version + 1
+            return super().update(item)
+    
+    def find_submission(self, submission_id: str) -> Optional[Tuple[Assignment, Dict]]:
+        """Find a submission and the assignment it belongs to.
+        
+        Returns:
+            Tuple of the assignment and the submission, or None if no stored
+            assignment has a submission with this ID
+        """
+        keys = self._submission_keys.get(submission_id)
+        if keys is None:
+            return None
+        assignment = self._storage[keys[0]]
+        submission = assignment._submissions.get(keys[1])
+        if not submission or submission['id'] != submission_id:
+            return None
+        return assignment, submission
+    
+    def get_student_submissions(self, student_id: str) -> Dict[str, Dict]:
+        """Get a student's submissions keyed by assignment ID."""
+        storage = self._storage
+        submissions = {}
+        for assignment_id in self._submitted_by_student.get(student_id, ()):
+            submission = storage[assignment_id]._submissions.get(student_id)
+            if submission:
+                submissions[assignment_id] = submission
+        return submissions
+    
     def get_by_teacher(self, teacher_id: str) -> List[Assignment]:
-        """Get all assignments created by a specific teacher."""
-        return [a for a in self.get_all() if a._teacher_id == teacher_id]
+        """Get all assignments created by a specific teacher, soonest due first."""
+        return self._get_by_due(self._by_teacher_due, teacher_id)
     
     def get_by_class(self, class_id: str, status: Optional[str] = None) -> List[Assignment]:
-        """Get all assignments for a specific class, optionally filtered by status."""
-        assignments = [a for a in self.get_all() if a._class_id == class_id]
+        """Get all assignments for a class, soonest due first, optionally filtered by status."""
+        assignments = self._get_by_due(self._by_class_due, class_id)
         if status:
             return [a for a in assignments if a.status == status]
         return assignments
@@ -31,12 +161,11 @@ class AssignmentRepository(BaseRepository[Assignment]):
     def get_due_soon(self, days: int = 7) -> List[Assignment]:
         """Get assignments that are due within the specified number of days."""
         now = datetime.now()
-        due_date = now + datetime.timedelta(days=days)
+        cutoff = now + timedelta(days=days)
         
         return [
             a for a in self.get_all() 
-            if a._status == AssignmentStatus.PUBLISHED.value and 
-               now < a._due_date <= due_date
+            if a._status == _STATUS_PUBLISHED and now < a._due_date <= cutoff
         ]
     
     def get_overdue(self) -> List[Assignment]:
@@ -44,8 +173,7 @@ class AssignmentRepository(BaseRepository[Assignment]):
         now = datetime.now()
         return [
             a for a in self.get_all() 
-            if a._due_date < now and 
-               a._status in [AssignmentStatus.PUBLISHED.value, AssignmentStatus.IN_PROGRESS.value]
+            if a._due_date < now and a._status in _ACTIVE_STATUSES
         ]
     
     def get_by_difficulty(self, difficulty: AssignmentDifficulty) -> List[Assignment]:
@@ -57,8 +185,7 @@ class AssignmentRepository(BaseRepository[Assignment]):
         now = datetime.now()
         return [
             a for a in self.get_all() 
-            if a._status in [AssignmentStatus.PUBLISHED.value, AssignmentStatus.IN_PROGRESS.value] and 
-               a._due_date > now
+            if a._status in _ACTIVE_STATUSES and a._due_date > now
         ]
     
     def get_submissions_summary(self, assignment_id: str) -> Dict[str, Any]:
@@ -69,7 +196,16 @@ class AssignmentRepository(BaseRepository[Assignment]):
             
         submissions = assignment._submissions
         total = len(submissions)
-        graded = sum(1 for s in submissions.values() if s.get('status') == 'graded')
+        graded = 0
+        grade_sum = 0.0
+        for s in submissions.values():
+            if s.get('status') == _GRADED:
+                graded += 1
+            grade = s.get('grade')
+            if grade is not None:
+                grade_sum += grade
+        
+        class_size = getattr(assignment, '_class_size', 0)
         
         return {
             'assignment_id': assignment_id,
@@ -77,25 +213,31 @@ class AssignmentRepository(BaseRepository[Assignment]):
             'total_submissions': total,
             'graded': graded,
             'pending': total - graded,
-            'submission_rate': (total / 100) * 100 if hasattr(assignment, '_class_size') and assignment._class_size > 0 else 0,
-            'average_grade': sum(s.get('grade', 0) for s in submissions.values() if s.get('grade') is not None) / graded if graded > 0 else 0
+            'submission_rate': (total / class_size) * 100 if class_size > 0 else 0,
+            'average_grade': grade_sum / graded if graded > 0 else 0
         }
     
     def get_teacher_workload(self, teacher_id: str) -> Dict[str, Any]:
         """Get workload statistics for a teacher."""
-        teacher_assignments = self.get_by_teacher(teacher_id)
         now = datetime.now()
+        storage = self._storage
         
-        active = []
+        total = 0
+        active = 0
+        overdue = 0
         grading_needed = []
         
-        for assignment in teacher_assignments:
-            if assignment._status in [AssignmentStatus.PUBLISHED.value, AssignmentStatus.IN_PROGRESS.value]:
-                active.append(assignment)
+        for _, key in self._by_teacher_due.get(teacher_id, ()):
+            assignment = storage[key]
+            total += 1
+            if assignment._status in _ACTIVE_STATUSES:
+                active += 1
+                if assignment._due_date < now:
+                    overdue += 1
                 
                 # Count ungraded submissions
                 ungraded = sum(1 for s in assignment._submissions.values() 
-                             if s.get('status') == 'submitted')
+                             if s.get('status') == _SUBMITTED)
                 if ungraded > 0:
                     grading_needed.append({
                         'assignment_id': assignment._id,
@@ -105,10 +247,10 @@ class AssignmentRepository(BaseRepository[Assignment]):
                     })
         
         return {
-            'total_assignments': len(teacher_assignments),
-            'active_assignments': len(active),
+            'total_assignments': total,
+            'active_assignments': active,
             'grading_needed': grading_needed,
-            'overdue_grading': len([a for a in active if a._due_date < now])
+            'overdue_grading': overdue
         }
     
     def search_assignments(self, 
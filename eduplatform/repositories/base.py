@@ -1,27 +1,83 @@
 from abc import ABC, abstractmethod
-from typing import Dict, List, Optional, TypeVar, Generic, Type, Any
+from typing import Dict, List, Optional, TypeVar, Generic, Type, Any, Callable, Iterable, Tuple
 
 T = TypeVar('T')
 
 class BaseRepository(Generic[T], ABC):
     """Base repository class for handling CRUD operations on models."""
     
+    # Secondary indexes as (name, extractor) pairs. Each index maps the
+    # extracted value to the keys of the items that share it, kept in a
+    # dict (used as an ordered set) so lookups preserve insertion order.
+    _index_fields: Tuple[Tuple[str, Callable[[Any], Any]], ...] = ()
+    
     def __init__(self):
         self._storage: Dict[str, T] = {}
+        self._indexes: Dict[str, Dict[Any, Dict[str, None]]] = {name: {} for name, _ in self._index_fields}
+        self._indexed_values: Dict[str, Tuple[Any, ...]] = {}
     
     @abstractmethod
     def _get_key(self, item: T) -> str:
         """Get the unique key for an item."""
         pass
     
+    def _index(self, key: str, item: T) -> None:
+        """Record an item in every secondary index."""
+        if not self._index_fields:
+            return
+        values = tuple(extractor(item) for _, extractor in self._index_fields)
+        for (name, _), value in zip(self._index_fields, values):
+            self._indexes[name].setdefault(value, {})[key] = None
+        self._indexed_values[key] = values
+    
+    def _unindex(self, key: str) -> None:
+        """Remove an item's key from every secondary index."""
+        values = self._indexed_values.pop(key, None)
+        if values is None:
+            return
+        for (name, _), value in zip(self._index_fields, values):
+            bucket = self._indexes[name].get(value)
+            if bucket is not None:
+                bucket.pop(key, None)
+                if not bucket:
+                    del self._indexes[name][value]
+    
+    def _get_indexed(self, name: str, value: Any) -> List[T]:
+        """Get all items whose indexed field `name` equals `value`."""
+        storage = self._storage
+        return [storage[key] for key in self._indexes[name].get(value, ())]
+    
     def add(self, item: T) -> T:
         """Add a new item to the repository."""
         key = self._get_key(item)
         if key in self._storage:
             raise ValueError(f"Item with key '{key}' already exists")
         self._storage[key] = item
+        self._index(key, item)
         return item
     
+    def bulk_add(self, items: Iterable[T]) -> List[T]:
+        """Add many new items at once.
+        
+        Keys are validated up front so either every item is added or none is.
+        """
+        items = list(items)
+        keys = [self._get_key(item) for item in items]
+        
+        seen = set()
+        duplicates = set()
+        for key in keys:
+            if key in seen or key in self._storage:
+                duplicates.add(key)
+            seen.add(key)
+        if duplicates:
+            raise ValueError(f"Items with keys {sorted(duplicates)} already exist")
+        
+        self._storage.update(zip(keys, items))
+        for key, item in zip(keys, items):
+            self._index(key, item)
+        return items
+    
     def get(self, key: str) -> Optional[T]:
         """Get an item by its key."""
         return self._storage.get(key)
@@ -35,12 +91,15 @@ class BaseRepository(Generic[T], ABC):
         key = self._get_key(item)
         if key not in self._storage:
             return False
+        self._unindex(key)
         self._storage[key] = item
+        self._index(key, item)
         return True
     
     def delete(self, key: str) -> bool:
         """Delete an item by its key."""
         if key in self._storage:
+            self._unindex(key)
             del self._storage[key]
             return True
         return False
@@ -56,6 +115,9 @@ class BaseRepository(Generic[T], ABC):
     def clear(self) -> None:
         """Remove all items from the repository."""
         self._storage.clear()
+        for index in self._indexes.values():
+            index.clear()
+        self._indexed_values.clear()
     
     def find(self, predicate) -> List[T]:
         """Find items that match the given predicate function."""
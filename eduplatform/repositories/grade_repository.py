@@ -1,21 +1,70 @@
-from typing import Dict, List, Optional, Any, Tuple
+from typing import Dict, Iterable, List, Optional, Any, Tuple
 from datetime import datetime, timedelta
+from bisect import bisect_right
+from operator import attrgetter
 from ..models.grade import Grade, GradeType
 from .base import BaseRepository
 
+# Lower percentage bounds for D, C, B and A; anything below the first is an F
+_LETTER_THRESHOLDS = (60, 70, 80, 90)
+_LETTER_VALUES = ('F', 'D', 'C', 'B', 'A')
+
+_by_created_at = attrgetter('_created_at')
+
 class GradeRepository(BaseRepository[Grade]):
     """Repository for managing Grade entities."""
     
+    _index_fields = (
+        ('student_id', attrgetter('_student_id')),
+    )
+    
+    def __init__(self):
+        super().__init__()
+        # Change stamps for cache invalidation: every add, update or delete
+        # takes the next value of _change_counter and records it against
+        # the grade's student. The counter never goes back, so a stamp is
+        # never reused, even after clear().
+        self._change_counter = 0
+        self._student_versions: Dict[str, int] = {}
+    
     def _get_key(self, item: Grade) -> str:
         """Get the unique key for a grade (its ID)."""
         return item._id
     
+    def _touch_student(self, student_id: str) -> None:
+        """Record that a student's grades changed."""
+        self._change_counter += 1
+        self._student_versions[student_id] = self._change_counter
+    
+    def _index(self, key: str, item: Grade) -> None:
+        super()._index(key, item)
+        self._touch_student(item._student_id)
+    
+    def _unindex(self, key: str) -> None:
+        # Called before the stored grade is replaced or removed
+        grade = self._storage.get(key)
+        if grade is not None:
+            self._touch_student(grade._student_id)
+        super()._unindex(key)
+    
+    def clear(self) -> None:
+        """Remove all grades from the repository."""
+        super().clear()
+        self._student_versions.clear()
+    
+    def get_student_version(self, student_id: str) -> int:
+        """Get a stamp that changes whenever the student's grades change.
+        
+        Grades edited in place without calling update() are not detected.
+        """
+        return self._student_versions.get(student_id, 0)
+    
     def get_student_grades(self, 
                           student_id: str, 
                           subject: Optional[str] = None,
                           grade_type: Optional[GradeType] = None) -> List[Grade]:
         """Get all grades for a specific student, with optional filters."""
-        grades = [g for g in self.get_all() if g._student_id == student_id]
+        grades = self._get_indexed('student_id', student_id)
         
         if subject:
             grades = [g for g in grades if g._subject.lower() == subject.lower()]
@@ -23,7 +72,59 @@ class GradeRepository(BaseRepository[Grade]):
         if grade_type:
             grades = [g for g in grades if g._type == grade_type]
             
-        return sorted(grades, key=lambda x: x._created_at, reverse=True)
+        return sorted(grades, key=_by_created_at, reverse=True)
+    
+    def get_grades_for_students(self, student_ids: Iterable[str]) -> List[Grade]:
+        """Get the grades of several students in a single pass, newest first."""
+        grades = [
+            grade
+            for student_id in dict.fromkeys(student_ids)
+            for grade in self._get_indexed('student_id', student_id)
+        ]
+        return sorted(grades, key=_by_created_at, reverse=True)
+    
+    def get_all_grades(self) -> List[Grade]:
+        """Get every grade, newest first."""
+        return sorted(self._storage.values(), key=_by_created_at, reverse=True)
+    
+    def get_grades_by_student(self,
+                              student_ids: Iterable[str],
+                              subject: Optional[str] = None,
+                              grade_type: Optional[GradeType] = None) -> Dict[str, List[Grade]]:
+        """Get the grades of several students, grouped by student.
+        
+        Students are kept in the given order and left out if they have no
+        matching grades; each student's grades are newest first.
+        """
+        subject = subject.lower() if subject else None
+        result = {}
+        for student_id in student_ids:
+            grades = self._get_indexed('student_id', student_id)
+            if subject:
+                grades = [g for g in grades if g._subject.lower() == subject]
+            if grade_type:
+                grades = [g for g in grades if g._type == grade_type]
+            if grades:
+                grades.sort(key=_by_created_at, reverse=True)
+                result[student_id] = grades
+        return result
+    
+    def get_student_grades_by_subject(self, student_id: str) -> Dict[str, List[Grade]]:
+        """Get a student's grades grouped by subject.
+        
+        Each subject's grades are newest first, and subjects are ordered by
+        their most recent grade.
+        """
+        grades = self._get_indexed('student_id', student_id)
+        grades.sort(key=_by_created_at, reverse=True)
+        by_subject: Dict[str, List[Grade]] = {}
+        for grade in grades:
+            subject_grades = by_subject.get(grade._subject)
+            if subject_grades is None:
+                by_subject[grade._subject] = [grade]
+            else:
+                subject_grades.append(grade)
+        return by_subject
     
     def get_class_grades(self, 
                         class_id: str, 
@@ -50,7 +151,7 @@ class GradeRepository(BaseRepository[Grade]):
             
         # Sort each student's grades by date
         for student_id in result:
-            result[student_id].sort(key=lambda x: x._created_at, reverse=True)
+            result[student_id].sort(key=_by_created_at, reverse=True)
             
         return result
     
@@ -78,17 +179,8 @@ class GradeRepository(BaseRepository[Grade]):
         }
         
         for pct in percentages:
-            if pct >= 90:
-                distribution['A'] += 1
-            elif pct >= 80:
-                distribution['B'] += 1
-            elif pct >= 70:
-                distribution['C'] += 1
-            elif pct >= 60:
-                distribution['D'] += 1
-            else:
-                distribution['F'] += 1
-                
+            distribution[_LETTER_VALUES[bisect_right(_LETTER_THRESHOLDS, pct)]] += 1
+            
         return distribution
     
     def get_student_progress(self, 
@@ -165,31 +257,34 @@ class GradeRepository(BaseRepository[Grade]):
         if not grades:
             return {}
             
-        # Group by date and calculate daily averages
-        daily_grades = {}
+        # Accumulate a running [sum, count] per day in a single pass
+        daily_totals: Dict[str, List[float]] = {}
+        total = 0.0
         for grade in grades:
-            date_str = grade._created_at.strftime('%Y-%m-%d')
-            if date_str not in daily_grades:
-                daily_grades[date_str] = []
-            daily_grades[date_str].append(grade.percentage)
+            pct = grade.percentage
+            total += pct
+            date_str = grade._created_at.date().isoformat()
+            totals = daily_totals.get(date_str)
+            if totals is None:
+                daily_totals[date_str] = [pct, 1]
+            else:
+                totals[0] += pct
+                totals[1] += 1
             
         # Calculate daily averages
-        trend_data = []
-        for date_str, percentages in sorted(daily_grades.items()):
-            trend_data.append({
-                'date': date_str,
-                'average': sum(percentages) / len(percentages),
-                'count': len(percentages)
-            })
+        trend_data = [
+            {'date': date_str, 'average': pct_sum / count, 'count': count}
+            for date_str, (pct_sum, count) in sorted(daily_totals.items())
+        ]
             
         return {
             'student_id': student_id,
             'subject': subject,
             'period_days': days,
-            'start_date': min(daily_grades.keys()) if daily_grades else None,
-            'end_date': max(daily_grades.keys()) if daily_grades else None,
+            'start_date': trend_data[0]['date'],
+            'end_date': trend_data[-1]['date'],
             'data_points': trend_data,
-            'overall_average': sum(g.percentage for g in grades) / len(grades) if grades else 0,
+            'overall_average': total / len(grades),
             'grade_trend': self._calculate_trend(trend_data) if trend_data else 'insufficient_data'
         }
     
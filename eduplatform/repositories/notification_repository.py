@@ -1,15 +1,138 @@
-from typing import Dict, List, Optional, Any, Union
+import heapq
+import threading
+from bisect import bisect_left, insort
+from functools import wraps
+from typing import Dict, Iterable, Iterator, List, Optional, Any, Tuple, Union
 from datetime import datetime, timedelta
+from operator import attrgetter
 from ..models.notification import Notification, NotificationPriority, NotificationType
 from .base import BaseRepository
 
+_by_created_at = attrgetter('_created_at')
+
+
+def _newest_first(notifications, limit: Optional[int] = None) -> List[Notification]:
+    """Order notifications newest first, keeping only the top `limit` if given."""
+    if limit is None:
+        return sorted(notifications, key=_by_created_at, reverse=True)
+    return heapq.nlargest(limit, notifications, key=_by_created_at)
+
+def _locked(method):
+    """Run a repository method while holding the repository's lock."""
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
 class NotificationRepository(BaseRepository[Notification]):
-    """Repository for managing Notification entities."""
+    """Repository for managing Notification entities.
+    
+    Notifications are written from background workers as well as request
+    threads, so every method that reads or changes the stored notifications
+    or their indexes holds one re-entrant lock.
+    """
+    
+    _index_fields = (
+        ('recipient_id', attrgetter('_recipient_id')),
+    )
+    
+    def __init__(self):
+        super().__init__()
+        self._lock = threading.RLock()
+        # Unread notifications per recipient. Kept in step by the index hooks
+        # and by each stored notification's read listener, so it stays right
+        # however the read state is changed.
+        self._unread_counts: Dict[str, int] = {}
+        # (created_at, id) pairs kept in ascending order, so age-based
+        # queries can bisect instead of scanning and sorting.
+        self._by_time: List[Tuple[datetime, str]] = []
+        self._time_entries: Dict[str, Tuple[datetime, str]] = {}
     
     def _get_key(self, item: Notification) -> str:
         """Get the unique key for a notification (its ID)."""
         return item._id
     
+    # BaseRepository's writes and scans, under the same lock as the methods below
+    add = _locked(BaseRepository.add)
+    bulk_add = _locked(BaseRepository.bulk_add)
+    get = _locked(BaseRepository.get)
+    get_all = _locked(BaseRepository.get_all)
+    update = _locked(BaseRepository.update)
+    delete = _locked(BaseRepository.delete)
+    find = _locked(BaseRepository.find)
+    find_one = _locked(BaseRepository.find_one)
+    
+    def _index(self, key: str, item: Notification) -> None:
+        super()._index(key, item)
+        entry = (item._created_at, key)
+        insort(self._by_time, entry)
+        self._time_entries[key] = entry
+        item._read_listener = self._read_state_changed
+        if not item._is_read:
+            self._increment_unread(item._recipient_id)
+    
+    def _unindex(self, key: str) -> None:
+        item = self._storage.get(key)
+        if item is not None:
+            item._read_listener = None
+            if not item._is_read:
+                self._decrement_unread(item._recipient_id)
+        entry = self._time_entries.pop(key, None)
+        if entry is not None:
+            position = bisect_left(self._by_time, entry)
+            del self._by_time[position]
+        super()._unindex(key)
+    
+    @_locked
+    def _read_state_changed(self, notification: Notification) -> None:
+        """Update the unread count after a stored notification was (un)read."""
+        if notification._is_read:
+            self._decrement_unread(notification._recipient_id)
+        else:
+            self._increment_unread(notification._recipient_id)
+    
+    def _increment_unread(self, recipient_id: str) -> None:
+        self._unread_counts[recipient_id] = self._unread_counts.get(recipient_id, 0) + 1
+    
+    def _decrement_unread(self, recipient_id: str) -> None:
+        count = self._unread_counts.get(recipient_id, 0) - 1
+        if count > 0:
+            self._unread_counts[recipient_id] = count
+        else:
+            self._unread_counts.pop(recipient_id, None)
+    
+    def _bulk_delete(self, end: int) -> List[str]:
+        """Delete the `end` oldest notifications in one pass.
+        
+        The time index is truncated with a single slice deletion rather than
+        one removal per notification.
+        
+        Returns:
+            IDs of the deleted notifications
+        """
+        keys = [key for _, key in self._by_time[:end]]
+        del self._by_time[:end]
+        storage = self._storage
+        time_entries = self._time_entries
+        for key in keys:
+            # Dropping the time entry first makes _unindex skip the time index.
+            del time_entries[key]
+            self._unindex(key)
+            del storage[key]
+        return keys
+    
+    @_locked
+    def clear(self) -> None:
+        """Remove all notifications from the repository."""
+        for item in self._storage.values():
+            item._read_listener = None
+        super().clear()
+        self._unread_counts.clear()
+        self._by_time.clear()
+        self._time_entries.clear()
+    
+    @_locked
     def get_user_notifications(self, 
                              user_id: str, 
                              unread_only: bool = False,
@@ -24,17 +147,38 @@ class NotificationRepository(BaseRepository[Notification]):
         Returns:
             List of notifications, optionally filtered and limited
         """
-        notifications = [
-            n for n in self.get_all() 
-            if n._recipient_id == user_id and 
-               (not unread_only or not n._is_read)
-        ]
+        notifications = self._get_indexed('recipient_id', user_id)
+        if unread_only:
+            notifications = (n for n in notifications if not n._is_read)
+        
+        return _newest_first(notifications, limit)
+    
+    def iter_user_notifications(self, 
+                                user_id: str, 
+                                unread_only: bool = False) -> Iterator[Notification]:
+        """Iterate over a user's notifications, newest first.
         
-        # Sort by creation date (newest first)
-        notifications.sort(key=lambda x: x._created_at, reverse=True)
+        Only the user's own notifications are read, from the recipient index,
+        and they are produced lazily, so callers that only need the first few
+        (e.g. via itertools.islice) stop early.
         
-        return notifications[:limit] if limit is not None else notifications
+        Args:
+            user_id: ID of the user
+            unread_only: Whether to yield only unread notifications
+            
+        Yields:
+            The user's notifications in descending creation order
+        """
+        # Notifications are indexed as they are created, so the inbox is
+        # already close to time order and sorts in about linear time
+        with self._lock:
+            notifications = self._get_indexed('recipient_id', user_id)
+        notifications.sort(key=_by_created_at, reverse=True)
+        for notification in notifications:
+            if not (unread_only and notification._is_read):
+                yield notification
     
+    @_locked
     def mark_as_read(self, notification_id: str) -> bool:
         """Mark a notification as read.
         
@@ -46,10 +190,12 @@ class NotificationRepository(BaseRepository[Notification]):
         """
         notification = self.get(notification_id)
         if notification:
+            # The read listener updates the unread count
             notification.mark_as_read()
             return True
         return False
     
+    @_locked
     def mark_all_as_read(self, user_id: str) -> int:
         """Mark all notifications for a user as read.
         
@@ -60,19 +206,18 @@ class NotificationRepository(BaseRepository[Notification]):
             int: Number of notifications marked as read
         """
         count = 0
-        for notification in self.get_all():
-            if notification._recipient_id == user_id and not notification._is_read:
+        for notification in self._get_indexed('recipient_id', user_id):
+            if not notification._is_read:
                 notification.mark_as_read()
                 count += 1
         return count
     
+    @_locked
     def get_unread_count(self, user_id: str) -> int:
         """Get the count of unread notifications for a user."""
-        return len([
-            n for n in self.get_all() 
-            if n._recipient_id == user_id and not n._is_read
-        ])
+        return self._unread_counts.get(user_id, 0)
     
+    @_locked
     def get_recent_notifications(self, 
                                user_id: str, 
                                days: int = 7,
@@ -88,31 +233,32 @@ class NotificationRepository(BaseRepository[Notification]):
             List of notification dictionaries with basic information
         """
         cutoff_date = datetime.now() - timedelta(days=days)
+        by_time = self._by_time
+        start = bisect_left(by_time, (cutoff_date,))
+        keys = self._indexes['recipient_id'].get(user_id, {})
         
-        notifications = [
-            n for n in self.get_all()
-            if n._recipient_id == user_id and n._created_at >= cutoff_date
-        ]
-        
-        # Sort by creation date (newest first)
-        notifications.sort(key=lambda x: x._created_at, reverse=True)
+        if len(by_time) - start <= len(keys):
+            # The time window is smaller than the user's inbox: walk it
+            # newest first and stop once `limit` matches are found.
+            storage = self._storage
+            notifications = []
+            for position in range(len(by_time) - 1, start - 1, -1):
+                if len(notifications) >= limit:
+                    break
+                key = by_time[position][1]
+                if key in keys:
+                    notifications.append(storage[key])
+        else:
+            notifications = _newest_first(
+                (n for n in self._get_indexed('recipient_id', user_id)
+                 if n._created_at >= cutoff_date),
+                limit
+            )
         
         # Convert to simplified dictionary format
-        return [
-            {
-                'id': n._id,
-                'title': n._title,
-                'message': n._message,
-                'type': n._type.value,
-                'priority': n._priority.value,
-                'is_read': n._is_read,
-                'created_at': n._created_at.isoformat(),
-                'related_entity_id': n._related_entity_id,
-                'related_entity_type': n._related_entity_type
-            }
-            for n in notifications[:limit]
-        ]
+        return [n.to_summary_dict() for n in notifications]
     
+    @_locked
     def create_notification(self, 
                           recipient_id: str,
                           title: str,
@@ -137,6 +283,36 @@ class NotificationRepository(BaseRepository[Notification]):
         Returns:
             The created Notification instance
         """
+        notification = self._build_notification(
+            recipient_id, title, message, notification_type, priority,
+            related_entity_id, related_entity_type, metadata
+        )
+        self.add(notification)
+        return notification
+    
+    @_locked
+    def bulk_create(self, notifications: Iterable[Dict[str, Any]]) -> List[Notification]:
+        """Create and store many notifications at once.
+        
+        Args:
+            notifications: Keyword arguments for create_notification, one
+                dictionary per notification
+            
+        Returns:
+            The created Notification instances
+        """
+        return self.bulk_add([self._build_notification(**fields) for fields in notifications])
+    
+    @staticmethod
+    def _build_notification(recipient_id: str,
+                            title: str,
+                            message: str,
+                            notification_type: Union[NotificationType, str],
+                            priority: Union[NotificationPriority, str] = NotificationPriority.NORMAL,
+                            related_entity_id: Optional[str] = None,
+                            related_entity_type: Optional[str] = None,
+                            metadata: Optional[Dict[str, Any]] = None) -> Notification:
+        """Build a notification without storing it."""
         if isinstance(notification_type, str):
             notification_type = NotificationType(notification_type.lower())
             
@@ -157,9 +333,9 @@ class NotificationRepository(BaseRepository[Notification]):
             for key, value in metadata.items():
                 notification.add_metadata(key, value)
                 
-        self.add(notification)
         return notification
     
+    @_locked
     def get_notifications_by_type(self, 
                                 user_id: str,
                                 notification_type: Union[NotificationType, str],
@@ -168,14 +344,13 @@ class NotificationRepository(BaseRepository[Notification]):
         if isinstance(notification_type, str):
             notification_type = NotificationType(notification_type.lower())
             
-        notifications = [
-            n for n in self.get_all()
-            if n._recipient_id == user_id and n._type == notification_type
-        ]
-        
-        notifications.sort(key=lambda x: x._created_at, reverse=True)
-        return notifications[:limit] if limit is not None else notifications
+        return _newest_first(
+            (n for n in self._get_indexed('recipient_id', user_id)
+             if n._type == notification_type),
+            limit
+        )
     
+    @_locked
     def cleanup_old_notifications(self, days: int = 90) -> int:
         """Remove notifications older than the specified number of days.
         
@@ -186,9 +361,5 @@ class NotificationRepository(BaseRepository[Notification]):
             int: Number of notifications removed
         """
         cutoff_date = datetime.now() - timedelta(days=days)
-        to_remove = [n._id for n in self.get_all() if n._created_at < cutoff_date]
-        
-        for notification_id in to_remove:
-            self.delete(notification_id)
-            
-        return len(to_remove)
+        end = bisect_left(self._by_time, (cutoff_date,))
+        return len(self._bulk_delete(end))
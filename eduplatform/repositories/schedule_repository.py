@@ -1,38 +1,120 @@
+from bisect import bisect_left, insort
+from operator import attrgetter, itemgetter
 from typing import Dict, List, Optional, Any, Set, Tuple, Union
 from datetime import datetime, time, date, timedelta
-from ..models.schedule import Schedule, Weekday
+from ..models.schedule import WEEKDAY_BY_INT, Schedule, Weekday
 from .base import BaseRepository
 
+_by_start_time = itemgetter('start_time')
+
+# In a real implementation, we would have a list of all available rooms
+# For this example, we'll simulate a few rooms
+_ROOMS = ("Room 101", "Room 102", "Room 103", "Room 201", "Room 202", "Lab 1")
+
+
+def _session_start(ref: Tuple[Schedule, Dict]) -> time:
+    """Sort key for (schedule, session) pairs in the teacher index."""
+    return ref[1]['_start_t']
+
+
+def _overlaps(intervals: List[Tuple[time, time, str]], start: time, end: time) -> bool:
+    """Check whether [start, end) overlaps any interval in a start-sorted list."""
+    # Intervals from this position on start at or after `end`
+    for position in range(bisect_left(intervals, (end,)) - 1, -1, -1):
+        if intervals[position][1] > start:
+            return True
+    return False
+
+
 class ScheduleRepository(BaseRepository[Schedule]):
     """Repository for managing Schedule entities."""
     
+    _index_fields = (
+        ('class_id', attrgetter('_class_id')),
+    )
+    
+    def __init__(self):
+        super().__init__()
+        # (schedule, session) pairs grouped by (teacher_id, day) and sorted by
+        # start time. The index is built when a schedule is added or updated,
+        # so call update() after changing the sessions of a stored schedule.
+        self._by_teacher_day: Dict[Tuple[str, str], List[Tuple[Schedule, Dict]]] = {}
+        self._teacher_day_keys: Dict[str, Set[Tuple[str, str]]] = {}
+        # (start, end, schedule_id) intervals grouped by (room, day), each
+        # list kept sorted by start time.
+        self._by_room_day: Dict[Tuple[str, str], List[Tuple[time, time, str]]] = {}
+        self._room_day_keys: Dict[str, Set[Tuple[str, str]]] = {}
+    
     def _get_key(self, item: Schedule) -> str:
         """Get the unique key for a schedule (its ID)."""
         return item._id
     
+    def _index(self, key: str, item: Schedule) -> None:
+        super()._index(key, item)
+        by_teacher_day = self._by_teacher_day
+        by_room_day = self._by_room_day
+        teacher_keys = set()
+        room_keys = set()
+        for day, sessions in item._schedule.items():
+            for session in sessions:
+                teacher_key = (session['teacher_id'], day)
+                insort(by_teacher_day.setdefault(teacher_key, []), (item, session),
+                       key=_session_start)
+                teacher_keys.add(teacher_key)
+                
+                room_key = (session.get('room', ''), day)
+                insort(by_room_day.setdefault(room_key, []),
+                       (session['_start_t'], session['_end_t'], key))
+                room_keys.add(room_key)
+        self._teacher_day_keys[key] = teacher_keys
+        self._room_day_keys[key] = room_keys
+    
+    def _unindex(self, key: str) -> None:
+        by_teacher_day = self._by_teacher_day
+        for bucket_key in self._teacher_day_keys.pop(key, ()):
+            bucket = [ref for ref in by_teacher_day[bucket_key] if ref[0]._id != key]
+            if bucket:
+                by_teacher_day[bucket_key] = bucket
+            else:
+                del by_teacher_day[bucket_key]
+        by_room_day = self._by_room_day
+        for bucket_key in self._room_day_keys.pop(key, ()):
+            bucket = [interval for interval in by_room_day[bucket_key] if interval[2] != key]
+            if bucket:
+                by_room_day[bucket_key] = bucket
+            else:
+                del by_room_day[bucket_key]
+        super()._unindex(key)
+    
+    def clear(self) -> None:
+        """Remove all schedules from the repository."""
+        super().clear()
+        self._by_teacher_day.clear()
+        self._teacher_day_keys.clear()
+        self._by_room_day.clear()
+        self._room_day_keys.clear()
+    
     def get_schedule_for_class(self, class_id: str) -> Optional[Schedule]:
         """Get the schedule for a specific class."""
-        return next((s for s in self.get_all() if s._class_id == class_id), None)
+        keys = self._indexes['class_id'].get(class_id)
+        return self._storage[next(iter(keys))] if keys else None
     
     def get_teacher_schedule(self, teacher_id: str) -> List[Dict]:
         """Get the schedule for a specific teacher across all classes."""
-        result = {day.value: [] for day in Weekday}
-        
-        for schedule in self.get_all():
-            for day, sessions in schedule._schedule.items():
-                for session in sessions:
-                    if session['teacher_id'] == teacher_id:
-                        result[day].append({
-                            'class_id': schedule._class_id,
-                            'subject': session['subject'],
-                            'start_time': session['start_time'],
-                            'end_time': session['end_time'],
-                            'room': session.get('room', '')
-                        })
+        result = {}
         
-        # Sort each day's sessions by start time
-        for day in result:
-            result[day].sort(key=lambda x: x['start_time'])
+        for day in Weekday:
+            sessions = [
+                {
+                    'class_id': schedule._class_id,
+                    'subject': session['subject'],
+                    'start_time': session['start_time'],
+                    'end_time': session['end_time'],
+                    'room': session.get('room', '')
+                }
+                for schedule, session in self._by_teacher_day.get((teacher_id, day.value), ())
+            ]
+            result[day.value] = sessions
             
         return result
     
@@ -63,32 +145,21 @@ class ScheduleRepository(BaseRepository[Schedule]):
         
         for schedule in self.get_all():
             for session in schedule._schedule.get(day.value, []):
-                if time_slot:
-                    # Check if the time slot overlaps with the session
-                    start = datetime.strptime(session['start_time'], '%H:%M').time()
-                    end = datetime.strptime(session['end_time'], '%H:%M').time()
+                # Skip sessions that do not overlap the requested time slot
+                if time_slot and not (session['_start_t'] <= time_slot < session['_end_t']):
+                    continue
                     
-                    if start <= time_slot < end:
-                        result.append({
-                            'class_id': schedule._class_id,
-                            'subject': session['subject'],
-                            'teacher_id': session['teacher_id'],
-                            'start_time': session['start_time'],
-                            'end_time': session['end_time'],
-                            'room': session.get('room', '')
-                        })
-                else:
-                    result.append({
-                        'class_id': schedule._class_id,
-                        'subject': session['subject'],
-                        'teacher_id': session['teacher_id'],
-                        'start_time': session['start_time'],
-                        'end_time': session['end_time'],
-                        'room': session.get('room', '')
-                    })
+                result.append({
+                    'class_id': schedule._class_id,
+                    'subject': session['subject'],
+                    'teacher_id': session['teacher_id'],
+                    'start_time': session['start_time'],
+                    'end_time': session['end_time'],
+                    'room': session.get('room', '')
+                })
                     
         # Sort by start time
-        result.sort(key=lambda x: x['start_time'])
+        result.sort(key=_by_start_time)
         return result
     
     def get_teacher_availability(self, teacher_id: str, day: Union[Weekday, str]) -> List[Dict]:
@@ -96,18 +167,14 @@ class ScheduleRepository(BaseRepository[Schedule]):
         if isinstance(day, str):
             day = Weekday(day.lower())
             
-        # Get all scheduled sessions for the teacher on this day
-        scheduled_slots = []
-        for schedule in self.get_all():
-            for session in schedule._schedule.get(day.value, []):
-                if session['teacher_id'] == teacher_id:
-                    scheduled_slots.append({
-                        'start': datetime.strptime(session['start_time'], '%H:%M').time(),
-                        'end': datetime.strptime(session['end_time'], '%H:%M').time()
-                    })
-        
-        # Sort scheduled slots by start time
-        scheduled_slots.sort(key=lambda x: x['start'])
+        # Get all scheduled sessions for the teacher on this day, by start time
+        scheduled_slots = [
+            {
+                'start': session['_start_t'],
+                'end': session['_end_t']
+            }
+            for _, session in self._by_teacher_day.get((teacher_id, day.value), ())
+        ]
         
         # Define work hours (8 AM to 5 PM)
         work_start = time(8, 0)
@@ -153,33 +220,14 @@ class ScheduleRepository(BaseRepository[Schedule]):
         if isinstance(day, str):
             day = Weekday(day.lower())
             
-        if exclude_rooms is None:
-            exclude_rooms = []
-            
-        # In a real implementation, we would have a list of all available rooms
-        # For this example, we'll simulate a few rooms
-        all_rooms = ["Room 101", "Room 102", "Room 103", "Room 201", "Room 202", "Lab 1"]
-        available_rooms = set(all_rooms) - set(exclude_rooms)
+        excluded = set(exclude_rooms) if exclude_rooms else ()
+        by_room_day = self._by_room_day
         
-        # Check each room for availability
-        for room in available_rooms:
-            room_available = True
-            
-            for schedule in self.get_all():
-                for session in schedule._schedule.get(day.value, []):
-                    if session.get('room') == room:
-                        session_start = datetime.strptime(session['start_time'], '%H:%M').time()
-                        session_end = datetime.strptime(session['end_time'], '%H:%M').time()
-                        
-                        # Check for time overlap
-                        if not (end_time <= session_start or start_time >= session_end):
-                            room_available = False
-                            break
-                            
-                if not room_available:
-                    break
-                    
-            if room_available:
+        # Check each room for availability, in a stable order
+        for room in _ROOMS:
+            if room in excluded:
+                continue
+            if not _overlaps(by_room_day.get((room, day.value), []), start_time, end_time):
                 return room
                 
         return None
@@ -188,17 +236,22 @@ class ScheduleRepository(BaseRepository[Schedule]):
         """Get all classes scheduled in the next N days."""
         today = date.today()
         result = []
+        # Schedules repeat weekly, so each weekday only needs to be looked up once
+        classes_by_day: Dict[Weekday, List[Dict]] = {}
         
         for i in range(days_ahead + 1):
             current_date = today + timedelta(days=i)
-            day_of_week = Weekday(current_date.strftime('%A').lower())
+            day_of_week = WEEKDAY_BY_INT[current_date.weekday()]
             
             # Get all classes for this day
-            classes = self.get_classes_on_day(day_of_week)
+            classes = classes_by_day.get(day_of_week)
+            if classes is None:
+                classes = classes_by_day[day_of_week] = self.get_classes_on_day(day_of_week)
             
+            date_str = current_date.isoformat()
             for class_info in classes:
                 result.append({
-                    'date': current_date.isoformat(),
+                    'date': date_str,
                     'day': day_of_week.value,
                     'class_id': class_info['class_id'],
                     'subject': class_info['subject'],
@@ -208,8 +261,8 @@ class ScheduleRepository(BaseRepository[Schedule]):
                     'room': class_info.get('room', '')
                 })
         
-        # Sort by date and time
-        result.sort(key=lambda x: (x['date'], x['start_time']))
+        # Dates are visited in order and each day's classes are already sorted
+        # by start time, so the result needs no further sorting
         return result
     
     def get_conflicts(self, 
@@ -234,27 +287,25 @@ class ScheduleRepository(BaseRepository[Schedule]):
             day = Weekday(day.lower())
             
         conflicts = []
+        sessions = self._by_teacher_day.get((teacher_id, day.value), [])
+        # Sessions from this position on start at or after the proposed end
+        stop = bisect_left(sessions, end_time, key=_session_start)
         
-        for schedule in self.get_all():
+        for schedule, session in sessions[:stop]:
             # Skip the class we might be updating
             if exclude_class_id and schedule._class_id == exclude_class_id:
                 continue
                 
-            for session in schedule._schedule.get(day.value, []):
-                if session['teacher_id'] == teacher_id:
-                    session_start = datetime.strptime(session['start_time'], '%H:%M').time()
-                    session_end = datetime.strptime(session['end_time'], '%H:%M').time()
-                    
-                    # Check for time overlap
-                    if not (end_time <= session_start or start_time >= session_end):
-                        conflicts.append({
-                            'class_id': schedule._class_id,
-                            'subject': session['subject'],
-                            'teacher_id': teacher_id,
-                            'existing_start': session_start.strftime('%H:%M'),
-                            'existing_end': session_end.strftime('%H:%M'),
-                            'conflict_start': start_time.strftime('%H:%M'),
-                            'conflict_end': end_time.strftime('%H:%M')
-                        })
-                        
+            # Check for time overlap
+            if start_time < session['_end_t']:
+                conflicts.append({
+                    'class_id': schedule._class_id,
+                    'subject': session['subject'],
+                    'teacher_id': teacher_id,
+                    'existing_start': session['start_time'],
+                    'existing_end': session['end_time'],
+                    'conflict_start': start_time.strftime('%H:%M'),
+                    'conflict_end': end_time.strftime('%H:%M')
+                })
+                
         return conflicts
@@ -1,4 +1,5 @@
-from typing import Dict, List, Optional, Type, TypeVar, Union
+from operator import attrgetter
+from typing import Dict, Iterable, List, Optional, Type, TypeVar, Union
 from ..models.user import User, UserRole
 from ..models.student import Student
 from ..models.teacher import Teacher
@@ -8,77 +9,115 @@ from .base import BaseRepository
 
 T = TypeVar('T', bound=User)
 
+_USER_TYPE: Dict[type, str] = {
+    Student: 'student',
+    Teacher: 'teacher',
+    Parent: 'parent',
+    Admin: 'admin',
+}
+
+
+def _email_key(user: User) -> str:
+    """Get the normalised email used by the email index."""
+    return user._email.lower()
+
+
+def _class_key(user: User) -> Optional[str]:
+    """Get a student's class (their grade, e.g. '9-A'); None for other users."""
+    return getattr(user, '_grade', None)
+
+
 class UserRepository(BaseRepository[User]):
     """Repository for managing User entities and their derived classes."""
     
+    _index_fields = (
+        ('email', _email_key),
+        ('role', attrgetter('_role')),
+        ('class_id', _class_key),
+    )
+    
+    def __init__(self):
+        super().__init__()
+        # Lowercased "name\nemail" per user ID for search_users; refreshed by
+        # add() and update()
+        self._search_blobs: Dict[str, str] = {}
+    
     def _get_key(self, item: User) -> str:
-        """Get the unique key for a user (email)."""
-        if hasattr(item, '_email') and item._email is not None:
-            return str(item._email)
-        # If no email is set (shouldn't happen for valid users), use a temporary key
-        return f"temp_{id(item)}"
+        """Get the unique key for a user (its ID)."""
+        return item._id
+    
+    def _index(self, key: str, item: User) -> None:
+        super()._index(key, item)
+        # The newline keeps a query from matching across the name and email
+        self._search_blobs[key] = f"{item._full_name}\n{item._email}".lower()
+    
+    def _unindex(self, key: str) -> None:
+        self._search_blobs.pop(key, None)
+        super()._unindex(key)
+    
+    def clear(self) -> None:
+        """Remove all users from the repository."""
+        super().clear()
+        self._search_blobs.clear()
+    
+    def get_many(self, ids: Iterable[str]) -> Dict[str, User]:
+        """Get several users by ID in one call; unknown IDs are left out."""
+        storage = self._storage
+        return {user_id: storage[user_id] for user_id in ids if user_id in storage}
     
     def get_by_email(self, email: str) -> Optional[User]:
-        """Get a user by their email address."""
-        return self.get(email)
+        """Get a user by their email address, ignoring case."""
+        keys = self._indexes['email'].get(email.lower())
+        return self._storage[next(iter(keys))] if keys else None
     
     def get_by_role(self, role: Union[UserRole, str]) -> List[User]:
         """Get all users with a specific role."""
         if isinstance(role, str):
             role = UserRole(role.lower())
-        return [user for user in self.get_all() if hasattr(user, '_role') and user._role == role]
+        return self._get_indexed('role', role)
     
     def authenticate(self, email: str, password: str) -> Optional[User]:
         """Authenticate a user by email and password."""
-        user = self.get(email)
+        user = self.get_by_email(email)
         if user and hasattr(user, 'verify_password') and user.verify_password(password):
             return user
         return None
     
     def email_exists(self, email: str) -> bool:
         """Check if a user with the given email already exists."""
-        return self.exists(email)
+        return email.lower() in self._indexes['email']
     
     def get_students(self) -> List[Student]:
         """Get all student users."""
-        return [user for user in self.get_all() if isinstance(user, Student)]
+        return self._get_indexed('role', UserRole.STUDENT)
+    
+    def get_students_by_class(self, class_id: str) -> List[Student]:
+        """Get all students in a class."""
+        return self._get_indexed('class_id', class_id)
     
     def get_teachers(self) -> List[Teacher]:
         """Get all teacher users."""
-        return [user for user in self.get_all() if isinstance(user, Teacher)]
+        return self._get_indexed('role', UserRole.TEACHER)
     
     def get_parents(self) -> List[Parent]:
         """Get all parent users."""
-        return [user for user in self.get_all() if isinstance(user, Parent)]
+        return self._get_indexed('role', UserRole.PARENT)
     
     def get_admins(self) -> List[Admin]:
         """Get all admin users."""
-        return [user for user in self.get_all() if isinstance(user, Admin)]
+        return self._get_indexed('role', UserRole.ADMIN)
     
     def search_users(self, query: str, role: Optional[UserRole] = None) -> List[User]:
         """Search users by name or email, optionally filtered by role."""
         query = query.lower()
-        results = []
+        search_blobs = self._search_blobs
+        
+        # Only users with the requested role need to be checked
+        keys = self._indexes['role'].get(role, ()) if role is not None else self._storage
         
-        for user in self.get_all():
-            # Skip if role filter is provided and doesn't match
-            if role is not None and (not hasattr(user, '_role') or user._role != role):
-                continue
-                
-            # Check if query matches name or email
-            if (query in user._full_name.lower()) or (query in user._email.lower()):
-                results.append(user)
-                
-        return results
+        # Check if query matches name or email
+        return [self._storage[key] for key in keys if query in search_blobs[key]]
     
     def get_user_type(self, user: User) -> str:
         """Get the type of user as a string."""
-        if isinstance(user, Student):
-            return 'student'
-        elif isinstance(user, Teacher):
-            return 'teacher'
-        elif isinstance(user, Parent):
-            return 'parent'
-        elif isinstance(user, Admin):
-            return 'admin'
-        return 'unknown'
+        return _USER_TYPE.get(type(user), 'unknown')
@@ -1,12 +1,81 @@
+import heapq
+import time
+from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any, Union
+from operator import attrgetter
+from typing import Callable, Dict, List, Optional, Any, Tuple, TypeVar, Union
 from ..models.assignment import Assignment, AssignmentStatus, AssignmentDifficulty
 from ..models.grade import Grade, GradeType
 from ..models.notification import Notification, NotificationType, NotificationPriority
-from ..repositories.assignment_repository import AssignmentRepository
+from ..repositories.assignment_repository import AssignmentRepository, ConcurrencyConflict
 from ..repositories.grade_repository import GradeRepository
 from ..repositories.notification_repository import NotificationRepository
 from ..repositories.user_repository import UserRepository
+from .notification_dispatcher import NotificationDispatcher
+
+R = TypeVar('R')
+
+_by_due_ts = attrgetter('_due_date_ts')
+
+# Enum values used in hot loops, resolved once
+_DRAFT_STATUS = AssignmentStatus.DRAFT.value
+_NOTIF_ASSIGNMENT = NotificationType.ASSIGNMENT.value
+_NOTIF_GRADE = NotificationType.GRADE.value
+
+
+@dataclass(slots=True)
+class StudentAssignmentRow:
+    """An assignment as listed for a student, with their submission status."""
+    
+    id: str
+    title: str
+    subject: str
+    due_date: str
+    status: str
+    submission: Optional[Dict]
+    max_points: float
+    difficulty: str
+    description: str
+    teacher_id: str
+    class_id: str
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the row to a dictionary."""
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+@dataclass(slots=True)
+class TeacherAssignmentRow:
+    """An assignment as listed for its teacher, with submission statistics."""
+    
+    id: str
+    title: str
+    subject: str
+    class_id: str
+    due_date: str
+    status: str
+    total_submissions: int
+    graded_submissions: int
+    submission_rate: float
+    max_points: float
+    difficulty: str
+    created_at: str
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the row to a dictionary."""
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+# Attempts to save an assignment before giving up on concurrent writers
+_MAX_UPDATE_ATTEMPTS = 3
+
+# Classes larger than this get one class-wide notification instead of one
+# per student
+_BROADCAST_THRESHOLD = 500
+
+# Student-side statuses that do / do not require a submission
+_SUBMITTED_STATUSES = frozenset(('submitted', 'graded'))
+_UNSUBMITTED_STATUSES = frozenset(('pending', 'overdue'))
 
 class AssignmentService:
     """Service for handling assignment-related operations."""
@@ -21,6 +90,69 @@ class AssignmentService:
         self.grade_repo = grade_repo
         self.user_repo = user_repo
         self.notification_repo = notification_repo
+        
+        # Notifications are created by the repository's shared background
+        # worker so they stay off the request path
+        self._notifier: Optional[NotificationDispatcher] = NotificationDispatcher.acquire(notification_repo)
+    
+    def _queue_notification(self, **fields: Any) -> None:
+        """Queue a notification for the background worker.
+        
+        Args:
+            **fields: Keyword arguments for NotificationRepository.create_notification
+            
+        Raises:
+            RuntimeError: If the service has been closed
+        """
+        if self._notifier is None:
+            raise RuntimeError("AssignmentService is closed")
+        self._notifier.submit(fields)
+    
+    def flush_notifications(self) -> None:
+        """Block until every queued notification has been created."""
+        if self._notifier is not None:
+            self._notifier.flush()
+    
+    def close(self) -> None:
+        """Create any queued notifications and release the background worker."""
+        notifier, self._notifier = self._notifier, None
+        if notifier is not None:
+            notifier.flush()
+            notifier.release()
+    
+    def _update_assignment(self,
+                           assignment_id: str,
+                           change: Callable[[Assignment], R]) -> Tuple[Assignment, R]:
+        """Apply a change to an assignment and save it with optimistic locking.
+        
+        The change is made to a copy of the stored assignment, which replaces
+        it only if no other writer saved it first. Otherwise the assignment
+        is read again and the change re-applied to a fresh copy, up to
+        _MAX_UPDATE_ATTEMPTS times.
+        
+        Args:
+            assignment_id: ID of the assignment to change
+            change: Function that modifies the copy in place
+            
+        Returns:
+            Tuple of the saved assignment and the value returned by `change`
+            
+        Raises:
+            ValueError: If the assignment doesn't exist
+            ConcurrencyConflict: If every attempt lost to a concurrent writer
+        """
+        for attempt in range(_MAX_UPDATE_ATTEMPTS):
+            stored = self.assignment_repo.get(assignment_id)
+            if not stored:
+                raise ValueError("Assignment not found")
+            assignment = stored.copy()
+            result = change(assignment)
+            try:
+                self.assignment_repo.update(assignment, expected_version=stored._version)
+                return assignment, result
+            except ConcurrencyConflict:
+                if attempt == _MAX_UPDATE_ATTEMPTS - 1:
+                    raise
     
     def create_assignment(self,
                          teacher_id: str,
@@ -84,30 +216,39 @@ class AssignmentService:
         # Save to repository
         self.assignment_repo.add(assignment)
         
-        # Notify students (in a real app, this would be done asynchronously)
+        # Notify students
         self._notify_students(assignment)
         
         return assignment
     
     def _notify_students(self, assignment: Assignment) -> None:
-        """Notify students about a new assignment."""
-        # In a real implementation, we would get the list of students in the class
-        # For this example, we'll just create a notification for the assignment
-        notification = self.notification_repo.create_notification(
-            recipient_id=f"class_{assignment._class_id}",  # This would be expanded to individual student IDs
-            title=f"New Assignment: {assignment._title}",
-            message=f"A new assignment has been posted for {assignment._subject}. Due: {assignment._due_date.strftime('%b %d, %Y')}",
-            notification_type=NotificationType.ASSIGNMENT.value,
-            priority=NotificationPriority.HIGH,
-            related_entity_id=assignment._id,
-            related_entity_type='assignment',
-            metadata={
+        """Queue notifications to students about a new assignment.
+        
+        Each student in the class gets their own notification. Classes with no
+        known students or more than _BROADCAST_THRESHOLD students get a single
+        class-wide notification.
+        """
+        fields = {
+            'title': f"New Assignment: {assignment._title}",
+            'message': f"A new assignment has been posted for {assignment._subject}. Due: {assignment._due_date.strftime('%b %d, %Y')}",
+            'notification_type': _NOTIF_ASSIGNMENT,
+            'priority': NotificationPriority.HIGH,
+            'related_entity_id': assignment._id,
+            'related_entity_type': 'assignment',
+            'metadata': {
                 'assignment_id': assignment._id,
-                'due_date': assignment._due_date.isoformat(),
+                'due_date': assignment._due_date_iso,
                 'subject': assignment._subject,
                 'max_points': assignment._max_points
             }
-        )
+        }
+        
+        students = self.user_repo.get_students_by_class(assignment._class_id)
+        if not students or len(students) > _BROADCAST_THRESHOLD:
+            self._queue_notification(recipient_id=f"class_{assignment._class_id}", **fields)
+        else:
+            for student in students:
+                self._queue_notification(recipient_id=student._id, **fields)
     
     def submit_assignment(self,
                          student_id: str,
@@ -130,34 +271,35 @@ class AssignmentService:
         Raises:
             ValueError: If assignment doesn't exist or submission is invalid
         """
-        assignment = self.assignment_repo.get(assignment_id)
-        if not assignment:
-            raise ValueError("Assignment not found")
-            
-        # Check if submission is on time
         submit_time = submit_time or datetime.now()
-        is_late = submit_time > assignment._due_date
-        
-        # Add submission
-        submission_id = assignment.add_submission(
-            student_id=student_id,
-            content=content,
-            submit_time=submit_time,
-            is_late=is_late,
-            attachments=attachments or []
-        )
+        
+        def add_submission(assignment: Assignment) -> Tuple[str, bool]:
+            # Check if submission is on time
+            is_late = submit_time > assignment._due_date
+            
+            # Add submission
+            submission_id = assignment.add_submission(
+                student_id=student_id,
+                content=content,
+                submit_time=submit_time,
+                is_late=is_late,
+                attachments=attachments or []
+            )
+            if submission_id is None:
+                raise ValueError("Assignment is not open for submissions or was already submitted")
+            return submission_id, is_late
         
         # Update assignment in repository
-        self.assignment_repo.update(assignment)
+        assignment, (submission_id, is_late) = self._update_assignment(assignment_id, add_submission)
         
         # Notify teacher
         student = self.user_repo.get(student_id)
         if student:
-            self.notification_repo.create_notification(
+            self._queue_notification(
                 recipient_id=assignment._teacher_id,
                 title=f"New Submission: {assignment._title}",
                 message=f"{student._full_name} has submitted {'late ' if is_late else ''}work for {assignment._title}",
-                notification_type=NotificationType.ASSIGNMENT.value,
+                notification_type=_NOTIF_ASSIGNMENT,
                 priority=NotificationPriority.NORMAL,
                 related_entity_id=assignment_id,
                 related_entity_type='assignment',
@@ -199,16 +341,10 @@ class AssignmentService:
         Raises:
             ValueError: If submission doesn't exist or grade is invalid
         """
-        # In a real implementation, we would look up the submission
-        # For this example, we'll assume we can get the assignment from the submission
-        assignment = None
-        for a in self.assignment_repo.get_all():
-            if submission_id in [s['id'] for s in a._submissions.values()]:
-                assignment = a
-                break
-                
-        if not assignment:
+        found = self.assignment_repo.find_submission(submission_id)
+        if not found:
             raise ValueError("Submission not found")
+        assignment, submission = found
             
         # Validate grade
         if grade < 0 or grade > assignment._max_points:
@@ -218,22 +354,23 @@ class AssignmentService:
         teacher = self.user_repo.get(teacher_id)
         grader_name = graded_by or (teacher._full_name if teacher else "Teacher")
         
-        # Find the submission and update it
-        submission = None
-        for sub in assignment._submissions.values():
-            if sub['id'] == submission_id:
-                submission = sub
-                break
+        student_id = submission['student_id']
+        
+        def record_grade(current: Assignment) -> Dict:
+            # Grade the copy's own record of the submission
+            graded = current.get_submission(student_id)
+            if not graded or graded['id'] != submission_id:
+                raise ValueError("Submission not found")
+            current._mark_graded(graded, grade)
                 
-        if not submission:
-            raise ValueError("Submission not found")
-            
-        # Update submission with grade and feedback
-        submission['grade'] = grade
-        submission['feedback'] = feedback
-        submission['graded_by'] = grader_name
-        submission['graded_at'] = datetime.now()
-        submission['status'] = 'graded'
+            # Add the feedback
+            graded['feedback'] = feedback
+            graded['graded_by'] = grader_name
+            graded['graded_at'] = datetime.now()
+            return graded
+        
+        # Update assignment in repository
+        assignment, submission = self._update_assignment(assignment._id, record_grade)
         
         # Create a grade record
         grade_record = Grade(
@@ -250,15 +387,12 @@ class AssignmentService:
         # Save grade to repository
         self.grade_repo.add(grade_record)
         
-        # Update assignment in repository
-        self.assignment_repo.update(assignment)
-        
         # Notify student
-        self.notification_repo.create_notification(
+        self._queue_notification(
             recipient_id=submission['student_id'],
             title=f"Grade Posted: {assignment._title}",
             message=f"Your submission for {assignment._title} has been graded: {grade}/{assignment._max_points}",
-            notification_type=NotificationType.GRADE.value,
+            notification_type=_NOTIF_GRADE,
             priority=NotificationPriority.HIGH,
             related_entity_id=assignment._id,
             related_entity_type='assignment',
@@ -284,99 +418,142 @@ class AssignmentService:
     def get_student_assignments(self, 
                               student_id: str, 
                               status: Optional[str] = None,
-                              subject: Optional[str] = None) -> List[Dict]:
+                              subject: Optional[str] = None,
+                              limit: Optional[int] = None,
+                              offset: int = 0) -> List[StudentAssignmentRow]:
         """Get assignments for a student with optional filters.
         
         Args:
             student_id: ID of the student
             status: Optional status filter ('pending', 'submitted', 'graded', 'overdue')
             subject: Optional subject filter
+            limit: Optional maximum number of rows to return
+            offset: Number of matching rows to skip, for paging
             
         Returns:
-            List of assignment dictionaries with submission status
+            List of assignment rows with submission status
         """
-        # In a real implementation, we would get the student's class and then assignments
-        # For this example, we'll return all assignments with submission status
-        now = datetime.now()
-        result = []
-        
-        for assignment in self.assignment_repo.get_all():
-            # Skip if subject filter is provided and doesn't match
-            if subject and assignment._subject.lower() != subject.lower():
-                continue
-                
-            submission = next(
-                (s for s in assignment._submissions.values() if s['student_id'] == student_id),
-                None
-            )
+        now_ts = time.time()
+        rows = []
+        if limit == 0:
+            return rows
+        skip = offset
+        status = status.lower() if status else None
+        subject = subject.lower() if subject else None
+        submissions = self.assignment_repo.get_student_submissions(student_id)
+        
+        if status in _SUBMITTED_STATUSES:
+            # Only assignments the student has submitted can match
+            assignments = [a for a in map(self.assignment_repo.get, submissions) if a]
+            assignments.sort(key=_by_due_ts)
+        else:
+            # A student's grade (e.g. '9-A') is their class; without one, fall
+            # back to every assignment
+            student = self.user_repo.get(student_id)
+            class_id = getattr(student, '_grade', None)
+            if class_id is None:
+                assignments = self.assignment_repo.get_all()
+                assignments.sort(key=_by_due_ts)
+            else:
+                # Already in due-date order
+                assignments = self.assignment_repo.get_by_class(class_id)
+                # Also include work the student submitted for other classes
+                others = []
+                for assignment_id in submissions:
+                    assignment = self.assignment_repo.get(assignment_id)
+                    if assignment and assignment._class_id != class_id:
+                        others.append(assignment)
+                if others:
+                    others.sort(key=_by_due_ts)
+                    assignments = list(heapq.merge(assignments, others, key=_by_due_ts))
+        
+        # Filters on the assignment itself are applied up front; only the
+        # status check has to wait for the per-student status
+        if subject:
+            assignments = filter(lambda a: a._subject.lower() == subject, assignments)
+        
+        # Bound once; the loop body runs for every candidate assignment
+        get_submission = submissions.get
+        add_row = rows.append
+        for assignment in assignments:
+            assignment_id = assignment._id
+            submission = get_submission(assignment_id)
             
             # Determine status
-            assignment_status = 'pending'
             if submission:
-                if submission.get('graded_at'):
-                    assignment_status = 'graded'
-                else:
-                    assignment_status = 'submitted'
-            elif assignment._due_date < now:
+                if status in _UNSUBMITTED_STATUSES:
+                    continue
+                assignment_status = 'graded' if submission.get('graded_at') else 'submitted'
+            elif assignment._due_date_ts < now_ts:
                 assignment_status = 'overdue'
+            else:
+                assignment_status = 'pending'
                 
             # Apply status filter if provided
             if status and assignment_status != status:
                 continue
+            # Rows come out in due-date order, so a page is just a slice
+            if skip:
+                skip -= 1
+                continue
                 
-            result.append({
-                'id': assignment._id,
-                'title': assignment._title,
-                'subject': assignment._subject,
-                'due_date': assignment._due_date.isoformat(),
-                'status': assignment_status,
-                'submission': submission,
-                'max_points': assignment._max_points,
-                'difficulty': assignment._difficulty.value,
-                'description': assignment._description,
-                'teacher_id': assignment._teacher_id,
-                'class_id': assignment._class_id
-            })
+            add_row(StudentAssignmentRow(
+                id=assignment_id,
+                title=assignment._title,
+                subject=assignment._subject,
+                due_date=assignment._due_date_iso,
+                status=assignment_status,
+                submission=submission,
+                max_points=assignment._max_points,
+                difficulty=assignment._difficulty_value,
+                description=assignment._description,
+                teacher_id=assignment._teacher_id,
+                class_id=assignment._class_id
+            ))
+            if len(rows) == limit:
+                break
             
-        # Sort by due date (ascending)
-        result.sort(key=lambda x: x['due_date'])
-        return result
+        return rows
     
     def get_teacher_assignments(self, 
                               teacher_id: str,
                               status: Optional[str] = None,
-                              class_id: Optional[str] = None) -> List[Dict]:
+                              class_id: Optional[str] = None,
+                              limit: Optional[int] = None,
+                              offset: int = 0) -> List[TeacherAssignmentRow]:
         """Get assignments created by a teacher with optional filters.
         
         Args:
             teacher_id: ID of the teacher
             status: Optional status filter ('draft', 'published', 'graded', 'overdue')
             class_id: Optional class ID filter
+            limit: Optional maximum number of rows to return
+            offset: Number of matching rows to skip, for paging
             
         Returns:
-            List of assignment dictionaries with submission statistics
+            List of assignment rows with submission statistics
         """
-        now = datetime.now()
-        result = []
+        now_ts = time.time()
+        rows = []
+        if limit == 0:
+            return rows
+        skip = offset
         
-        for assignment in self.assignment_repo.get_all():
-            # Skip if not created by this teacher or doesn't match class filter
-            if assignment._teacher_id != teacher_id:
-                continue
-                
-            if class_id and assignment._class_id != class_id:
-                continue
-                
-            # Calculate submission statistics
+        assignments = self.assignment_repo.get_by_teacher(teacher_id)
+        if class_id:
+            assignments = filter(lambda a: a._class_id == class_id, assignments)
+        
+        add_row = rows.append
+        for assignment in assignments:
+            # Submission statistics
             total_submissions = len(assignment._submissions)
-            graded_submissions = sum(1 for s in assignment._submissions.values() 
-                                   if s.get('status') == 'graded')
+            graded_submissions = assignment._graded_submissions
             
             # Determine status
             assignment_status = 'published'
-            if assignment._status == AssignmentStatus.DRAFT.value:
+            if assignment._status == _DRAFT_STATUS:
                 assignment_status = 'draft'
-            elif assignment._due_date < now and total_submissions > graded_submissions:
+            elif assignment._due_date_ts < now_ts and total_submissions > graded_submissions:
                 assignment_status = 'overdue'
             elif total_submissions == graded_submissions and total_submissions > 0:
                 assignment_status = 'graded'
@@ -384,25 +561,38 @@ class AssignmentService:
             # Apply status filter if provided
             if status and assignment_status != status:
                 continue
+            # Rows come out in due-date order, so a page is just a slice
+            if skip:
+                skip -= 1
+                continue
                 
-            result.append({
-                'id': assignment._id,
-                'title': assignment._title,
-                'subject': assignment._subject,
-                'class_id': assignment._class_id,
-                'due_date': assignment._due_date.isoformat(),
-                'status': assignment_status,
-                'total_submissions': total_submissions,
-                'graded_submissions': graded_submissions,
-                'submission_rate': (total_submissions / 25) * 100,  # Assuming 25 students per class
-                'max_points': assignment._max_points,
-                'difficulty': assignment._difficulty.value,
-                'created_at': assignment._created_at.isoformat()
-            })
+            add_row(TeacherAssignmentRow(
+                id=assignment._id,
+                title=assignment._title,
+                subject=assignment._subject,
+                class_id=assignment._class_id,
+                due_date=assignment._due_date_iso,
+                status=assignment_status,
+                total_submissions=total_submissions,
+                graded_submissions=graded_submissions,
+                submission_rate=(total_submissions / 25) * 100,  # Assuming 25 students per class
+                max_points=assignment._max_points,
+                difficulty=assignment._difficulty_value,
+                created_at=assignment._created_at_iso
+            ))
+            if len(rows) == limit:
+                break
             
-        # Sort by due date (ascending)
-        result.sort(key=lambda x: x['due_date'])
-        return result
+        # The teacher index is kept in due-date order, so rows already are
+        return rows
+    
+    def get_all_assignments(self) -> List[Assignment]:
+        """Get every assignment in a single repository call.
+        
+        Returns:
+            List of all assignments
+        """
+        return self.assignment_repo.get_all()
     
     def get_assignment_details(self, assignment_id: str, user_id: str) -> Optional[Dict]:
         """Get detailed information about an assignment.
@@ -432,11 +622,11 @@ class AssignmentService:
             'subject': assignment._subject,
             'class_id': assignment._class_id,
             'teacher_id': assignment._teacher_id,
-            'due_date': assignment._due_date.isoformat(),
+            'due_date': assignment._due_date_iso,
             'max_points': assignment._max_points,
-            'difficulty': assignment._difficulty.value,
+            'difficulty': assignment._difficulty_value,
             'status': assignment.status,
-            'created_at': assignment._created_at.isoformat(),
+            'created_at': assignment._created_at_iso,
             'attachments': assignment._attachments
         }
         
@@ -447,17 +637,18 @@ class AssignmentService:
             details['average_grade'] = self._calculate_average_grade(assignment)
         # Add submission info if user is the student who submitted
         elif hasattr(user, '_role') and user._role == 'student':
-            submission = next(
-                (s for s in assignment._submissions.values() if s['student_id'] == user_id),
-                None
-            )
+            # Submissions are keyed by student ID
+            submission = assignment._submissions.get(user_id)
             if submission:
                 details['submission'] = submission
                 
         return details
     
     def _calculate_average_grade(self, assignment: Assignment) -> float:
-        """Calculate the average grade for an assignment."""
-        grades = [s.get('grade') for s in assignment._submissions.values() 
-                 if s.get('grade') is not None]
-        return sum(grades) / len(grades) if grades else 0.0
+        """Calculate the average grade for an assignment.
+        
+        Uses the running total and count kept on the assignment, so no
+        submission has to be visited.
+        """
+        count = assignment._graded_submissions
+        return assignment._grade_total / count if count else 0.0
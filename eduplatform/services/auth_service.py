@@ -1,5 +1,15 @@
-from typing import Optional, Dict, Any, Type, Union
-from datetime import datetime, timedelta
+from typing import Optional, Dict, Any, Tuple, Type, Union
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+import base64
+import hashlib
+import hmac
+import json
+import logging
+import secrets
+import threading
+import time
 import jwt
 from ..models.user import User, UserRole
 from ..models.student import Student
@@ -8,6 +18,52 @@ from ..models.parent import Parent
 from ..models.admin import Admin
 from ..repositories.user_repository import UserRepository
 from ..repositories.notification_repository import NotificationRepository
+from ..utils.security import DEFAULT_HASH_COST, hash_password, needs_rehash
+
+logger = logging.getLogger(__name__)
+
+
+def _b64url(data: bytes) -> bytes:
+    """Base64url-encode without padding, as JWS requires."""
+    return base64.urlsafe_b64encode(data).rstrip(b'=')
+
+
+# Number of decoded tokens verify_token keeps, and the most seconds it
+# keeps one (never past the token's own expiry)
+_TOKEN_CACHE_SIZE = 4096
+_TOKEN_CACHE_TTL = 300
+
+# Registrable user types and the keyword fields their constructors take
+# after name, email and password
+_USER_EXTRA_FIELDS = {
+    Student: ('grade',),
+    Teacher: (),
+    Parent: (),
+    Admin: (),
+}
+
+# Notification message templates, as bound str.format methods
+_WELCOME_MESSAGE = "Welcome to EduPlatform, {}! Your account has been successfully created.".format
+_RESET_URL = "https://eduplatform.example.com/reset-password?token={}".format
+_RESET_MESSAGE = "Click the following link to reset your password: {}".format
+_PASSWORD_CHANGED_MESSAGE = ("Your password has been successfully changed. If you didn't make this "
+                             "change, please contact support immediately.")
+_PROFILE_UPDATED_MESSAGE = "Your profile information has been updated successfully."
+
+# Seconds a password reset token stays valid
+_RESET_TOKEN_TTL = 3600
+
+# Every token uses the same header, so its encoded form is computed once
+_JWT_HEADER_B64 = _b64url(b'{"alg":"HS256","typ":"JWT"}')
+
+@dataclass(slots=True)
+class AuthResult:
+    """A successful registration or login."""
+    
+    user: User
+    token: str
+    user_type: str
+
 
 class AuthService:
     """Service for handling authentication and user management."""
@@ -16,19 +72,42 @@ class AuthService:
                  user_repository: UserRepository,
                  notification_repository: NotificationRepository,
                  jwt_secret: str,
-                 jwt_expire_hours: int = 24):
-        """Initialize the auth service with required repositories and configuration."""
+                 jwt_expire_hours: int = 24,
+                 hash_cost: int = DEFAULT_HASH_COST):
+        """Initialize the auth service with required repositories and configuration.
+        
+        hash_cost is the password hashing work factor (scrypt N); stored hashes
+        below it are upgraded on the user's next successful login.
+        """
         self.user_repo = user_repository
         self.notification_repo = notification_repository
         self.jwt_secret = jwt_secret
         self.jwt_expire_hours = jwt_expire_hours
+        self._jwt_key = jwt_secret.encode('utf-8') if isinstance(jwt_secret, str) else jwt_secret
+        # Valid decoded tokens, least recently used first: token -> (payload,
+        # POSIX time the entry expires)
+        self._token_cache: "OrderedDict[str, Tuple[Dict[str, Any], float]]" = OrderedDict()
+        self._token_cache_lock = threading.Lock()
+        # Outstanding password reset tokens: token -> (user_id, expiry POSIX time)
+        self._reset_tokens: Dict[str, Tuple[str, float]] = {}
+        self.hash_cost = hash_cost
+    
+    @property
+    def jwt_expire_hours(self) -> float:
+        """How long issued tokens stay valid, in hours."""
+        return self._jwt_expire_seconds / 3600
+    
+    @jwt_expire_hours.setter
+    def jwt_expire_hours(self, hours: float) -> None:
+        # Stored in seconds so token generation only adds an int
+        self._jwt_expire_seconds = int(hours * 3600)
     
     def register_user(self, 
                      user_type: Type[Union[Student, Teacher, Parent, Admin]],
                      full_name: str,
                      email: str,
                      password: str,
-                     **kwargs) -> Dict[str, Any]:
+                     **kwargs) -> AuthResult:
         """Register a new user.
         
         Args:
@@ -39,91 +118,56 @@ class AuthService:
             **kwargs: Additional fields specific to the user type
             
         Returns:
-            Dictionary containing the created user and auth token
+            AuthResult with the created user, auth token and user type
             
         Raises:
             ValueError: If email is already registered or validation fails
         """
-        print(f"[AUTH] register_user called with: {user_type}, {full_name}, {email}, {kwargs}")
+        logger.debug("Registering %s user %s", user_type.__name__, email)
         
         # Check if email is already registered
-        print(f"[AUTH] Checking if email exists: {email}")
         if self.user_repo.email_exists(email):
-            print(f"[AUTH] Email {email} already exists")
             raise ValueError("Email already registered")
-            
-        print(f"[AUTH] Email {email} is available")
         
         # Create the appropriate user type
-        print(f"[AUTH] Creating user of type: {user_type.__name__}")
-        try:
-            if user_type == Student:
-                if 'grade' not in kwargs:
-                    raise ValueError("Grade is required for student registration")
-                user = Student(full_name, email, password, kwargs['grade'])
-                print(f"[AUTH] Created Student: {user}")
-            elif user_type == Teacher:
-                user = Teacher(full_name, email, password)
-                print(f"[AUTH] Created Teacher: {user}")
-            elif user_type == Parent:
-                user = Parent(full_name, email, password)
-                print(f"[AUTH] Created Parent: {user}")
-            elif user_type == Admin:
-                user = Admin(full_name, email, password)
-                print(f"[AUTH] Created Admin: {user}")
-            else:
-                raise ValueError(f"Invalid user type: {user_type.__name__}")
-        except Exception as e:
-            print(f"[AUTH] Error creating user: {str(e)}")
-            print(f"[AUTH] Exception type: {type(e).__name__}")
-            raise
+        extra_fields = _USER_EXTRA_FIELDS.get(user_type)
+        if extra_fields is None:
+            raise ValueError(f"Invalid user type: {user_type.__name__}")
+        for field in extra_fields:
+            if field not in kwargs:
+                raise ValueError(f"{field.capitalize()} is required for {user_type.__name__.lower()} registration")
+        user = user_type(full_name, email, password, *[kwargs[field] for field in extra_fields])
         
         # Add any additional profile information
-        print("[AUTH] Adding additional profile information")
         if 'phone' in kwargs:
             user._phone = kwargs['phone']
-            print(f"[AUTH] Set phone: {kwargs['phone']}")
         if 'address' in kwargs:
             user._address = kwargs['address']
-            print(f"[AUTH] Set address: {kwargs['address']}")
         
         # Save the user
-        print("[AUTH] Adding user to repository")
-        try:
-            self.user_repo.add(user)
-            print("[AUTH] User added to repository successfully")
-        except Exception as e:
-            print(f"[AUTH] Error adding user to repository: {str(e)}")
-            print(f"[AUTH] Exception type: {type(e).__name__}")
-            raise
+        self.user_repo.add(user)
+        logger.debug("Registered user %s", user._id)
         
         # Send welcome notification
-        print("[AUTH] Sending welcome notification")
-        welcome_message = f"Welcome to EduPlatform, {full_name}! Your account has been successfully created."
+        welcome_message = _WELCOME_MESSAGE(full_name)
         try:
             # Use the user's ID as the recipient ID instead of email
-            notification = self.notification_repo.create_notification(
+            self.notification_repo.create_notification(
                 recipient_id=user._id,  # Use the user's ID instead of email
                 title="Welcome to EduPlatform",
                 message=welcome_message,
                 notification_type="system"
             )
-            print(f"[AUTH] Created notification: {notification}")
-        except Exception as e:
-            print(f"[AUTH] Error creating notification: {str(e)}")
-            print(f"[AUTH] Exception type: {type(e).__name__}")
+        except Exception:
             # Don't fail registration if notification fails
+            logger.exception("Failed to create welcome notification for %s", user._id)
         
         # Generate auth token
         token = self._generate_token(user)
         
-        return {
-            'user': user,
-            'token': token,
-            'user_type': self.user_repo.get_user_type(user)
-        }
+        return AuthResult(user=user, token=token, user_type=self.user_repo.get_user_type(user))
     
-    def login(self, email: str, password: str) -> Optional[Dict[str, Any]]:
+    def login(self, email: str, password: str) -> Optional[AuthResult]:
         """Authenticate a user and return user data with auth token.
         
         Args:
@@ -131,20 +175,22 @@ class AuthService:
             password: User's password
             
         Returns:
-            Dictionary with user data and token if authentication succeeds, None otherwise
+            AuthResult with the user, auth token and user type if authentication
+            succeeds, None otherwise
         """
         user = self.user_repo.authenticate(email, password)
         if not user:
             return None
             
+        # Upgrade hashes made with an older scheme or a lower work factor
+        if needs_rehash(user._password_hash, self.hash_cost):
+            user._password_hash, user._salt = hash_password(password, self.hash_cost)
+            self.user_repo.update(user)
+            
         # Generate auth token
         token = self._generate_token(user)
         
-        return {
-            'user': user,
-            'token': token,
-            'user_type': self.user_repo.get_user_type(user)
-        }
+        return AuthResult(user=user, token=token, user_type=self.user_repo.get_user_type(user))
     
     def reset_password_request(self, email: str) -> bool:
         """Initiate a password reset request.
@@ -159,23 +205,33 @@ class AuthService:
         if user:
             # In a real implementation, we would generate a reset token and send an email
             # For this example, we'll just create a notification
-            reset_token = f"reset_{len(str(hash(str(datetime.now()))))[-10:]}"
-            reset_url = f"https://eduplatform.example.com/reset-password?token={reset_token}"
+            reset_token = "reset_" + secrets.token_urlsafe(24)
+            reset_url = _RESET_URL(reset_token)
+            now = time.time()
+            expires_at = now + _RESET_TOKEN_TTL
+            self._purge_reset_tokens(now)
+            self._reset_tokens[reset_token] = (user._id, expires_at)
             
             self.notification_repo.create_notification(
                 recipient_id=email,
                 title="Password Reset Request",
-                message=f"Click the following link to reset your password: {reset_url}",
+                message=_RESET_MESSAGE(reset_url),
                 notification_type="system",
                 metadata={
                     'reset_token': reset_token,
-                    'expires_at': (datetime.now() + timedelta(hours=1)).isoformat()
+                    'expires_at': datetime.fromtimestamp(expires_at).isoformat()
                 }
             )
             
         # Always return True to avoid revealing whether the email exists
         return True
     
+    def _purge_reset_tokens(self, now: float) -> None:
+        """Drop reset tokens that expired before `now`."""
+        expired = [token for token, (_, expires_at) in self._reset_tokens.items() if expires_at < now]
+        for token in expired:
+            del self._reset_tokens[token]
+    
     def reset_password(self, token: str, new_password: str) -> bool:
         """Reset a user's password using a valid reset token.
         
@@ -186,50 +242,87 @@ class AuthService:
         Returns:
             bool: True if password was reset successfully, False if token is invalid
         """
-        # In a real implementation, we would validate the token and its expiration
-        # For this example, we'll just check if it starts with 'reset_'
-        if not token.startswith('reset_'):
+        # Tokens are single-use, so the entry is removed whatever the outcome
+        entry = self._reset_tokens.pop(token, None)
+        if entry is None or entry[1] < time.time():
             return False
             
-        # Extract user ID from token (in a real app, this would be more secure)
-        user_email = token.split('_')[-1]
-        user = self.user_repo.get_by_email(user_email)
-        
+        user = self.user_repo.get(entry[0])
         if not user:
             return False
             
         # Update password
-        user._password_hash, user._salt = user._hash_password(new_password)
+        user._password_hash, user._salt = hash_password(new_password, self.hash_cost)
         self.user_repo.update(user)
         
         # Notify user of password change
         self.notification_repo.create_notification(
-            recipient_id=user_email,
+            recipient_id=user._email,
             title="Password Changed",
-            message="Your password has been successfully changed. If you didn't make this change, please contact support immediately.",
+            message=_PASSWORD_CHANGED_MESSAGE,
             notification_type="security"
         )
         
         return True
     
     def _generate_token(self, user: User) -> str:
-        """Generate a JWT token for the user."""
+        """Generate an HS256 JWT token for the user.
+        
+        The token is signed directly with hmac rather than through
+        jwt.encode; the result is a standard JWT that jwt.decode accepts.
+        """
         payload = {
             'user_id': user._email,  # Using email as user ID
             'role': user._role.value if hasattr(user, '_role') else 'user',
-            'exp': datetime.utcnow() + timedelta(hours=self.jwt_expire_hours)
+            'exp': int(time.time()) + self._jwt_expire_seconds
         }
         
-        return jwt.encode(payload, self.jwt_secret, algorithm='HS256')
+        signing_input = _JWT_HEADER_B64 + b'.' + _b64url(
+            json.dumps(payload, separators=(',', ':')).encode('utf-8'))
+        signature = hmac.new(self._jwt_key, signing_input, hashlib.sha256).digest()
+        return (signing_input + b'.' + _b64url(signature)).decode('ascii')
     
     def verify_token(self, token: str) -> Optional[Dict[str, Any]]:
-        """Verify a JWT token and return the decoded payload if valid."""
-        try:
-            payload = jwt.decode(token, self.jwt_secret, algorithms=['HS256'])
-            return payload
-        except jwt.ExpiredSignatureError:
+        """Verify a JWT token and return the decoded payload if valid.
+        
+        Valid tokens are cached until they expire or for _TOKEN_CACHE_TTL
+        seconds, whichever comes first, so a token presented again is not
+        decoded again. Invalid tokens are never cached. Every call returns
+        its own copy of the payload.
+        """
+        now = time.time()
+        cache = self._token_cache
+        with self._token_cache_lock:
+            cached = cache.get(token)
+            if cached is not None:
+                payload, expires_at = cached
+                if expires_at > now:
+                    cache.move_to_end(token)
+                    return dict(payload)
+                del cache[token]
+        
+        payload = self._decode_token(token)
+        if payload is None:
             return None
-        except jwt.InvalidTokenError:
+        expires_at = now + _TOKEN_CACHE_TTL
+        exp = payload.get('exp')
+        if exp is not None:
+            if exp <= now:
+                return None
+            expires_at = min(expires_at, exp)
+        
+        with self._token_cache_lock:
+            cache[token] = (payload, expires_at)
+            cache.move_to_end(token)
+            if len(cache) > _TOKEN_CACHE_SIZE:
+                cache.popitem(last=False)
+        return dict(payload)
+    
+    def _decode_token(self, token: str) -> Optional[Dict[str, Any]]:
+        """Decode and verify a JWT token, returning None if it is invalid or expired."""
+        try:
+            return jwt.decode(token, self.jwt_secret, algorithms=['HS256'])
+        except jwt.InvalidTokenError:  # Includes ExpiredSignatureError
             return None
     
     def get_current_user(self, token: str) -> Optional[User]:
@@ -261,7 +354,9 @@ class AuthService:
         Raises:
             ValueError: If email is already taken by another user
         """
-        if email and email != user._email and self.user_repo.email_exists(email):
+        # email_exists is an index lookup that ignores case, so only check
+        # addresses that differ from the user's own beyond case
+        if email and email.lower() != user._email.lower() and self.user_repo.email_exists(email):
             raise ValueError("Email already in use by another account")
             
         if full_name:
@@ -279,7 +374,7 @@ class AuthService:
         self.notification_repo.create_notification(
             recipient_id=user._email,
             title="Profile Updated",
-            message="Your profile information has been updated successfully.",
+            message=_PROFILE_UPDATED_MESSAGE,
             notification_type="account"
         )
         
@@ -1,9 +1,12 @@
 """
 Service for exporting application data to various formats.
 """
+import json
 import os
+from concurrent.futures import ThreadPoolExecutor
+from operator import attrgetter, itemgetter
 from datetime import datetime
-from typing import Dict, List, Any, Optional, Union, Type, TypeVar, cast
+from typing import TYPE_CHECKING, Dict, List, Any, Optional, Union, Type, TypeVar, cast
 from pathlib import Path
 
 from ..models.user import User
@@ -14,11 +17,34 @@ from ..models.admin import Admin
 from ..models.assignment import Assignment, AssignmentStatus
 from ..models.grade import Grade, GradeType
 from ..models.notification import Notification, NotificationType
-from ..utils.export_utils import ExportUtils
 from .auth_service import AuthService
 from .assignment_service import AssignmentService
 from .grade_service import GradeService
 
+if TYPE_CHECKING:
+    # Imported on first export instead
+    from ..utils.export_utils import ExportUtils
+
+# Characters in names that can't appear in export file names as-is
+_FILENAME_CHARS = str.maketrans({' ': '_', '/': '_', '\\': '_'})
+
+# Columns of the class grade export, and the grade dict keys they come from
+# after the leading student ID and name
+_CLASS_GRADE_FIELDS = ('student_id', 'student_name', 'subject', 'type', 'score', 'max_score',
+                       'percentage', 'letter_grade', 'comments', 'date')
+_class_grade_values = itemgetter('subject', 'type', 'score', 'max_score',
+                                 'percentage', 'letter_grade', 'comments', 'created_at')
+
+# Notification attributes exported, read in one C-level call per notification
+_notification_fields = attrgetter('_id', '_title', '_message', '_type', '_priority', '_is_read',
+                                  '_created_at', '_related_entity_id', '_related_entity_type')
+
+def _json_default(value: Any) -> Any:
+    """Serialize values json doesn't handle natively (datetimes)."""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
 class ExportService:
     """Service for exporting application data to various formats."""
     
@@ -30,7 +56,9 @@ class ExportService:
         self.auth_service = auth_service
         self.assignment_service = assignment_service
         self.grade_service = grade_service
-        self.export_utils = ExportUtils()
+        self._export_utils: Optional["ExportUtils"] = None
+        # Each dataset goes to its own file, so they are written concurrently
+        self._io_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix='export')
     
     def export_user_data(self, 
                         user_id: str,
@@ -41,10 +69,11 @@ class ExportService:
         Args:
             user_id: ID of the user to export data for
             output_dir: Directory to save exported files
-            format: Export format ('xlsx', 'csv', or 'sqlite')
+            format: Export format ('xlsx', 'csv', 'sqlite', 'feather' or 'parquet')
             
         Returns:
-            Dict with paths to exported files
+            Dict with paths to exported files; for 'sqlite' every dataset
+            maps to the same database, with the table names in the manifest
             
         Raises:
             ValueError: If user not found or export fails
@@ -57,8 +86,8 @@ class ExportService:
         if not user:
             raise ValueError(f"User with ID {user_id} not found")
         
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        base_filename = f"{user._full_name.replace(' ', '_')}_{timestamp}"
+        timestamp = self._now_strftime()
+        base_filename = f"{user._full_name.translate(_FILENAME_CHARS)}_{timestamp}"
         
         # Prepare export data
         export_data = {
@@ -69,26 +98,7 @@ class ExportService:
         }
         
         # Export to specified format
-        result = {}
-        for data_type, data in export_data.items():
-            if not data:
-                continue
-                
-            filename = f"{base_filename}_{data_type}.{format}"
-            output_path = os.path.join(output_dir, filename)
-            
-            try:
-                exported_path = self.export_utils.export_data(
-                    data=data,
-                    output_path=output_path,
-                    format=format,
-                    sheet_name=data_type.replace('_', ' ').title()
-                )
-                result[data_type] = exported_path
-            except Exception as e:
-                # Continue with other exports if one fails
-                print(f"Warning: Failed to export {data_type}: {str(e)}")
-                continue
+        result = self._export_datasets(export_data, output_dir, base_filename, format)
         
         # Create a manifest file
         manifest = {
@@ -96,18 +106,13 @@ class ExportService:
                 'user_id': user_id,
                 'user_name': user._full_name,
                 'timestamp': timestamp,
-                'exported_data': list(result.keys()),
-                'file_paths': result
+                'exported_data': list(result),
+                'file_paths': result,
+                **self._manifest_tables(result, format)
             }
         }
         
-        # Save manifest
-        manifest_path = os.path.join(output_dir, f"{base_filename}_manifest.json")
-        with open(manifest_path, 'w') as f:
-            import json
-            json.dump(manifest, f, indent=2)
-        
-        result['manifest'] = manifest_path
+        result['manifest'] = self._write_manifest(output_dir, base_filename, manifest)
         return result
     
     def export_class_data(self,
@@ -119,10 +124,11 @@ class ExportService:
         Args:
             class_id: ID of the class to export data for
             output_dir: Directory to save exported files
-            format: Export format ('xlsx', 'csv', or 'sqlite')
+            format: Export format ('xlsx', 'csv', 'sqlite', 'feather' or 'parquet')
             
         Returns:
-            Dict with paths to exported files
+            Dict with paths to exported files; for 'sqlite' every dataset
+            maps to the same database, with the table names in the manifest
             
         Raises:
             ValueError: If class not found or export fails
@@ -130,14 +136,14 @@ class ExportService:
         # In a real implementation, we would get all students in the class
         # For this example, we'll just get all users and filter by role
         users = self.auth_service.user_repo.get_all()
-        students = [u for u in users if isinstance(u, Student)]
+        students = [u for u in users if type(u) is Student]
         
         if not students:
             raise ValueError(f"No students found in class {class_id}")
         
         # Ensure output directory exists
         os.makedirs(output_dir, exist_ok=True)
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        timestamp = self._now_strftime()
         base_filename = f"class_{class_id}_{timestamp}"
         
         # Prepare class data
@@ -152,29 +158,21 @@ class ExportService:
         if hasattr(self.assignment_service, 'get_assignments_by_class'):
             assignments = self.assignment_service.get_assignments_by_class(class_id)
         
-        # Get grades for each student
+        # Add student info
+        student_names = {}
         for student in students:
-            # Add student info
             student_info = self._prepare_user_info(student)
             student_info['class_id'] = class_id
             class_data['students'].append(student_info)
+            student_names[student._id] = student._full_name
             
-            # Get student grades
-            grades = self.grade_service.get_student_grades(student._id)
-            for grade in grades:
-                grade_record = {
-                    'student_id': student._id,
-                    'student_name': student._full_name,
-                    'subject': grade.get('subject'),
-                    'type': grade.get('type'),
-                    'score': grade.get('score'),
-                    'max_score': grade.get('max_score'),
-                    'percentage': grade.get('percentage'),
-                    'letter_grade': grade.get('letter_grade'),
-                    'comments': grade.get('comments'),
-                    'date': grade.get('created_at')
-                }
-                class_data['grades'].append(grade_record)
+        # Get every student's grades in one pass and project the exported
+        # columns with a single itemgetter call per grade
+        class_data['grades'] = [
+            dict(zip(_CLASS_GRADE_FIELDS,
+                     (grade['student_id'], student_names[grade['student_id']], *_class_grade_values(grade))))
+            for grade in self.grade_service.get_grades_for_students(student_names, iso=False)
+        ]
         
         # Add assignment data
         for assignment in assignments:
@@ -182,54 +180,30 @@ class ExportService:
                 'assignment_id': getattr(assignment, '_id', ''),
                 'title': getattr(assignment, '_title', ''),
                 'subject': getattr(assignment, '_subject', ''),
-                'due_date': getattr(assignment, '_due_date', ''),
+                'due_date': getattr(assignment, '_due_date_iso', ''),
                 'max_points': getattr(assignment, '_max_points', 0),
-                'difficulty': getattr(assignment, '_difficulty', ''),
+                'difficulty': getattr(assignment, '_difficulty_value', ''),
                 'status': getattr(assignment, '_status', '')
             }
             class_data['assignments'].append(assignment_data)
         
         # Export to specified format
-        result = {}
-        for data_type, data in class_data.items():
-            if not data:
-                continue
-                
-            filename = f"{base_filename}_{data_type}.{format}"
-            output_path = os.path.join(output_dir, filename)
-            
-            try:
-                exported_path = self.export_utils.export_data(
-                    data=data,
-                    output_path=output_path,
-                    format=format,
-                    sheet_name=data_type.replace('_', ' ').title()
-                )
-                result[data_type] = exported_path
-            except Exception as e:
-                # Continue with other exports if one fails
-                print(f"Warning: Failed to export {data_type}: {str(e)}")
-                continue
+        result = self._export_datasets(class_data, output_dir, base_filename, format)
         
         # Create a manifest file
         manifest = {
             'export': {
                 'class_id': class_id,
                 'timestamp': timestamp,
-                'exported_data': list(result.keys()),
+                'exported_data': list(result),
                 'student_count': len(students),
                 'assignment_count': len(assignments),
-                'file_paths': result
+                'file_paths': result,
+                **self._manifest_tables(result, format)
             }
         }
         
-        # Save manifest
-        manifest_path = os.path.join(output_dir, f"{base_filename}_manifest.json")
-        with open(manifest_path, 'w') as f:
-            import json
-            json.dump(manifest, f, indent=2)
-        
-        result['manifest'] = manifest_path
+        result['manifest'] = self._write_manifest(output_dir, base_filename, manifest)
         return result
     
     def export_school_data(self,
@@ -239,25 +213,28 @@ class ExportService:
         
         Args:
             output_dir: Directory to save exported files
-            format: Export format ('xlsx', 'csv', or 'sqlite')
+            format: Export format ('xlsx', 'csv', 'sqlite', 'feather' or 'parquet')
             
         Returns:
-            Dict with paths to exported files
+            Dict with paths to exported files; for 'sqlite' every dataset
+            maps to the same database, with the table names in the manifest
             
         Raises:
             ValueError: If export fails
         """
         # Ensure output directory exists
         os.makedirs(output_dir, exist_ok=True)
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        timestamp = self._now_strftime()
         base_filename = f"school_export_{timestamp}"
         
         # Get all data
-        users = self.auth_service.user_repo.get_all()
-        students = [u for u in users if isinstance(u, Student)]
-        teachers = [u for u in users if isinstance(u, Teacher)]
-        parents = [u for u in users if isinstance(u, Parent)]
-        admins = [u for u in users if isinstance(u, Admin)]
+        # Sort users into per-type buckets in a single pass
+        buckets: Dict[type, List[User]] = {Student: [], Teacher: [], Parent: [], Admin: []}
+        for user in self.auth_service.user_repo.get_all():
+            bucket = buckets.get(type(user))
+            if bucket is not None:
+                bucket.append(user)
+        students, teachers, parents, admins = buckets.values()
         
         # Prepare data for export
         export_data = {
@@ -267,41 +244,15 @@ class ExportService:
             'admins': [self._prepare_user_info(u) for u in admins],
         }
         
-        # Get assignments and grades if available
-        if hasattr(self.assignment_service, 'get_all_assignments'):
-            assignments = self.assignment_service.get_all_assignments()
-            export_data['assignments'] = [
-                self._prepare_assignment_data(a) for a in assignments
-            ]
-        
-        # Get all grades
-        all_grades = []
-        for student in students:
-            grades = self.grade_service.get_student_grades(student._id)
-            all_grades.extend(grades)
+        # Get all assignments and grades with one bulk call each
+        export_data['assignments'] = [
+            self._prepare_assignment_data(a) for a in self.assignment_service.get_all_assignments()
+        ]
+        all_grades = self.grade_service.get_all_grades(iso=False)
         export_data['grades'] = all_grades
         
         # Export to specified format
-        result = {}
-        for data_type, data in export_data.items():
-            if not data:
-                continue
-                
-            filename = f"{base_filename}_{data_type}.{format}"
-            output_path = os.path.join(output_dir, filename)
-            
-            try:
-                exported_path = self.export_utils.export_data(
-                    data=data,
-                    output_path=output_path,
-                    format=format,
-                    sheet_name=data_type.replace('_', ' ').title()
-                )
-                result[data_type] = exported_path
-            except Exception as e:
-                # Continue with other exports if one fails
-                print(f"Warning: Failed to export {data_type}: {str(e)}")
-                continue
+        result = self._export_datasets(export_data, output_dir, base_filename, format)
         
         # Create a manifest file
         manifest = {
@@ -312,22 +263,154 @@ class ExportService:
                 'teacher_count': len(teachers),
                 'parent_count': len(parents),
                 'admin_count': len(admins),
-                'assignment_count': len(export_data.get('assignments', [])),
+                'assignment_count': len(export_data['assignments']),
                 'grade_count': len(all_grades),
-                'exported_data': list(result.keys()),
-                'file_paths': result
+                'exported_data': list(result),
+                'file_paths': result,
+                **self._manifest_tables(result, format)
             }
         }
         
-        # Save manifest
-        manifest_path = os.path.join(output_dir, f"{base_filename}_manifest.json")
-        with open(manifest_path, 'w') as f:
-            import json
-            json.dump(manifest, f, indent=2)
+        result['manifest'] = self._write_manifest(output_dir, base_filename, manifest)
+        return result
+    
+    def close(self) -> None:
+        """Wait for running exports to finish and stop the worker threads."""
+        self._io_pool.shutdown()
+    
+    @property
+    def export_utils(self) -> "ExportUtils":
+        """The export writers, imported on first use."""
+        if self._export_utils is None:
+            from ..utils.export_utils import ExportUtils
+            self._export_utils = ExportUtils()
+        return self._export_utils
+    
+    @export_utils.setter
+    def export_utils(self, export_utils: "ExportUtils") -> None:
+        self._export_utils = export_utils
+    
+    def _export_datasets(self,
+                         datasets: Dict[str, Union[Dict[str, Any], List[Dict[str, Any]]]],
+                         output_dir: str,
+                         base_filename: str,
+                         format: str) -> Dict[str, str]:
+        """Export each non-empty dataset to its own file in parallel.
+        
+        SQLite exports instead write every dataset as a table of one database
+        file (see _export_sqlite_datasets).
         
-        result['manifest'] = manifest_path
+        Args:
+            datasets: Rows (or a single record) to export, keyed by data type
+            output_dir: Directory to save exported files
+            base_filename: Prefix for the exported file names
+            format: Export format ('xlsx', 'csv', 'sqlite', 'feather' or 'parquet')
+            
+        Returns:
+            Dict mapping each successfully exported data type to its file path
+        """
+        if format == 'sqlite':
+            return self._export_sqlite_datasets(
+                datasets, f"{os.path.join(output_dir, base_filename)}.sqlite")
+        
+        prefix = os.path.join(output_dir, base_filename) + '_'
+        futures = {
+            data_type: self._io_pool.submit(
+                self.export_utils.export_data,
+                # A single record (such as user_info) is exported as one row
+                data=[data] if isinstance(data, dict) else data,
+                output_path=f"{prefix}{data_type}.{format}",
+                format=format,
+                # Only the Excel writer takes a sheet name
+                **({'sheet_name': data_type.replace('_', ' ').title()} if format == 'xlsx' else {})
+            )
+            for data_type, data in datasets.items() if data
+        }
+        
+        # Start with every key so filling in paths never grows the dict
+        result = dict.fromkeys(futures)
+        for data_type, future in futures.items():
+            try:
+                result[data_type] = future.result()
+            except Exception as e:
+                # Continue with other exports if one fails
+                print(f"Warning: Failed to export {data_type}: {str(e)}")
+                del result[data_type]
+        return result
+    
+    def _export_sqlite_datasets(self,
+                                datasets: Dict[str, Union[Dict[str, Any], List[Dict[str, Any]]]],
+                                output_path: str) -> Dict[str, str]:
+        """Export each non-empty dataset as a table of one SQLite database.
+        
+        A single connection is opened for the whole export. SQLite
+        connections belong to one thread, so the tables are written in turn.
+        
+        Args:
+            datasets: Rows (or a single record) to export, keyed by data type
+            output_path: Path of the SQLite database
+            
+        Returns:
+            Dict mapping each successfully exported data type to the database path
+        """
+        export_utils = self.export_utils
+        result = {}
+        conn = export_utils.connect_sqlite(output_path)
+        try:
+            for data_type, data in datasets.items():
+                if not data:
+                    continue
+                try:
+                    result[data_type] = export_utils.export_data(
+                        data=[data] if isinstance(data, dict) else data,
+                        output_path=output_path,
+                        format='sqlite',
+                        table_name=data_type,
+                        connection=conn
+                    )
+                except Exception as e:
+                    # Continue with other exports if one fails
+                    print(f"Warning: Failed to export {data_type}: {str(e)}")
+        finally:
+            conn.close()
         return result
     
+    @staticmethod
+    def _manifest_tables(result: Dict[str, str], format: str) -> Dict[str, Dict[str, str]]:
+        """Get the manifest entry naming each dataset's table in a SQLite export.
+        
+        Returns:
+            {'tables': {data_type: table_name}} for 'sqlite' exports, else {}
+        """
+        if format != 'sqlite':
+            return {}
+        # _export_sqlite_datasets names each table after its data type
+        return {'tables': {data_type: data_type for data_type in result}}
+    
+    def _now_strftime(self) -> str:
+        """Get the current time as the timestamp used in export file names."""
+        return datetime.now().strftime('%Y%m%d_%H%M%S')
+    
+    def _write_manifest(self, output_dir: str, base_filename: str, manifest: Dict[str, Any]) -> str:
+        """Write an export manifest as indented JSON.
+        
+        The document is serialized in one json.dumps call and its ASCII bytes
+        are written with a single binary write, bypassing the text layer's
+        encoder; datetimes are stored in ISO format.
+        
+        Args:
+            output_dir: Directory to write the manifest to
+            base_filename: Export base name; '_manifest.json' is appended
+            manifest: Manifest contents
+            
+        Returns:
+            Path to the manifest file
+        """
+        manifest_path = os.path.join(output_dir, f"{base_filename}_manifest.json")
+        Path(manifest_path).write_bytes(
+            json.dumps(manifest, indent=2, default=_json_default).encode('ascii'))
+        return manifest_path
+    
     # Helper methods for data preparation
     
     def _prepare_user_info(self, user: User) -> Dict[str, Any]:
@@ -335,33 +418,33 @@ class ExportService:
         if not user:
             return {}
             
+        # Every attribute read here is set by the user constructors
+        try:
+            role = user._role.value
+        except AttributeError:
+            role = 'user'
+            
         user_data = {
-            'id': getattr(user, '_id', ''),
-            'full_name': getattr(user, '_full_name', ''),
-            'email': getattr(user, '_email', ''),
-            'role': getattr(user, '_role', '').value if hasattr(user, '_role') else 'user',
-            'created_at': getattr(user, '_created_at', '').isoformat() if hasattr(user, '_created_at') else ''
+            'id': user._id,
+            'full_name': user._full_name,
+            'email': user._email,
+            'role': role,
+            'created_at': user._created_at or ''  # Already an ISO string
         }
         
         # Add role-specific fields
         if isinstance(user, Student):
-            user_data.update({
-                'grade': getattr(user, '_grade', ''),
-                'subjects': ', '.join(getattr(user, '_subjects', {}).keys())
-            })
+            user_data['grade'] = user._grade
+            user_data['subjects'] = ', '.join(user._subjects)
         elif isinstance(user, Teacher):
-            user_data.update({
-                'subjects': ', '.join(getattr(user, '_subjects', [])),
-                'classes': ', '.join(getattr(user, '_classes', []))
-            })
+            user_data['subjects'] = ', '.join(user._subjects)
+            user_data['classes'] = ', '.join(user._classes)
         elif isinstance(user, Parent):
-            children = getattr(user, '_children', [])
-            user_data['children_count'] = len(children)
+            user_data['children_count'] = len(user._children)
             
         # Add contact information if available
-        if hasattr(user, '_phone'):
+        if isinstance(user, User):
             user_data['phone'] = user._phone
-        if hasattr(user, '_address'):
             user_data['address'] = user._address
             
         return user_data
@@ -370,7 +453,7 @@ class ExportService:
         """Prepare assignment data for a user."""
         try:
             if hasattr(self.assignment_service, 'get_student_assignments'):
-                return self.assignment_service.get_student_assignments(user_id)
+                return [row.to_dict() for row in self.assignment_service.get_student_assignments(user_id)]
             return []
         except Exception:
             return []
@@ -385,21 +468,19 @@ class ExportService:
     def _prepare_user_notifications(self, user_id: str) -> List[Dict[str, Any]]:
         """Prepare notification data for a user."""
         try:
-            notifications = self.auth_service.notification_repo.get_user_notifications(
-                user_id=user_id,
-                unread_only=False
-            )
+            notifications = self.auth_service.notification_repo.iter_user_notifications(user_id)
             return [{
-                'id': n._id,
-                'title': n._title,
-                'message': n._message,
-                'type': n._type.value,
-                'priority': n._priority.value,
-                'is_read': n._is_read,
-                'created_at': n._created_at.isoformat(),
-                'related_entity_id': n._related_entity_id,
-                'related_entity_type': n._related_entity_type
-            } for n in notifications]
+                'id': id_,
+                'title': title,
+                'message': message,
+                'type': type_.value,
+                'priority': priority.value,
+                'is_read': is_read,
+                'created_at': created_at.isoformat(),
+                'related_entity_id': related_id,
+                'related_entity_type': related_type
+            } for (id_, title, message, type_, priority, is_read, created_at, related_id, related_type)
+                in map(_notification_fields, notifications)]
         except Exception:
             return []
     
@@ -409,16 +490,16 @@ class ExportService:
             return {}
             
         return {
-            'id': getattr(assignment, '_id', ''),
-            'title': getattr(assignment, '_title', ''),
-            'description': getattr(assignment, '_description', ''),
-            'subject': getattr(assignment, '_subject', ''),
-            'teacher_id': getattr(assignment, '_teacher_id', ''),
-            'class_id': getattr(assignment, '_class_id', ''),
-            'due_date': getattr(assignment, '_due_date', '').isoformat() if hasattr(assignment, '_due_date') else '',
-            'max_points': getattr(assignment, '_max_points', 0),
-            'difficulty': getattr(assignment, '_difficulty', '').value if hasattr(assignment, '_difficulty') else '',
-            'status': getattr(assignment, '_status', '').value if hasattr(assignment, '_status') else '',
-            'created_at': getattr(assignment, '_created_at', '').isoformat() if hasattr(assignment, '_created_at') else '',
-            'submission_count': len(getattr(assignment, '_submissions', {}))
+            'id': assignment._id,
+            'title': assignment._title,
+            'description': assignment._description,
+            'subject': assignment._subject,
+            'teacher_id': assignment._teacher_id,
+            'class_id': assignment._class_id,
+            'due_date': assignment._due_date_iso,
+            'max_points': assignment._max_points,
+            'difficulty': assignment._difficulty_value,
+            'status': assignment._status,  # Stored as the status value
+            'created_at': assignment._created_at_iso,
+            'submission_count': len(assignment._submissions)
         }
@@ -1,5 +1,5 @@
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any, Union, Tuple
+from typing import Dict, Iterable, List, Optional, Any, Union, Tuple
 from collections import defaultdict
 import statistics
 
@@ -8,6 +8,7 @@ from ..models.notification import Notification, NotificationType, NotificationPr
 from ..repositories.grade_repository import GradeRepository
 from ..repositories.user_repository import UserRepository
 from ..repositories.notification_repository import NotificationRepository
+from .notification_dispatcher import NotificationDispatcher
 
 class GradeService:
     """Service for handling grade-related operations."""
@@ -20,6 +21,13 @@ class GradeService:
         self.grade_repo = grade_repo
         self.user_repo = user_repo
         self.notification_repo = notification_repo
+        # Report cards by (student_id, term), with the student's grade version
+        # they were built from (see GradeRepository.get_student_version)
+        self._report_cache: Dict[Tuple[str, Optional[str]], Tuple[int, Dict[str, Any]]] = {}
+        
+        # New-grade notifications are created by the repository's shared
+        # background worker so recording a grade doesn't wait on them
+        self._notifier: Optional[NotificationDispatcher] = NotificationDispatcher.acquire(notification_repo)
     
     def record_grade(self,
                     student_id: str,
@@ -48,14 +56,69 @@ class GradeService:
         Raises:
             ValueError: If validation fails
         """
+        grade = self._build_grade(
+            student_id=student_id,
+            subject=subject,
+            grade_type=grade_type,
+            score=score,
+            teacher_id=teacher_id,
+            max_score=max_score,
+            assignment_id=assignment_id,
+            comments=comments
+        )
+        
+        notifier = self._require_notifier()
+        
+        # Save to repository
+        self.grade_repo.add(grade)
+        
+        # Notify student and parents in the background
+        notifier.submit(grade, self._notify_grades_recorded)
+        
+        return grade
+    
+    def record_grades_bulk(self, entries: Iterable[Dict[str, Any]]) -> List[Grade]:
+        """Record many grades at once, e.g. the results of a class exam.
+        
+        Every entry is validated before anything is stored, the grades are
+        added in one repository call, and their notifications are queued
+        for the background worker, which creates them in batches.
+        
+        Args:
+            entries: Keyword arguments for record_grade, one dictionary per grade
+            
+        Returns:
+            The created Grade objects, in entry order
+            
+        Raises:
+            ValueError: If any entry fails validation (no grade is recorded)
+        """
+        grades = [self._build_grade(**entry) for entry in entries]
+        notifier = self._require_notifier()
+        self.grade_repo.bulk_add(grades)
+        
+        for grade in grades:
+            notifier.submit(grade, self._notify_grades_recorded)
+            
+        return grades
+    
+    @staticmethod
+    def _build_grade(student_id: str,
+                     subject: str,
+                     grade_type: Union[str, GradeType],
+                     score: float,
+                     teacher_id: str,
+                     max_score: float = 100.0,
+                     assignment_id: Optional[str] = None,
+                     comments: str = '') -> Grade:
+        """Validate grade fields and build a Grade without storing it."""
         if score < 0 or score > max_score:
             raise ValueError(f"Score must be between 0 and {max_score}")
             
         if isinstance(grade_type, str):
             grade_type = GradeType(grade_type.upper())
             
-        # Create the grade record
-        grade = Grade(
+        return Grade(
             student_id=student_id,
             subject=subject,
             grade_type=grade_type,
@@ -65,68 +128,101 @@ class GradeService:
             assignment_id=assignment_id,
             comments=comments
         )
+    
+    def _require_notifier(self) -> NotificationDispatcher:
+        """Get the notification dispatcher, failing if the service is closed."""
+        if self._notifier is None:
+            raise RuntimeError("GradeService is closed")
+        return self._notifier
+    
+    def _notify_grades_recorded(self, grades: List[Grade]) -> List[Dict[str, Any]]:
+        """Build the notifications for a batch of newly recorded grades.
         
-        # Save to repository
-        self.grade_repo.add(grade)
-        
-        # Notify student and parents
-        self._notify_grade_recorded(grade)
+        Called by the dispatcher's worker with every grade queued in a batch.
+        """
+        # Each student and teacher is looked up once for the whole batch
+        user_ids = {grade._student_id for grade in grades}
+        user_ids.update(grade._teacher_id for grade in grades)
+        users = self.user_repo.get_many(user_ids)
         
-        return grade
+        payloads = []
+        for grade in grades:
+            payloads.extend(self._grade_recorded_notifications(
+                grade, users.get(grade._student_id), users.get(grade._teacher_id)))
+        return payloads
     
-    def _notify_grade_recorded(self, grade: Grade) -> None:
-        """Send notifications about a newly recorded grade."""
-        student = self.user_repo.get(grade._student_id)
-        teacher = self.user_repo.get(grade._teacher_id)
+    def flush_notifications(self) -> None:
+        """Block until notifications for every recorded grade have been created."""
+        if self._notifier is not None:
+            self._notifier.flush()
+    
+    def close(self) -> None:
+        """Create any queued notifications and release the background worker."""
+        notifier, self._notifier = self._notifier, None
+        if notifier is not None:
+            notifier.flush()
+            notifier.release()
+    
+    def _grade_recorded_notifications(self, grade: Grade, student, teacher) -> List[Dict[str, Any]]:
+        """Build the notifications for a newly recorded grade.
         
+        Returns:
+            create_notification keyword arguments for the student and each of
+            their parents; empty if the student or teacher doesn't exist
+        """
         if not student or not teacher:
-            return
+            return []
             
+        # Compute the shared values once for the student and every parent
+        subject = grade._subject
+        percentage = grade.percentage
+        grade_type = grade._type.value
+        metadata = {
+            'subject': subject,
+            'score': grade._score,
+            'max_score': grade._max_score,
+            'percentage': percentage,
+            'letter_grade': grade.letter_grade,
+            'type': grade_type,
+            'teacher_name': teacher._full_name,
+            'recorded_at': grade._created_at.isoformat()
+        }
+        
         # Notify student
-        self.notification_repo.create_notification(
+        payloads = [dict(
             recipient_id=student._id,
-            title=f"New Grade in {grade._subject}",
-            message=f"You received {grade.percentage}% on a {grade._type.value} in {grade._subject}.",
+            title=f"New Grade in {subject}",
+            message=f"You received {percentage}% on a {grade_type} in {subject}.",
             notification_type=NotificationType.GRADE.value,
             priority=NotificationPriority.NORMAL,
             related_entity_id=grade._id,
             related_entity_type='grade',
-            metadata={
-                'subject': grade._subject,
-                'score': grade._score,
-                'max_score': grade._max_score,
-                'percentage': grade.percentage,
-                'letter_grade': grade.letter_grade,
-                'type': grade._type.value,
-                'teacher_name': teacher._full_name,
-                'recorded_at': grade._created_at.isoformat()
-            }
-        )
+            metadata=metadata
+        )]
         
         # Notify parents if student is a minor
         if hasattr(student, '_parent_ids') and student._parent_ids:
+            parent_title = f"Grade Update for {student._full_name}"
+            parent_message = f"{student._first_name} received {percentage}% on a {grade_type} in {subject}."
+            parent_metadata = {
+                'student_id': student._id,
+                'student_name': student._full_name,
+                **metadata
+            }
             for parent_id in student._parent_ids:
-                self.notification_repo.create_notification(
+                payloads.append(dict(
                     recipient_id=parent_id,
-                    title=f"Grade Update for {student._full_name}",
-                    message=f"{student._first_name} received {grade.percentage}% on a {grade._type.value} in {grade._subject}.",
+                    title=parent_title,
+                    message=parent_message,
                     notification_type=NotificationType.GRADE.value,
                     priority=NotificationPriority.NORMAL,
                     related_entity_id=grade._id,
                     related_entity_type='grade',
-                    metadata={
-                        'student_id': student._id,
-                        'student_name': student._full_name,
-                        'subject': grade._subject,
-                        'score': grade._score,
-                        'max_score': grade._max_score,
-                        'percentage': grade.percentage,
-                        'letter_grade': grade.letter_grade,
-                        'type': grade._type.value,
-                        'teacher_name': teacher._full_name,
-                        'recorded_at': grade._created_at.isoformat()
-                    }
-                )
+                    # Each notification gets its own copy of the metadata
+                    metadata=dict(parent_metadata)
+                ))
+                
+        return payloads
     
     def update_grade(self,
                    grade_id: str,
@@ -167,6 +263,7 @@ class GradeService:
         if comments is not None:
             grade._comments = comments
             
+        grade._clear_score_cache()
         grade._updated_at = datetime.now()
         
         # Save changes
@@ -179,8 +276,9 @@ class GradeService:
     
     def _notify_grade_updated(self, grade: Grade) -> None:
         """Send notifications about a grade update."""
-        student = self.user_repo.get(grade._student_id)
-        teacher = self.user_repo.get(grade._teacher_id)
+        users = self.user_repo.get_many((grade._student_id, grade._teacher_id))
+        student = users.get(grade._student_id)
+        teacher = users.get(grade._teacher_id)
         
         if not student or not teacher:
             return
@@ -239,30 +337,57 @@ class GradeService:
         if end_date:
             grades = [g for g in grades if g._created_at <= end_date]
             
-        # Convert to dictionary format with additional metadata
-        result = []
-        for grade in grades:
-            teacher = self.user_repo.get(grade._teacher_id)
-            result.append({
-                'id': grade._id,
-                'subject': grade._subject,
-                'type': grade._type.value,
-                'score': grade._score,
-                'max_score': grade._max_score,
-                'percentage': grade.percentage,
-                'letter_grade': grade.letter_grade,
-                'gpa_points': grade.gpa_points,
-                'comments': grade._comments,
-                'teacher_id': grade._teacher_id,
-                'teacher_name': teacher._full_name if teacher else 'Unknown',
-                'assignment_id': grade._assignment_id,
-                'created_at': grade._created_at.isoformat(),
-                'updated_at': grade._updated_at.isoformat() if grade._updated_at else None
-            })
+        # Convert to dictionary format with additional metadata; the
+        # repository already returns grades newest first
+        teacher_names = self._get_teacher_names(grades)
+        return [
+            grade.get_grade_details(teacher_names.get(grade._teacher_id, 'Unknown'))
+            for grade in grades
+        ]
+    
+    def get_grades_for_students(self, student_ids: Iterable[str], iso: bool = True) -> List[Dict]:
+        """Get the grades of several students at once.
+        
+        Args:
+            student_ids: IDs of the students
+            iso: Whether to give timestamps as ISO strings; exports pass False
+                to receive datetimes and let the writer format them
             
-        # Sort by creation date (newest first)
-        result.sort(key=lambda x: x['created_at'], reverse=True)
-        return result
+        Returns:
+            List of grade dictionaries (newest first), in the same format as
+            get_student_grades plus the student's ID
+        """
+        grades = self.grade_repo.get_grades_for_students(student_ids)
+        teacher_names = self._get_teacher_names(grades)
+        return [
+            grade.get_grade_details(teacher_names.get(grade._teacher_id, 'Unknown'),
+                                    include_student_id=True, iso=iso)
+            for grade in grades
+        ]
+    
+    def get_all_grades(self, iso: bool = True) -> List[Dict]:
+        """Get every grade in a single repository pass.
+        
+        Args:
+            iso: Whether to give timestamps as ISO strings; exports pass False
+                to receive datetimes and let the writer format them
+            
+        Returns:
+            List of grade dictionaries (newest first), in the same format as
+            get_grades_for_students
+        """
+        grades = self.grade_repo.get_all_grades()
+        teacher_names = self._get_teacher_names(grades)
+        return [
+            grade.get_grade_details(teacher_names.get(grade._teacher_id, 'Unknown'),
+                                    include_student_id=True, iso=iso)
+            for grade in grades
+        ]
+    
+    def _get_teacher_names(self, grades: Iterable[Grade]) -> Dict[str, str]:
+        """Fetch the names of the given grades' teachers with a single lookup."""
+        teachers = self.user_repo.get_many({grade._teacher_id for grade in grades})
+        return {teacher_id: teacher._full_name for teacher_id, teacher in teachers.items()}
     
     def get_class_grades(self,
                        class_id: str,
@@ -281,48 +406,35 @@ class GradeService:
         if isinstance(grade_type, str):
             grade_type = GradeType(grade_type.upper())
             
-        grades_by_student = self.grade_repo.get_class_grades(
-            class_id=class_id,
+        # Join the class roster to the grades through the repository indexes
+        students = {student._id: student for student in self.user_repo.get_students_by_class(class_id)}
+        grades_by_student = self.grade_repo.get_grades_by_student(
+            students,
             subject=subject,
             grade_type=grade_type
         )
         
+        # Look up every teacher once for the whole class
+        teacher_names = self._get_teacher_names(
+            grade for grades in grades_by_student.values() for grade in grades)
+        
         # Convert to dictionary format with additional metadata
         result = {}
         for student_id, grades in grades_by_student.items():
-            student = self.user_repo.get(student_id)
-            if not student:
-                continue
-                
-            student_grades = []
-            for grade in grades:
-                teacher = self.user_repo.get(grade._teacher_id)
-                student_grades.append({
-                    'id': grade._id,
-                    'subject': grade._subject,
-                    'type': grade._type.value,
-                    'score': grade._score,
-                    'max_score': grade._max_score,
-                    'percentage': grade.percentage,
-                    'letter_grade': grade.letter_grade,
-                    'gpa_points': grade.gpa_points,
-                    'comments': grade._comments,
-                    'teacher_id': grade._teacher_id,
-                    'teacher_name': teacher._full_name if teacher else 'Unknown',
-                    'assignment_id': grade._assignment_id,
-                    'created_at': grade._created_at.isoformat(),
-                    'updated_at': grade._updated_at.isoformat() if grade._updated_at else None
-                })
-                
-            # Sort by creation date (newest first)
-            student_grades.sort(key=lambda x: x['created_at'], reverse=True)
+            student = students[student_id]
+            # Already newest first
+            student_grades = [
+                grade.get_grade_details(teacher_names.get(grade._teacher_id, 'Unknown'))
+                for grade in grades
+            ]
+            average_grade, gpa = self._aggregate(grades)
             
             result[student_id] = {
                 'student_id': student_id,
                 'student_name': student._full_name,
                 'grades': student_grades,
-                'average_grade': self._calculate_average_grade(grades),
-                'gpa': self._calculate_gpa(grades)
+                'average_grade': average_grade,
+                'gpa': gpa
             }
             
         return result
@@ -368,17 +480,21 @@ class GradeService:
         """
         return self.grade_repo.get_subject_statistics(subject)
     
-    def _calculate_average_grade(self, grades: List[Grade]) -> float:
-        """Calculate the average grade from a list of grades."""
-        if not grades:
-            return 0.0
-        return sum(g.percentage for g in grades) / len(grades)
-    
-    def _calculate_gpa(self, grades: List[Grade]) -> float:
-        """Calculate GPA from a list of grades."""
-        if not grades:
-            return 0.0
-        return sum(g.gpa_points for g in grades) / len(grades)
+    def _aggregate(self, grades: List[Grade]) -> Tuple[float, float]:
+        """Calculate the average percentage and GPA of grades in one pass.
+        
+        Returns:
+            Tuple of (average percentage, GPA); both 0.0 for no grades
+        """
+        count = len(grades)
+        if not count:
+            return 0.0, 0.0
+        total_percentage = 0.0
+        total_gpa = 0.0
+        for grade in grades:
+            total_percentage += grade.percentage
+            total_gpa += grade.gpa_points
+        return total_percentage / count, total_gpa / count
     
     def generate_report_card(self, 
                           student_id: str,
@@ -390,12 +506,26 @@ class GradeService:
             term: Optional term/semester (e.g., 'Fall 2023')
             
         Returns:
-            Dictionary with report card data
+            Dictionary with report card data. The contents are cached until
+            the student's grades change; each call gets its own copy of the
+            top-level dictionary, stamped with a fresh 'generated_at'
         """
-        # Get all grades for the student
-        grades = self.grade_repo.get_student_grades(student_id)
+        cache_key = (student_id, term)
+        version = self.grade_repo.get_student_version(student_id)
+        cached = self._report_cache.get(cache_key)
+        if cached is not None and cached[0] == version:
+            report_card = cached[1]
+        else:
+            report_card = self._build_report_card(student_id, term)
+            self._report_cache[cache_key] = (version, report_card)
+        return {**report_card, 'generated_at': datetime.now().isoformat()}
+    
+    def _build_report_card(self, student_id: str, term: Optional[str]) -> Dict[str, Any]:
+        """Build a report card from the student's current grades."""
+        # Get the student's grades, grouped by subject and newest first
+        subjects = self.grade_repo.get_student_grades_by_subject(student_id)
         
-        if not grades:
+        if not subjects:
             return {
                 'student_id': student_id,
                 'term': term or 'Current Term',
@@ -404,21 +534,13 @@ class GradeService:
                 'generated_at': datetime.now().isoformat()
             }
         
-        # Group by subject
-        subjects = {}
-        for grade in grades:
-            if grade._subject not in subjects:
-                subjects[grade._subject] = []
-            subjects[grade._subject].append(grade)
-        
         # Calculate subject averages and GPAs
         subject_data = []
         for subject, subject_grades in subjects.items():
-            avg_grade = self._calculate_average_grade(subject_grades)
-            gpa = self._calculate_gpa(subject_grades)
+            avg_grade, gpa = self._aggregate(subject_grades)
             
-            # Get most recent grade for letter grade
-            latest_grade = max(subject_grades, key=lambda g: g._created_at)
+            # Use the most recent grade for the letter grade
+            latest_grade = subject_grades[0]
             
             subject_data.append({
                 'subject': subject,
@@ -435,15 +557,14 @@ class GradeService:
             })
         
         # Calculate overall GPA
-        overall_gpa = self._calculate_gpa(grades)
+        overall_average, overall_gpa = self._aggregate(
+            [grade for subject_grades in subjects.values() for grade in subject_grades])
         
         return {
             'student_id': student_id,
             'term': term or 'Current Term',
             'subjects': subject_data,
             'gpa': overall_gpa,
-            'letter_grade': Grade.percentage_to_letter_grade(
-                self._calculate_average_grade(grades)
-            ),
+            'letter_grade': Grade.percentage_to_letter_grade(overall_average),
             'generated_at': datetime.now().isoformat()
         }
@@ -0,0 +1,157 @@
+import logging
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from ..repositories.notification_repository import NotificationRepository
+
+logger = logging.getLogger(__name__)
+
+# Queued items are handled in batches of up to _BATCH_SIZE, waiting at most
+# _BATCH_WAIT seconds for a batch to fill
+_BATCH_SIZE = 128
+_BATCH_WAIT = 0.05
+
+# Turns a batch of queued items into create_notification keyword arguments
+Builder = Callable[[List[Any]], Iterable[Dict[str, Any]]]
+
+# Queued by close() to stop the worker once everything before it is handled
+_STOP = object()
+
+
+class NotificationDispatcher:
+    """Creates notifications for the services on one background thread.
+
+    Services get the dispatcher of their notification repository with
+    acquire() and give it back with release(), so however many services
+    share a repository, a single worker writes to it.
+    """
+
+    _shared: Dict[NotificationRepository, "NotificationDispatcher"] = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self, notification_repo: NotificationRepository):
+        """Start a dispatcher writing to the given repository."""
+        self.notification_repo = notification_repo
+        self._users = 0
+        self._closed = False
+        self._queue: "queue.Queue[Any]" = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name='notifications', daemon=True)
+        self._thread.start()
+
+    @classmethod
+    def acquire(cls, notification_repo: NotificationRepository) -> "NotificationDispatcher":
+        """Get the shared dispatcher for a repository, starting it if needed.
+
+        Args:
+            notification_repo: Repository the notifications are stored in
+
+        Returns:
+            The repository's dispatcher; pass it to release() when done
+        """
+        with cls._shared_lock:
+            dispatcher = cls._shared.get(notification_repo)
+            if dispatcher is None:
+                dispatcher = cls._shared[notification_repo] = cls(notification_repo)
+            dispatcher._users += 1
+            return dispatcher
+
+    def release(self) -> None:
+        """Give back a dispatcher from acquire(); the last user closes it."""
+        with self._shared_lock:
+            self._users -= 1
+            if self._users > 0:
+                return
+            if self._shared.get(self.notification_repo) is self:
+                del self._shared[self.notification_repo]
+        self.close()
+
+    def submit(self, item: Any, build: Optional[Builder] = None) -> None:
+        """Queue a notification for the worker.
+
+        Args:
+            item: create_notification keyword arguments, or any value that
+                `build` turns into them
+            build: Called by the worker with every queued item of a batch
+                that shares it, so related lookups can be done once per batch
+
+        Raises:
+            RuntimeError: If the dispatcher has been closed
+        """
+        if self._closed:
+            raise RuntimeError("Notification dispatcher is closed")
+        self._queue.put((build, item))
+
+    def flush(self) -> None:
+        """Block until every queued notification has been handled."""
+        self._queue.join()
+
+    def close(self) -> None:
+        """Handle the queued notifications, then stop the worker thread."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join()
+
+    def _run(self) -> None:
+        """Handle queued items in batches until close() is called."""
+        notify_queue = self._queue
+        running = True
+        while running:
+            batch: List[Tuple[Optional[Builder], Any]] = []
+            entry = notify_queue.get()
+            deadline = time.monotonic() + _BATCH_WAIT
+            while True:
+                if entry is _STOP:
+                    running = False
+                    notify_queue.task_done()
+                    break
+                batch.append(entry)
+                remaining = deadline - time.monotonic()
+                if len(batch) >= _BATCH_SIZE or remaining <= 0:
+                    break
+                try:
+                    entry = notify_queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+
+            try:
+                if batch:
+                    self._handle(batch)
+            finally:
+                for _ in batch:
+                    notify_queue.task_done()
+
+    def _handle(self, batch: List[Tuple[Optional[Builder], Any]]) -> None:
+        """Build and store the notifications for one batch."""
+        # Group the items by builder, keeping their order
+        groups: Dict[Optional[Builder], List[Any]] = {}
+        for build, item in batch:
+            groups.setdefault(build, []).append(item)
+
+        payloads: List[Dict[str, Any]] = []
+        for build, items in groups.items():
+            if build is None:
+                payloads.extend(items)
+                continue
+            try:
+                payloads.extend(build(items))
+            except Exception:
+                logger.exception("Failed to build notifications for %d items", len(items))
+        if payloads:
+            self._store(payloads)
+
+    def _store(self, payloads: List[Dict[str, Any]]) -> None:
+        """Store a batch of notifications."""
+        try:
+            self.notification_repo.bulk_create(payloads)
+        except Exception:
+            # bulk_create stores nothing on failure, so retry one at a time to
+            # keep a single bad notification from dropping the whole batch
+            for fields in payloads:
+                try:
+                    self.notification_repo.create_notification(**fields)
+                except Exception:
+                    logger.exception("Failed to create notification for %s", fields.get('recipient_id'))
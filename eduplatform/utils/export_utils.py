@@ -5,28 +5,103 @@ import os
 import csv
 import sqlite3
 from datetime import datetime
-from typing import Dict, List, Any, Optional, Union, Type, TypeVar
+from functools import lru_cache, partial
+from itertools import chain, islice
+from operator import is_not
+from typing import Dict, Iterable, List, Any, Optional, Union, Type, TypeVar
 from pathlib import Path
 
-import pandas as pd
-from openpyxl import Workbook
-from openpyxl.styles import Font, Alignment
-
 # Type variable for generic type hints
 T = TypeVar('T')
 
+_is_not_none = partial(is_not, None)
+
+# ExportUtils method that writes each supported export format
+_FORMAT_WRITERS = {
+    'xlsx': 'to_xlsx',
+    'csv': 'to_csv',
+    'sqlite': 'to_sqlite',
+    'feather': 'to_feather',
+    'parquet': 'to_parquet',
+}
+
+# Write buffer for streamed CSV exports
+_CSV_BUFFER_SIZE = 1 << 20
+
+# Rows held in memory at a time when streaming an iterable: XLSX column
+# widths are measured on the first batch, SQLite inserts one batch per call
+_STREAM_BATCH_SIZE = 10_000
+
+# Declared SQLite column types by Python type (bool before int, as bool
+# is a subclass of int); other values get no declared type
+_SQLITE_TYPES = ((bool, 'INTEGER'), (int, 'INTEGER'), (float, 'REAL'),
+                 (str, 'TEXT'), (datetime, 'TIMESTAMP'), (bytes, 'BLOB'))
+
+
+def _sqlite_type(value: Any) -> str:
+    """Get the declared SQLite column type for a sample value."""
+    for python_type, sqlite_type in _SQLITE_TYPES:
+        if isinstance(value, python_type):
+            return sqlite_type
+    return ''
+
+
+def _sqlite_value(value: Any) -> Any:
+    """Convert a value to one sqlite3 can store; datetimes become strings."""
+    return str(value) if isinstance(value, datetime) else value
+
+
+def _column_names(rows: List[Dict[str, Any]]) -> List[Any]:
+    """Get the keys of all rows in order of first appearance."""
+    # Rows usually share one schema, which a key-view comparison confirms
+    # without hashing every key again
+    first_keys = rows[0].keys()
+    if all(row.keys() == first_keys for row in rows):
+        return list(first_keys)
+    return list(dict.fromkeys(key for row in rows for key in row))
+
+
+def _to_arrow_table(rows: List[Dict[str, Any]]):
+    """Build a pyarrow Table with one column per key, missing values as nulls."""
+    import pyarrow
+    return pyarrow.table({column: [row.get(column) for row in rows] for column in _column_names(rows)})
+
+
+@lru_cache(maxsize=None)
+def _polars():
+    """Get the optional polars module, or None when it is not installed."""
+    try:
+        import polars
+    except ImportError:
+        return None
+    return polars
+
+
+def _to_polars_frame(polars, rows: List[Dict[str, Any]]):
+    """Build a polars DataFrame with one column per key, missing values as nulls."""
+    return polars.from_dicts(rows, schema=_column_names(rows), infer_schema_length=None)
+
+
+def _quote_identifier(name: str) -> str:
+    """Quote a table or column name for use in SQL."""
+    return '"' + str(name).replace('"', '""') + '"'
+
 class ExportUtils:
     """Utility class for exporting data to various formats."""
     
     @staticmethod
-    def to_xlsx(data: List[Dict[str, Any]], 
+    def to_xlsx(data: Iterable[Dict[str, Any]], 
                output_path: str, 
                sheet_name: str = 'Data',
                include_index: bool = False) -> str:
         """Export data to an Excel (XLSX) file.
         
+        Rows are streamed to the file, so data can be a generator. For
+        iterables other than lists, columns come from the first row and
+        column widths are measured on the first batch of rows.
+        
         Args:
-            data: List of dictionaries containing the data to export
+            data: Dictionaries containing the data to export
             output_path: Path to save the Excel file
             sheet_name: Name of the worksheet
             include_index: Whether to include an index column
@@ -36,61 +111,69 @@ class ExportUtils:
             
         Raises:
             ValueError: If data is empty or invalid
+            ImportError: If openpyxl is not installed
             IOError: If file cannot be written
         """
-        if not data:
+        records = iter(data)
+        first = next(records, None)
+        if first is None:
             raise ValueError("No data to export")
+        from openpyxl import Workbook
+        from openpyxl.cell import WriteOnlyCell
+        from openpyxl.styles import Font, Alignment
+        from openpyxl.utils import get_column_letter
             
         try:
             # Ensure the output directory exists
             output_dir = os.path.dirname(output_path)
             if output_dir:
                 os.makedirs(output_dir, exist_ok=True)
-                
-            # Create a DataFrame and save to Excel
-            df = pd.DataFrame(data)
-            
-            # Create a Pandas Excel writer using openpyxl as the engine
-            with pd.ExcelWriter(
-                output_path, 
-                engine='openpyxl',
-                mode='w',
-                datetime_format='YYYY-MM-DD HH:MM:SS',
-                date_format='YYYY-MM-DD'
-            ) as writer:
-                df.to_excel(
-                    writer, 
-                    sheet_name=sheet_name[:31],  # Excel sheet name max 31 chars
-                    index=include_index,
-                    freeze_panes=(1, 0)  # Freeze header row
-                )
-                
-                # Get the workbook and worksheet objects
-                workbook = writer.book
-                worksheet = writer.sheets[sheet_name[:31]]
-                
-                # Format header
-                header_font = Font(bold=True)
-                for cell in worksheet[1]:
-                    cell.font = header_font
-                    cell.alignment = Alignment(horizontal='center')
-                
-                # Auto-adjust column widths
-                for column in worksheet.columns:
-                    max_length = 0
-                    column_letter = column[0].column_letter
-                    
-                    # Find the maximum length of content in the column
-                    for cell in column:
-                        try:
-                            if len(str(cell.value)) > max_length:
-                                max_length = len(str(cell.value))
-                        except:
-                            pass
-                    
-                    # Set column width with a little extra space
-                    adjusted_width = (max_length + 2) * 1.1
-                    worksheet.column_dimensions[column_letter].width = min(adjusted_width, 50)  # Max width 50
+            
+            # Columns in order of first appearance, like a DataFrame built from the rows
+            columns: List[Any] = _column_names(data) if isinstance(data, list) else list(first)
+            
+            # Convert the rows with C-level lookups (no per-cell Python code)
+            records = chain((first,), records)
+            if include_index:
+                keys = tuple(columns)
+                rows = ([index, *map(row.get, keys)] for index, row in enumerate(records))
+                columns.insert(0, None)
+            else:
+                rows = (list(map(row.get, columns)) for row in records)
+            
+            # Measure each column's widest value, header included, on every
+            # row of a list or on the first batch of any other iterable
+            sample = list(rows) if isinstance(data, list) else list(islice(rows, _STREAM_BATCH_SIZE))
+            widths = [
+                max(len(str(column)) if column is not None else 0,
+                    max(map(len, map(str, filter(_is_not_none, values))), default=0))
+                for column, values in zip(columns, zip(*sample))
+            ]
+            
+            # A write-only workbook streams rows straight to the file
+            workbook = Workbook(write_only=True)
+            worksheet = workbook.create_sheet(sheet_name[:31])  # Excel sheet name max 31 chars
+            worksheet.freeze_panes = 'A2'  # Freeze header row
+            
+            # Column widths must be set before any row is written
+            for i, width in enumerate(widths, start=1):
+                # Set column width with a little extra space
+                worksheet.column_dimensions[get_column_letter(i)].width = min((width + 2) * 1.1, 50)  # Max width 50
+            
+            # Format header
+            header_font = Font(bold=True)
+            header_alignment = Alignment(horizontal='center')
+            header = []
+            for column in columns:
+                cell = WriteOnlyCell(worksheet, column)
+                cell.font = header_font
+                cell.alignment = header_alignment
+                header.append(cell)
+            worksheet.append(header)
+            
+            for values in chain(sample, rows):
+                worksheet.append(values)
+            workbook.save(output_path)
             
             return output_path
             
@@ -98,17 +181,23 @@ class ExportUtils:
             raise IOError(f"Failed to export to Excel: {str(e)}")
     
     @staticmethod
-    def to_csv(data: List[Dict[str, Any]], 
+    def to_csv(data: Iterable[Dict[str, Any]], 
               output_path: str,
               delimiter: str = ',',
-              encoding: str = 'utf-8') -> str:
+              encoding: str = 'utf-8',
+              fieldnames: Optional[List[str]] = None) -> str:
         """Export data to a CSV file.
         
+        Rows are streamed to the file, so data can be a generator.
+        
         Args:
-            data: List of dictionaries containing the data to export
+            data: Dictionaries containing the data to export
             output_path: Path to save the CSV file
             delimiter: Field delimiter
             encoding: File encoding
+            fieldnames: Column order; defaults to every key in order of first
+                appearance when data is a list, or to the first row's keys for
+                other iterables (pass it explicitly if their rows differ)
             
         Returns:
             str: Path to the saved file
@@ -117,50 +206,95 @@ class ExportUtils:
             ValueError: If data is empty or invalid
             IOError: If file cannot be written
         """
-        if not data:
+        rows = iter(data)
+        first = next(rows, None)
+        if first is None:
             raise ValueError("No data to export")
+        # Columns taken from every row of a list cannot miss a key, so those
+        # rows skip DictWriter's per-row check for unexpected keys
+        all_keys = fieldnames is None and isinstance(data, list)
+        if fieldnames is None:
+            fieldnames = _column_names(data) if all_keys else list(first)
             
         try:
             # Ensure the output directory exists
             output_dir = os.path.dirname(output_path)
             if output_dir:
                 os.makedirs(output_dir, exist_ok=True)
-                
-            # Get all unique fieldnames from the data
-            fieldnames = set()
-            for item in data:
-                fieldnames.update(item.keys())
-            fieldnames = sorted(fieldnames)
             
             # Write data to CSV
-            with open(output_path, 'w', newline='', encoding=encoding) as csvfile:
-                writer = csv.DictWriter(
-                    csvfile, 
-                    fieldnames=fieldnames,
-                    delimiter=delimiter,
-                    quoting=csv.QUOTE_MINIMAL
-                )
-                writer.writeheader()
-                writer.writerows(data)
+            with open(output_path, 'w', newline='', encoding=encoding,
+                      buffering=_CSV_BUFFER_SIZE) as csvfile:
+                rows = chain((first,), rows)
+                if all_keys:
+                    writer = csv.writer(csvfile, delimiter=delimiter, quoting=csv.QUOTE_MINIMAL)
+                    writer.writerow(fieldnames)
+                    writer.writerows(map(row.get, fieldnames) for row in rows)
+                else:
+                    writer = csv.DictWriter(
+                        csvfile, 
+                        fieldnames=fieldnames,
+                        delimiter=delimiter,
+                        quoting=csv.QUOTE_MINIMAL
+                    )
+                    writer.writeheader()
+                    writer.writerows(rows)
                 
             return output_path
             
         except Exception as e:
             raise IOError(f"Failed to export to CSV: {str(e)}")
     
+    @staticmethod
+    def connect_sqlite(output_path: str) -> sqlite3.Connection:
+        """Open an SQLite export database configured for bulk writes.
+        
+        The connection runs in autocommit mode so writers manage their own
+        transactions; pass it to to_sqlite to write several tables to one
+        file without reopening it.
+        
+        Args:
+            output_path: Path of the SQLite database
+            
+        Returns:
+            sqlite3.Connection: The open connection; the caller closes it
+        """
+        # Ensure the output directory exists
+        output_dir = os.path.dirname(output_path)
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+        
+        conn = sqlite3.connect(output_path, isolation_level=None)
+        
+        # Skip fsyncs; keep the rollback journal in memory so a failed
+        # export can still be rolled back without touching the disk
+        conn.execute('PRAGMA journal_mode=MEMORY')
+        conn.execute('PRAGMA synchronous=OFF')
+        conn.execute('PRAGMA temp_store=MEMORY')
+        # Larger pages mean fewer B-tree pages per export (only takes
+        # effect when the database file is new)
+        conn.execute('PRAGMA page_size=65536')
+        return conn
+    
     @classmethod
     def to_sqlite(cls, 
-                 data: List[Dict[str, Any]], 
+                 data: Iterable[Dict[str, Any]], 
                  output_path: str,
                  table_name: str = 'exported_data',
-                 if_exists: str = 'replace') -> str:
+                 if_exists: str = 'replace',
+                 connection: Optional[sqlite3.Connection] = None) -> str:
         """Export data to an SQLite database.
         
+        Rows are inserted in batches, so data can be a generator. For
+        iterables other than lists, columns come from the first row.
+        
         Args:
-            data: List of dictionaries containing the data to export
+            data: Dictionaries containing the data to export
             output_path: Path to save the SQLite database
             table_name: Name of the table to create/update
             if_exists: What to do if table exists: 'fail', 'replace', or 'append'
+            connection: Open connection from connect_sqlite to write through
+                instead of opening output_path; it is left open
             
         Returns:
             str: Path to the saved database file
@@ -169,39 +303,55 @@ class ExportUtils:
             ValueError: If data is empty or invalid
             IOError: If file cannot be written
         """
-        if not data:
+        records = iter(data)
+        first = next(records, None)
+        if first is None:
             raise ValueError("No data to export")
             
         if if_exists not in ('fail', 'replace', 'append'):
             raise ValueError("if_exists must be one of: 'fail', 'replace', 'append'")
             
+        conn = connection
         try:
-            # Ensure the output directory exists
-            output_dir = os.path.dirname(output_path)
-            if output_dir:
-                os.makedirs(output_dir, exist_ok=True)
-            
-            # Create a connection to the SQLite database
-            conn = sqlite3.connect(output_path)
+            # Transactions are managed explicitly so the whole table is a
+            # single commit
+            if conn is None:
+                conn = cls.connect_sqlite(output_path)
             
-            # Create a DataFrame and save to SQLite
-            df = pd.DataFrame(data)
+            # Columns in order of first appearance; types come from the first row
+            columns = _column_names(data) if isinstance(data, list) else list(first)
+            table = _quote_identifier(table_name)
+            column_defs = ', '.join(
+                f"{_quote_identifier(column)} {_sqlite_type(first.get(column))}".rstrip()
+                for column in columns
+            )
             
-            # Convert datetime columns to strings for SQLite compatibility
-            for col in df.select_dtypes(include=['datetime64']).columns:
-                df[col] = df[col].astype(str)
+            conn.execute('BEGIN')
+            exists = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (table_name,)
+            ).fetchone()
+            if exists and if_exists == 'fail':
+                raise ValueError(f"Table '{table_name}' already exists.")
+            if exists and if_exists == 'replace':
+                conn.execute(f'DROP TABLE {table}')
+            conn.execute(f'CREATE TABLE IF NOT EXISTS {table} ({column_defs})')
             
-            # Export to SQLite
-            df.to_sql(
-                name=table_name,
-                con=conn,
-                if_exists=if_exists,
-                index=False
-            )
+            # Insert the rows batch by batch with one prepared statement
+            placeholders = ', '.join('?' * len(columns))
+            column_list = ', '.join(map(_quote_identifier, columns))
+            insert = f'INSERT INTO {table} ({column_list}) VALUES ({placeholders})'
+            records = chain((first,), records)
+            row_count = 0
+            while True:
+                batch = [[_sqlite_value(row.get(column)) for column in columns]
+                         for row in islice(records, _STREAM_BATCH_SIZE)]
+                if not batch:
+                    break
+                conn.executemany(insert, batch)
+                row_count += len(batch)
             
             # Add metadata table
-            cursor = conn.cursor()
-            cursor.execute('''
+            conn.execute('''
                 CREATE TABLE IF NOT EXISTS export_metadata (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
                     export_timestamp TEXT NOT NULL,
@@ -212,40 +362,129 @@ class ExportUtils:
             ''')
             
             # Record export metadata
-            cursor.execute('''
+            conn.execute('''
                 INSERT INTO export_metadata 
                 (export_timestamp, table_name, row_count, columns)
                 VALUES (?, ?, ?, ?)
             ''', (
                 datetime.now().isoformat(),
                 table_name,
-                len(df),
-                ','.join(df.columns)
+                row_count,
+                ','.join(columns)
             ))
             
-            # Commit changes and close connection
-            conn.commit()
-            conn.close()
+            # Commit changes and close the connection if we opened it
+            conn.execute('COMMIT')
+            if connection is None:
+                conn.close()
             
             return output_path
             
         except Exception as e:
-            if 'conn' in locals():
-                conn.close()
+            if conn is not None:
+                if conn.in_transaction:
+                    conn.execute('ROLLBACK')
+                if connection is None:
+                    conn.close()
             raise IOError(f"Failed to export to SQLite: {str(e)}")
     
+    @staticmethod
+    def to_feather(data: Iterable[Dict[str, Any]], output_path: str, compression: str = 'zstd') -> str:
+        """Export data to an Arrow Feather file (requires polars or pyarrow).
+        
+        Polars is used when installed, pyarrow otherwise. Both build whole
+        columns, so other iterables are read into a list first.
+        
+        Args:
+            data: Dictionaries containing the data to export
+            output_path: Path to save the Feather file
+            compression: Column compression ('zstd', 'lz4' or 'uncompressed')
+            
+        Returns:
+            str: Path to the saved file
+            
+        Raises:
+            ValueError: If data is empty or invalid
+            ImportError: If neither polars nor pyarrow is installed
+            IOError: If file cannot be written
+        """
+        if not isinstance(data, list):
+            data = list(data)
+        if not data:
+            raise ValueError("No data to export")
+        polars = _polars()
+        if polars is None:
+            from pyarrow import feather
+            
+        try:
+            # Ensure the output directory exists
+            output_dir = os.path.dirname(output_path)
+            if output_dir:
+                os.makedirs(output_dir, exist_ok=True)
+                
+            if polars is not None:
+                _to_polars_frame(polars, data).write_ipc(output_path, compression=compression)
+            else:
+                feather.write_feather(_to_arrow_table(data), output_path, compression=compression)
+            return output_path
+        except Exception as e:
+            raise IOError(f"Failed to export to Feather: {str(e)}")
+    
+    @staticmethod
+    def to_parquet(data: Iterable[Dict[str, Any]], output_path: str, compression: str = 'zstd') -> str:
+        """Export data to a Parquet file (requires polars or pyarrow).
+        
+        Polars is used when installed, pyarrow otherwise. Both build whole
+        columns, so other iterables are read into a list first.
+        
+        Args:
+            data: Dictionaries containing the data to export
+            output_path: Path to save the Parquet file
+            compression: Column compression codec (e.g. 'zstd', 'snappy')
+            
+        Returns:
+            str: Path to the saved file
+            
+        Raises:
+            ValueError: If data is empty or invalid
+            ImportError: If neither polars nor pyarrow is installed
+            IOError: If file cannot be written
+        """
+        if not isinstance(data, list):
+            data = list(data)
+        if not data:
+            raise ValueError("No data to export")
+        polars = _polars()
+        if polars is None:
+            from pyarrow import parquet
+            
+        try:
+            # Ensure the output directory exists
+            output_dir = os.path.dirname(output_path)
+            if output_dir:
+                os.makedirs(output_dir, exist_ok=True)
+                
+            if polars is not None:
+                _to_polars_frame(polars, data).write_parquet(output_path, compression=compression)
+            else:
+                parquet.write_table(_to_arrow_table(data), output_path, compression=compression)
+            return output_path
+        except Exception as e:
+            raise IOError(f"Failed to export to Parquet: {str(e)}")
+    
     @classmethod
     def export_data(cls, 
-                   data: List[Dict[str, Any]], 
+                   data: Iterable[Dict[str, Any]], 
                    output_path: str,
                    format: str = 'xlsx',
                    **kwargs) -> str:
         """Export data to the specified format.
         
         Args:
-            data: List of dictionaries containing the data to export
+            data: Dictionaries containing the data to export; a list, or any
+                iterable (such as a generator) to stream the rows
             output_path: Path to save the exported file
-            format: Export format ('xlsx', 'csv', or 'sqlite')
+            format: Export format ('xlsx', 'csv', 'sqlite', 'feather' or 'parquet')
             **kwargs: Additional arguments passed to the specific export method
             
         Returns:
@@ -255,19 +494,16 @@ class ExportUtils:
             ValueError: If format is not supported
         """
         format = format.lower()
+        writer = _FORMAT_WRITERS.get(format)
+        if writer is None:
+            raise ValueError(f"Unsupported export format: {format} "
+                             f"(expected one of: {', '.join(_FORMAT_WRITERS)})")
         
         # Ensure the output file has the correct extension
         if not output_path.lower().endswith(f'.{format}'):
             output_path = f"{os.path.splitext(output_path)[0]}.{format}"
         
-        if format == 'xlsx':
-            return cls.to_xlsx(data, output_path, **kwargs)
-        elif format == 'csv':
-            return cls.to_csv(data, output_path, **kwargs)
-        elif format == 'sqlite':
-            return cls.to_sqlite(data, output_path, **kwargs)
-        else:
-            raise ValueError(f"Unsupported export format: {format}")
+        return getattr(cls, writer)(data, output_path, **kwargs)
 
 
 # Example usage
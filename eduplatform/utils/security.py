@@ -1,33 +1,146 @@
 import hashlib
-import uuid
+import hmac
+import secrets
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from typing import Iterable, List
 
-def hash_password(password: str) -> tuple[str, str]:
-    """Hash a password with a randomly generated salt."""
+# scrypt CPU/memory cost (N); raise it as hardware gets faster. Stored
+# hashes record their own parameters, so older hashes keep verifying.
+DEFAULT_HASH_COST = 2 ** 15
+_HASH_SCHEME = 'scrypt'
+_SCRYPT_R = 8
+_SCRYPT_P = 1
+# hashlib.scrypt releases the GIL, so bulk hashing can use a few threads;
+# each concurrent hash needs about 32 MiB at the default cost
+_BULK_HASH_WORKERS = 4
+
+# The digest helpers take the password already UTF-8 encoded so bulk
+# verification can encode a candidate password once
+
+def _scrypt(password: bytes, salt: str, n: int, r: int, p: int) -> str:
+    """Derive the hex scrypt digest of a password."""
+    # scrypt needs 128 * r * n bytes; leave headroom over OpenSSL's 32 MiB default
+    return hashlib.scrypt(password, salt=salt.encode('utf-8'),
+                          n=n, r=r, p=p, maxmem=256 * r * n, dklen=32).hex()
+
+def _sha256_legacy(password: bytes, salt: str) -> str:
+    """Compute the hex digest used by pre-scrypt hashes, sha256(password + salt)."""
+    # Feeding the parts separately avoids building the concatenated string
+    digest = hashlib.sha256(password)
+    digest.update(salt.encode('utf-8'))
+    return digest.hexdigest()
+
+def _verify(hashed_password: str, salt: str, password: bytes) -> bool:
+    """Check an encoded password against a stored hash of any supported scheme."""
+    try:
+        scheme, _, rest = hashed_password.partition('$')
+        if scheme == _HASH_SCHEME:
+            *params, digest = rest.split('$')
+            n, r, p = (int(param.partition('=')[2]) for param in params)
+            return hmac.compare_digest(_scrypt(password, salt, n, r, p), digest)
+        return hmac.compare_digest(_sha256_legacy(password, salt), hashed_password)
+    except Exception:
+        return False
+
+def hash_password(password: str, cost: int = DEFAULT_HASH_COST) -> tuple[str, str]:
+    """Hash a password with a randomly generated salt.
+    
+    Args:
+        password: The plain-text password
+        cost: scrypt cost parameter N (a power of two)
+        
+    Returns:
+        Tuple of (hash, salt); the hash has the form
+        'scrypt$n=<cost>$r=8$p=1$<hex digest>'
+        
+    Raises:
+        ValueError: If the password is empty or hashing fails
+    """
     if not isinstance(password, str) or not password.strip():
         raise ValueError("Password must be a non-empty string")
     
     try:
-        salt = uuid.uuid4().hex
-        # Ensure consistent encoding
-        hashed = hashlib.sha256((password + salt).encode('utf-8')).hexdigest()
+        salt = secrets.token_hex(16)
+        digest = _scrypt(password.encode('utf-8'), salt, cost, _SCRYPT_R, _SCRYPT_P)
+        hashed = f"{_HASH_SCHEME}$n={cost}$r={_SCRYPT_R}$p={_SCRYPT_P}${digest}"
         return hashed, salt
     except Exception as e:
         raise ValueError(f"Failed to hash password: {str(e)}")
 
+def hash_passwords_bulk(passwords: Iterable[str], cost: int = DEFAULT_HASH_COST) -> List[tuple[str, str]]:
+    """Hash many passwords, e.g. when importing or seeding accounts.
+    
+    Args:
+        passwords: The plain-text passwords
+        cost: scrypt cost parameter N (a power of two)
+        
+    Returns:
+        List of (hash, salt) tuples in the same order as the passwords
+        
+    Raises:
+        ValueError: If any password is empty or hashing fails
+    """
+    passwords = list(passwords)
+    if len(passwords) < 2:
+        return [hash_password(password, cost) for password in passwords]
+    with ThreadPoolExecutor(min(_BULK_HASH_WORKERS, len(passwords))) as pool:
+        return list(pool.map(hash_password, passwords, [cost] * len(passwords)))
+
 def verify_password(hashed_password: str, salt: str, input_password: str) -> bool:
-    """Verify a password against its hash and salt."""
+    """Verify a password against its hash and salt.
+    
+    Hashes made before scrypt was introduced (plain salted SHA-256) are
+    still accepted so existing accounts can log in and be rehashed.
+    Digests are compared in constant time.
+    """
     if not all(isinstance(x, str) for x in [hashed_password, salt, input_password]):
         return False
     if not all(x.strip() for x in [hashed_password, salt, input_password]):
         return False
         
+    return _verify(hashed_password, salt, input_password.encode('utf-8'))
+
+def verify_password_bulk(stored: Iterable[tuple[str, str]], candidate: str) -> List[bool]:
+    """Check one candidate password against many stored hashes.
+    
+    Useful for migrations and audits (e.g. finding accounts that still use
+    a default password). The candidate is validated and encoded once.
+    
+    Args:
+        stored: (hash, salt) pairs as returned by hash_password
+        candidate: The plain-text password to check
+        
+    Returns:
+        List of booleans, one per stored pair, True where the candidate matches
+    """
+    stored = list(stored)
+    if not isinstance(candidate, str) or not candidate.strip():
+        return [False] * len(stored)
+    password = candidate.encode('utf-8')
+    return [
+        isinstance(hashed, str) and isinstance(salt, str) and bool(hashed.strip() and salt.strip())
+        and _verify(hashed, salt, password)
+        for hashed, salt in stored
+    ]
+
+def needs_rehash(hashed_password: str, cost: int = DEFAULT_HASH_COST) -> bool:
+    """Check whether a stored hash is weaker than the given work factor.
+    
+    Args:
+        hashed_password: The stored password hash
+        cost: The scrypt cost parameter N currently required
+        
+    Returns:
+        bool: True for legacy SHA-256 hashes and for scrypt hashes with a lower cost
+    """
+    scheme, _, rest = hashed_password.partition('$')
+    if scheme != _HASH_SCHEME:
+        return True
     try:
-        # Use consistent encoding
-        computed_hash = hashlib.sha256((input_password + salt).encode('utf-8')).hexdigest()
-        return computed_hash == hashed_password
-    except Exception:
-        return False
+        return int(rest.partition('$')[0].partition('=')[2]) < cost
+    except ValueError:
+        return True
 
 def get_current_iso_date() -> str:
     """Return current date in ISO format."""
@@ -5,10 +5,15 @@ setup(
     version="0.1.0",
     packages=find_packages(),
     install_requires=[
-        "pandas>=1.3.0",
         "openpyxl>=3.0.7",
         "PyJWT>=2.0.0",
     ],
+    extras_require={
+        # Feather and Parquet export need one of these; polars is used
+        # when both are installed
+        'arrow': ['pyarrow>=10.0.0'],
+        'polars': ['polars>=0.19.0'],
+    },
     entry_points={
         'console_scripts': [
             'eduplatform=eduplatform.cli.main:main',
@@ -0,0 +1,46 @@
+"""Unit tests for assignment_repository.py"""
+import unittest
+
+from eduplatform.models.assignment import Assignment
+from eduplatform.repositories.assignment_repository import AssignmentRepository
+
+
+class TestAssignmentRepository(unittest.TestCase):
+    """Test cases for AssignmentRepository class."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.repo = AssignmentRepository()
+        self.assignment = Assignment("Homework 1", "Chapter 1", "Math", "teacher1", "9-A")
+        self.assignment.publish()
+        self.submission_id = self.assignment.add_submission("student1", "My answers")
+        self.repo.add(self.assignment)
+
+    def test_find_submission(self):
+        """Test submissions are found by ID."""
+        assignment, submission = self.repo.find_submission(self.submission_id)
+        self.assertIs(assignment, self.assignment)
+        self.assertEqual(submission['student_id'], "student1")
+        self.assertIsNone(self.repo.find_submission("missing"))
+
+    def test_submission_index_follows_updates(self):
+        """Test updates add and drop indexed submissions."""
+        changed = self.assignment.copy()
+        del changed._submissions["student1"]
+        new_id = changed.add_submission("student2", "Other answers")
+        self.repo.update(changed)
+
+        self.assertIsNone(self.repo.find_submission(self.submission_id))
+        self.assertEqual(self.repo.get_student_submissions("student1"), {})
+        self.assertEqual(self.repo.find_submission(new_id)[1]['student_id'], "student2")
+        self.assertEqual(list(self.repo.get_student_submissions("student2")), [self.assignment.id])
+
+    def test_delete_drops_submissions(self):
+        """Test deleting an assignment drops its submissions."""
+        self.repo.delete(self.assignment.id)
+        self.assertIsNone(self.repo.find_submission(self.submission_id))
+        self.assertEqual(self.repo.get_student_submissions("student1"), {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+"""Unit tests for notification_repository.py"""
+import unittest
+from datetime import datetime, timedelta
+
+from eduplatform.models.notification import Notification, NotificationType
+from eduplatform.repositories.notification_repository import NotificationRepository
+
+
+class TestNotificationRepository(unittest.TestCase):
+    """Test cases for NotificationRepository class."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.repo = NotificationRepository()
+        self.notifications = []
+        start = datetime(2024, 1, 1, 9, 0)
+        for i in range(5):
+            notification = Notification(
+                recipient_id="student1",
+                title=f"Notification {i}",
+                message="Test message",
+                notification_type=NotificationType.GRADE
+            )
+            notification._created_at = start + timedelta(minutes=i)
+            self.notifications.append(notification)
+        self.repo.bulk_add(self.notifications)
+    
+    def _actual_unread(self, user_id):
+        return sum(not n.is_read for n in self.repo.get_user_notifications(user_id))
+    
+    def test_unread_count_follows_direct_model_changes(self):
+        """Test the unread count stays right when notifications are (un)read directly."""
+        self.notifications[0].mark_as_read()
+        self.notifications[1].mark_as_read()
+        self.notifications[1].mark_as_read()  # Already read: no change
+        self.notifications[1].mark_as_unread()
+        self.notifications[2].mark_as_unread()  # Already unread: no change
+        
+        self.assertEqual(self._actual_unread("student1"), 4)
+        self.assertEqual(self.repo.get_unread_count("student1"), 4)
+    
+    def test_unread_count_through_repository(self):
+        """Test mark_as_read and mark_all_as_read keep the unread count right."""
+        self.assertTrue(self.repo.mark_as_read(self.notifications[0].id))
+        self.assertEqual(self.repo.get_unread_count("student1"), 4)
+        
+        self.assertEqual(self.repo.mark_all_as_read("student1"), 4)
+        self.assertEqual(self.repo.get_unread_count("student1"), 0)
+        
+        self.notifications[3].mark_as_unread()
+        self.assertEqual(self.repo.get_unread_count("student1"), 1)
+    
+    def test_deleted_notification_no_longer_counted(self):
+        """Test changes to a deleted notification don't touch the unread count."""
+        removed = self.notifications[0]
+        self.assertTrue(self.repo.delete(removed.id))
+        self.assertEqual(self.repo.get_unread_count("student1"), 4)
+        
+        removed.mark_as_read()
+        removed.mark_as_unread()
+        self.assertEqual(self.repo.get_unread_count("student1"), 4)
+
+    
+    def test_iter_user_notifications_newest_first(self):
+        """Test a user's notifications are iterated newest first, unread filter applied."""
+        other = self.repo.create_notification(
+            recipient_id="student2",
+            title="Other",
+            message="Test message",
+            notification_type=NotificationType.GRADE
+        )
+        self.notifications[4].mark_as_read()
+        
+        listed = list(self.repo.iter_user_notifications("student1"))
+        self.assertListEqual(listed, self.notifications[::-1])
+        self.assertNotIn(other, listed)
+        
+        unread = list(self.repo.iter_user_notifications("student1", unread_only=True))
+        self.assertListEqual(unread, self.notifications[3::-1])
+        self.assertListEqual(list(self.repo.iter_user_notifications("nobody")), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+"""Unit tests for user_repository.py"""
+import unittest
+
+from eduplatform.models.student import Student
+from eduplatform.models.teacher import Teacher
+from eduplatform.models.user import UserRole
+from eduplatform.repositories.user_repository import UserRepository
+
+
+class TestUserRepository(unittest.TestCase):
+    """Test cases for UserRepository class."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.repo = UserRepository()
+        self.student = Student("Alice Smith", "Alice@Example.com", "Password123!", '9-A')
+        self.teacher = Teacher("Bob Jones", "bob@example.com", "Password123!")
+        self.repo.add(self.student)
+        self.repo.add(self.teacher)
+
+    def test_add_indexes_user(self):
+        """Test added users are found through every index."""
+        self.assertIs(self.repo.get_by_email("alice@example.com"), self.student)
+        self.assertTrue(self.repo.email_exists("ALICE@example.com"))
+        self.assertEqual(self.repo.get_students(), [self.student])
+        self.assertEqual(self.repo.get_by_role('teacher'), [self.teacher])
+        self.assertEqual(self.repo.get_students_by_class('9-A'), [self.student])
+
+    def test_update_reindexes_user(self):
+        """Test an update moves the user to their new index entries."""
+        self.student._email = "alice.smith@example.com"
+        self.student._grade = '10-B'
+        self.student._full_name = "Alice Walker"
+        self.repo.update(self.student)
+
+        self.assertIsNone(self.repo.get_by_email("alice@example.com"))
+        self.assertIs(self.repo.get_by_email("alice.smith@example.com"), self.student)
+        self.assertEqual(self.repo.get_students_by_class('9-A'), [])
+        self.assertEqual(self.repo.get_students_by_class('10-B'), [self.student])
+        self.assertEqual(self.repo.search_users("smith"), [self.student])
+        self.assertEqual(self.repo.search_users("walker"), [self.student])
+
+    def test_delete_unindexes_user(self):
+        """Test a deleted user is gone from every index."""
+        self.repo.delete(self.student._id)
+
+        self.assertIsNone(self.repo.get_by_email("alice@example.com"))
+        self.assertFalse(self.repo.email_exists("alice@example.com"))
+        self.assertEqual(self.repo.get_students(), [])
+        self.assertEqual(self.repo.get_students_by_class('9-A'), [])
+        self.assertEqual(self.repo.search_users("alice"), [])
+
+    def test_bulk_add_is_atomic(self):
+        """Test bulk_add adds nothing when any key already exists."""
+        new_student = Student("Carol White", "carol@example.com", "Password123!", '9-A')
+
+        with self.assertRaises(ValueError):
+            self.repo.bulk_add([new_student, self.teacher])
+
+        self.assertIsNone(self.repo.get(new_student._id))
+        self.assertIsNone(self.repo.get_by_email("carol@example.com"))
+        self.assertEqual(self.repo.get_students_by_class('9-A'), [self.student])
+
+        self.repo.bulk_add([new_student])
+        self.assertEqual(self.repo.get_students_by_class('9-A'), [self.student, new_student])
+
+    def test_search_users(self):
+        """Test search matches names and emails, ignoring case and filtered by role."""
+        self.assertEqual(self.repo.search_users("ALICE"), [self.student])
+        self.assertEqual(self.repo.search_users("example.com"), [self.student, self.teacher])
+        self.assertEqual(self.repo.search_users("example.com", role=UserRole.TEACHER), [self.teacher])
+        # A query can't match across the name and the email
+        self.assertEqual(self.repo.search_users("jonesbob"), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
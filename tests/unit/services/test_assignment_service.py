@@ -0,0 +1,157 @@
+"""Unit tests for assignment_service.py"""
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+from eduplatform.models.student import Student
+from eduplatform.models.teacher import Teacher
+from eduplatform.repositories.assignment_repository import AssignmentRepository
+from eduplatform.repositories.grade_repository import GradeRepository
+from eduplatform.repositories.notification_repository import NotificationRepository
+from eduplatform.repositories.user_repository import UserRepository
+from eduplatform.services.assignment_service import AssignmentService
+
+
+class TestAssignmentService(unittest.TestCase):
+    """Test cases for AssignmentService class."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.user_repo = UserRepository()
+        self.notification_repo = NotificationRepository()
+        self.teacher = Teacher("Test Teacher", "teacher@example.com", "Password123!")
+        self.students = [
+            Student(f"Student {i}", f"student{i}@example.com", "Password123!", '9-A')
+            for i in range(3)
+        ]
+        self.user_repo.bulk_add([self.teacher, *self.students])
+
+        self.assignment_repo = AssignmentRepository()
+        self.service = AssignmentService(
+            self.assignment_repo,
+            GradeRepository(),
+            self.user_repo,
+            self.notification_repo
+        )
+        self.addCleanup(self.service.close)
+
+    def _create_assignment(self):
+        return self.service.create_assignment(
+            self.teacher._id, "Homework 1", "Chapter 1 exercises", "Math", '9-A',
+            datetime.now() + timedelta(days=2)
+        )
+
+    def test_flush_notifications(self):
+        """Test queued notifications are stored once flushed."""
+        assignment = self._create_assignment()
+        self.service.flush_notifications()
+
+        for student in self.students:
+            notifications = self.notification_repo.get_user_notifications(student._id)
+            self.assertEqual(len(notifications), 1)
+            self.assertEqual(notifications[0]._related_entity_id, assignment.id)
+            self.assertEqual(self.notification_repo.get_unread_count(student._id), 1)
+
+    def _race_next_update(self, concurrent_change):
+        """Patch the repository so another writer saves just before the next update."""
+        real_update = self.assignment_repo.update
+        raced = []
+
+        def racing_update(item, expected_version=None):
+            if not raced:
+                raced.append(item._id)
+                other = self.assignment_repo.get(item._id).copy()
+                concurrent_change(other)
+                real_update(other)
+            return real_update(item, expected_version=expected_version)
+
+        return patch.object(self.assignment_repo, 'update', side_effect=racing_update)
+
+    def test_submit_retries_after_conflict(self):
+        """Test a submission that loses a race is re-applied to the new version."""
+        assignment = self._create_assignment()
+        first, second = self.students[0]._id, self.students[1]._id
+
+        with self._race_next_update(lambda other: other.add_submission(second, "Other answers")):
+            self.service.submit_assignment(first, assignment.id, "My answers")
+
+        stored = self.assignment_repo.get(assignment.id)
+        self.assertEqual(set(stored._submissions), {first, second})
+        self.assertEqual(stored._version, 2)
+        # The original object was never changed in place
+        self.assertEqual(assignment._submissions, {})
+
+    def test_grade_retries_after_conflict(self):
+        """Test a grade that loses a race is counted once."""
+        assignment = self._create_assignment()
+        first, second = self.students[0]._id, self.students[1]._id
+        submission_id = self.service.submit_assignment(first, assignment.id, "My answers")['submission_id']
+
+        with self._race_next_update(lambda other: other.add_submission(second, "Other answers")):
+            self.service.grade_assignment(self.teacher._id, submission_id, 80)
+
+        stored = self.assignment_repo.get(assignment.id)
+        self.assertEqual(stored._graded_submissions, 1)
+        self.assertEqual(stored._grade_total, 80)
+        self.assertEqual(stored.get_submission(first)['grade'], 80)
+        self.assertEqual(stored.get_submission(second)['status'], 'submitted')
+
+    def test_sees_submissions_saved_outside_service(self):
+        """Test submissions saved straight to the repository are found."""
+        assignment = self._create_assignment()
+        student_id = self.students[0]._id
+        # Look the student up once so any cached state would be stale
+        self.assertEqual(self.service.get_student_assignments(student_id, status='submitted'), [])
+
+        changed = self.assignment_repo.get(assignment.id).copy()
+        submission_id = changed.add_submission(student_id, "My answers")
+        self.assignment_repo.update(changed)
+
+        rows = self.service.get_student_assignments(student_id, status='submitted')
+        self.assertEqual([row.id for row in rows], [assignment.id])
+        self.service.grade_assignment(self.teacher._id, submission_id, 90)
+        rows = self.service.get_student_assignments(student_id, status='graded')
+        self.assertEqual(rows[0].submission['grade'], 90)
+
+    def test_regrade_counts_once(self):
+        """Test grading a submission again keeps it counted once."""
+        assignment = self._create_assignment()
+        student_id = self.students[0]._id
+        submission_id = self.service.submit_assignment(student_id, assignment.id, "My answers")['submission_id']
+
+        self.service.grade_assignment(self.teacher._id, submission_id, 60)
+        self.service.grade_assignment(self.teacher._id, submission_id, 90)
+
+        stored = self.assignment_repo.get(assignment.id)
+        self.assertEqual(stored._graded_submissions, 1)
+        self.assertEqual(stored._grade_total, 90)
+        self.assertEqual(stored._status, 'graded')
+
+    def test_grade_total_matches_model_grading(self):
+        """Test the model clamps grades before adding them to the total."""
+        assignment = self._create_assignment()
+        student_id = self.students[0]._id
+        self.service.submit_assignment(student_id, assignment.id, "My answers")
+        stored = self.assignment_repo.get(assignment.id).copy()
+
+        stored.grade_submission(student_id, 150)
+        self.assertEqual(stored.get_submission(student_id)['grade'], 100.0)
+        self.assertEqual(stored._grade_total, 100.0)
+        stored.grade_submission(student_id, 70)
+        self.assertEqual(stored._grade_total, 70.0)
+        self.assertEqual(stored._graded_submissions, 1)
+
+    def test_close(self):
+        """Test close() stores queued notifications and rejects new work."""
+        self._create_assignment()
+        self.service.close()
+
+        self.assertEqual(self.notification_repo.get_unread_count(self.students[0]._id), 1)
+        with self.assertRaises(RuntimeError):
+            self._create_assignment()
+        # Closing twice is harmless
+        self.service.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
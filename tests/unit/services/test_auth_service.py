@@ -0,0 +1,54 @@
+"""Unit tests for auth_service.py"""
+import time
+import unittest
+from unittest.mock import patch
+
+from eduplatform.models.teacher import Teacher
+from eduplatform.repositories.notification_repository import NotificationRepository
+from eduplatform.repositories.user_repository import UserRepository
+from eduplatform.services import auth_service
+from eduplatform.services.auth_service import AuthService
+
+
+class TestVerifyToken(unittest.TestCase):
+    """Test cases for AuthService.verify_token."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.service = AuthService(UserRepository(), NotificationRepository(), jwt_secret='test-secret-key-of-at-least-32-bytes')
+        self.teacher = Teacher("Test Teacher", "teacher@example.com", "Password123!")
+        self.token = self.service._generate_token(self.teacher)
+
+    def test_returns_a_copy(self):
+        """Test changing a returned payload doesn't affect later calls."""
+        payload = self.service.verify_token(self.token)
+        payload['role'] = 'admin'
+
+        self.assertEqual(self.service.verify_token(self.token)['role'], 'teacher')
+
+    def test_cached_token_expires(self):
+        """Test a cached token is rejected once it expires."""
+        payload = self.service.verify_token(self.token)
+
+        with patch.object(auth_service.time, 'time', return_value=payload['exp'] + 1):
+            self.assertIsNone(self.service.verify_token(self.token))
+
+    def test_cache_entries_are_time_bounded(self):
+        """Test a cached token is decoded again after the cache TTL."""
+        self.service.verify_token(self.token)
+
+        later = time.time() + auth_service._TOKEN_CACHE_TTL + 1
+        with patch.object(self.service, '_decode_token', wraps=self.service._decode_token) as decode, \
+                patch.object(auth_service.time, 'time', return_value=later):
+            self.service.verify_token(self.token)
+            self.service.verify_token(self.token)
+        self.assertEqual(decode.call_count, 1)
+
+    def test_invalid_token_not_cached(self):
+        """Test invalid tokens are rejected without being cached."""
+        self.assertIsNone(self.service.verify_token('not-a-token'))
+        self.assertNotIn('not-a-token', self.service._token_cache)
+
+
+if __name__ == '__main__':
+    unittest.main()
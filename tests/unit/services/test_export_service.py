@@ -1,12 +1,21 @@
 """Unit tests for export_service.py"""
+import csv
+import importlib.util
+import json
 import os
+import shutil
+import sqlite3
 import tempfile
 import unittest
 from unittest.mock import MagicMock, patch
 
+from eduplatform.services.assignment_service import StudentAssignmentRow
 from eduplatform.services.export_service import ExportService
-from eduplatform.models.user import Student, Teacher, Admin, Parent
-from eduplatform.models.assignment import Assignment
+from eduplatform.models.student import Student
+from eduplatform.models.teacher import Teacher
+from eduplatform.models.admin import Admin
+from eduplatform.models.parent import Parent
+from eduplatform.models.assignment import Assignment, AssignmentDifficulty
 from eduplatform.models.grade import Grade, GradeType
 from eduplatform.models.notification import Notification, NotificationType
 
@@ -14,98 +23,106 @@ from eduplatform.models.notification import Notification, NotificationType
 class TestExportService(unittest.TestCase):
     """Test cases for ExportService class."""
     
-    def setUp(self):
-        """Set up test fixtures."""
-        # Create mock services
-        self.mock_auth_service = MagicMock()
-        self.mock_assignment_service = MagicMock()
-        self.mock_grade_service = MagicMock()
+    @classmethod
+    def setUpClass(cls):
+        """Set up fixtures shared by every test."""
+        # Create mock services once; setUp resets them between tests
+        cls.mock_auth_service = MagicMock()
+        cls.mock_assignment_service = MagicMock()
+        cls.mock_grade_service = MagicMock()
         
         # Initialize service with mock dependencies
-        self.service = ExportService(
-            auth_service=self.mock_auth_service,
-            assignment_service=self.mock_assignment_service,
-            grade_service=self.mock_grade_service
+        cls.service = ExportService(
+            auth_service=cls.mock_auth_service,
+            assignment_service=cls.mock_assignment_service,
+            grade_service=cls.mock_grade_service
         )
         
-        # Set up test data
-        self.test_student = Student(
-            user_id="student1",
-            full_name="Test Student",
-            email="student@example.com",
-            password_hash="hashed_password",
-            role="student",
-            grade=10,
-            subjects={"Math", "Science"}
-        )
+        # Set up test data (never modified by the tests)
+        cls.test_student = Student("Test Student", "student@example.com", "Password123!", "class1")
+        cls.test_student.enroll_in_subject("Math", "teacher1")
         
-        self.test_teacher = Teacher(
-            user_id="teacher1",
-            full_name="Test Teacher",
-            email="teacher@example.com",
-            password_hash="hashed_password",
-            role="teacher",
-            subjects={"Math"},
-            is_homeroom_teacher=True
-        )
+        cls.test_teacher = Teacher("Test Teacher", "teacher@example.com", "Password123!")
         
-        self.test_admin = Admin(
-            user_id="admin1",
-            full_name="Test Admin",
-            email="admin@example.com",
-            password_hash="hashed_password",
-            role="admin"
-        )
+        cls.test_admin = Admin("Test Admin", "admin@example.com", "Password123!")
         
-        self.test_assignment = Assignment(
-            assignment_id="assign1",
+        cls.test_parent = Parent("Test Parent", "parent@example.com", "Password123!")
+        
+        cls.test_assignment = Assignment(
             title="Test Assignment",
             description="Test Description",
             subject="Math",
             teacher_id="teacher1",
             class_id="class1",
             max_points=100,
-            difficulty="medium"
+            difficulty=AssignmentDifficulty.MEDIUM
         )
         
-        self.test_grade = Grade(
-            grade_id="grade1",
+        cls.test_grade = Grade(
             student_id="student1",
-            assignment_id="assign1",
-            teacher_id="teacher1",
             subject="Math",
+            grade_type=GradeType.ASSIGNMENT,
             score=85,
             max_score=100,
-            type=GradeType.ASSIGNMENT,
+            assignment_id=cls.test_assignment.id,
+            teacher_id="teacher1",
             comments="Good job!"
         )
         
-        self.test_notification = Notification(
-            notification_id="notif1",
-            user_id="student1",
+        cls.test_notification = Notification(
+            recipient_id="student1",
             title="Test Notification",
             message="This is a test notification",
-            notification_type=NotificationType.ASSIGNMENT_GRADED,
-            related_entity_id="assign1",
+            notification_type=NotificationType.GRADE,
+            related_entity_id=cls.test_assignment.id,
             related_entity_type="assignment"
         )
         
+        cls.test_assignment_row = StudentAssignmentRow(
+            id=cls.test_assignment.id,
+            title="Test Assignment",
+            subject="Math",
+            due_date=cls.test_assignment._due_date_iso,
+            status="submitted",
+            submission=None,
+            max_points=100.0,
+            difficulty="medium",
+            description="Test Description",
+            teacher_id="teacher1",
+            class_id="class1"
+        )
+        
+        # Lookup tables and result lists the mocks hand back
+        cls._user_table = {
+            "student1": cls.test_student,
+            "teacher1": cls.test_teacher,
+            "admin1": cls.test_admin
+        }
+        cls._all_users = [cls.test_student, cls.test_teacher, cls.test_admin, cls.test_parent]
+        cls._assignments = [cls.test_assignment]
+    
+    @classmethod
+    def tearDownClass(cls):
+        """Stop the shared service's export worker threads."""
+        cls.service.close()
+    
+    def setUp(self):
+        """Reset the mocks and create a fresh temp directory."""
+        for mock in (self.mock_auth_service, self.mock_assignment_service, self.mock_grade_service):
+            mock.reset_mock(return_value=True, side_effect=True)
+        
         # Configure mocks
-        self.mock_auth_service.user_repo.get.side_effect = lambda x: {
-            "student1": self.test_student,
-            "teacher1": self.test_teacher,
-            "admin1": self.test_admin
-        }.get(x)
+        self.mock_auth_service.user_repo.get.side_effect = self._user_table.get
         
         self.mock_assignment_service.get_student_assignments.return_value = [
-            {"id": "assign1", "title": "Test Assignment", "status": "submitted"}
+            self.test_assignment_row
         ]
         
         self.mock_grade_service.get_student_grades.return_value = [
             {"id": "grade1", "subject": "Math", "score": 85, "max_score": 100}
         ]
         
-        self.mock_auth_service.notification_repo.get_user_notifications.return_value = [
+        self.mock_auth_service.notification_repo.iter_user_notifications.return_value = [
             self.test_notification
         ]
         
@@ -115,10 +132,7 @@ class TestExportService(unittest.TestCase):
     def tearDown(self):
         """Clean up after tests."""
         # Clean up any created files
-        for root, _, files in os.walk(self.temp_dir, topdown=False):
-            for name in files:
-                os.remove(os.path.join(root, name))
-            os.rmdir(root)
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
     
     def test_export_user_data(self):
         """Test exporting user data."""
@@ -141,11 +155,55 @@ class TestExportService(unittest.TestCase):
             if file_path and os.path.exists(file_path):
                 self.assertTrue(os.path.isfile(file_path))
     
+    def test_export_user_assignments(self):
+        """Test the student's assignment rows are exported."""
+        result = self.service.export_user_data(
+            user_id="student1",
+            output_dir=self.temp_dir,
+            format='csv'
+        )
+        
+        with open(result['assignments'], newline='') as csvfile:
+            rows = list(csv.DictReader(csvfile))
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]['id'], self.test_assignment.id)
+        self.assertEqual(rows[0]['status'], 'submitted')
+    
+    def test_export_user_data_sqlite(self):
+        """Test a SQLite export writes one database with a table per dataset."""
+        result = self.service.export_user_data(
+            user_id="student1",
+            output_dir=self.temp_dir,
+            format='sqlite'
+        )
+        
+        manifest_path = result.pop('manifest')
+        self.assertEqual(len(set(result.values())), 1)
+        database = result['assignments']
+        self.assertTrue(database.endswith('.sqlite'))
+        
+        with open(manifest_path) as manifest_file:
+            tables = json.load(manifest_file)['export']['tables']
+        self.assertEqual(set(tables), set(result))
+        
+        conn = sqlite3.connect(database)
+        try:
+            for data_type, table_name in tables.items():
+                count = conn.execute(f"SELECT COUNT(*) FROM {table_name}").fetchone()[0]
+                self.assertEqual(count, 1, data_type)
+            title = conn.execute(f"SELECT title FROM {tables['assignments']}").fetchone()[0]
+        finally:
+            conn.close()
+        self.assertEqual(title, "Test Assignment")
+    
     def test_export_class_data(self):
         """Test exporting class data."""
         # Configure mocks for class data
-        self.mock_auth_service.user_repo.get_users_by_role.return_value = [self.test_student]
-        self.mock_assignment_service.get_assignments_by_class.return_value = [self.test_assignment]
+        self.mock_auth_service.user_repo.get_all.return_value = self._all_users
+        self.mock_assignment_service.get_assignments_by_class.return_value = self._assignments
+        self.mock_grade_service.get_grades_for_students.return_value = [
+            {**self.test_grade.to_dict(), 'student_id': self.test_student._id}
+        ]
         
         # Test
         result = self.service.export_class_data(
@@ -168,14 +226,12 @@ class TestExportService(unittest.TestCase):
     def test_export_school_data(self):
         """Test exporting all school data."""
         # Configure mocks for school data
-        self.mock_auth_service.user_repo.get_all.return_value = [
-            self.test_student, 
-            self.test_teacher, 
-            self.test_admin
+        self.mock_auth_service.user_repo.get_all.return_value = self._all_users
+        self.mock_assignment_service.get_all_assignments.return_value = self._assignments
+        self.mock_grade_service.get_all_grades.return_value = [
+            {"id": "grade1", "student_id": "student1", "subject": "Math", "score": 85, "max_score": 100}
         ]
         
-        self.mock_assignment_service.get_all_assignments.return_value = [self.test_assignment]
-        
         # Test
         result = self.service.export_school_data(
             output_dir=self.temp_dir,
@@ -196,14 +252,10 @@ class TestExportService(unittest.TestCase):
             if file_path and os.path.exists(file_path):
                 self.assertTrue(os.path.isfile(file_path))
     
-    @patch('eduplatform.services.export_service.datetime')
-    def test_export_with_timestamp(self, mock_datetime):
+    @unittest.skipUnless(importlib.util.find_spec('openpyxl'), "openpyxl is not installed")
+    @patch.object(ExportService, '_now_strftime', return_value='20230101_120000')
+    def test_export_with_timestamp(self, mock_now_strftime):
         """Test that exports include timestamps in filenames."""
-        # Mock datetime to return a fixed value
-        from datetime import datetime
-        fixed_time = datetime(2023, 1, 1, 12, 0, 0)
-        mock_datetime.now.return_value = fixed_time
-        
         # Test
         result = self.service.export_user_data(
             user_id="student1",
@@ -212,8 +264,7 @@ class TestExportService(unittest.TestCase):
         )
         
         # Verify timestamp is in the path
-        timestamp = fixed_time.strftime("%Y%m%d_%H%M%S")
-        self.assertIn(timestamp, result['manifest'])
+        self.assertIn('20230101_120000', result['manifest'])
 
 
 if __name__ == '__main__':
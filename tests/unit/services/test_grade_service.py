@@ -0,0 +1,91 @@
+"""Unit tests for grade_service.py"""
+import unittest
+from datetime import datetime
+from unittest.mock import patch
+
+from eduplatform.models.grade import GradeType
+from eduplatform.models.student import Student
+from eduplatform.models.teacher import Teacher
+from eduplatform.repositories.assignment_repository import AssignmentRepository
+from eduplatform.repositories.grade_repository import GradeRepository
+from eduplatform.repositories.notification_repository import NotificationRepository
+from eduplatform.repositories.user_repository import UserRepository
+from eduplatform.services.assignment_service import AssignmentService
+from eduplatform.services.grade_service import GradeService
+
+
+class TestGradeService(unittest.TestCase):
+    """Test cases for GradeService class."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.user_repo = UserRepository()
+        self.notification_repo = NotificationRepository()
+        self.grade_repo = GradeRepository()
+        self.teacher = Teacher("Test Teacher", "teacher@example.com", "Password123!")
+        self.students = [
+            Student(f"Student {i}", f"student{i}@example.com", "Password123!", '9-A')
+            for i in range(3)
+        ]
+        self.user_repo.bulk_add([self.teacher, *self.students])
+
+        self.service = GradeService(self.grade_repo, self.user_repo, self.notification_repo)
+        self.addCleanup(self.service.close)
+
+    def test_flush_notifications(self):
+        """Test every recorded grade notifies its student once flushed."""
+        self.service.record_grade(
+            self.students[0]._id, "Math", GradeType.EXAM, 90, self.teacher._id)
+        self.service.record_grades_bulk(
+            dict(student_id=student._id, subject="Math", grade_type=GradeType.QUIZ,
+                 score=80, teacher_id=self.teacher._id)
+            for student in self.students
+        )
+        self.service.flush_notifications()
+
+        self.assertEqual(len(self.notification_repo.get_user_notifications(self.students[0]._id)), 2)
+        for student in self.students[1:]:
+            notifications = self.notification_repo.get_user_notifications(student._id)
+            self.assertEqual(len(notifications), 1)
+            self.assertEqual(notifications[0]._related_entity_type, 'grade')
+            self.assertEqual(self.notification_repo.get_unread_count(student._id), 1)
+
+    def test_shares_worker_with_assignment_service(self):
+        """Test services on one notification repository share its worker."""
+        assignment_service = AssignmentService(
+            AssignmentRepository(), self.grade_repo, self.user_repo, self.notification_repo)
+        self.addCleanup(assignment_service.close)
+
+        self.assertIs(assignment_service._notifier, self.service._notifier)
+
+    def test_report_card_copies(self):
+        """Test cached report cards are copied and stamped on every call."""
+        student_id = self.students[0]._id
+        self.service.record_grade(student_id, "Math", GradeType.EXAM, 90, self.teacher._id)
+
+        first = self.service.generate_report_card(student_id)
+        first['gpa'] = 0.0
+        with patch('eduplatform.services.grade_service.datetime') as mock_datetime:
+            mock_datetime.now.return_value = datetime(2030, 1, 1)
+            second = self.service.generate_report_card(student_id)
+
+        self.assertIsNot(first, second)
+        self.assertEqual(second['gpa'], 4.0)
+        self.assertEqual(second['letter_grade'], 'A')
+        self.assertEqual(second['generated_at'], '2030-01-01T00:00:00')
+
+    def test_close(self):
+        """Test close() stores queued notifications and rejects new grades."""
+        self.service.record_grade(
+            self.students[0]._id, "Math", GradeType.EXAM, 90, self.teacher._id)
+        self.service.close()
+
+        self.assertEqual(self.notification_repo.get_unread_count(self.students[0]._id), 1)
+        with self.assertRaises(RuntimeError):
+            self.service.record_grade(
+                self.students[0]._id, "Math", GradeType.EXAM, 90, self.teacher._id)
+        self.assertEqual(len(self.grade_repo.get_all()), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+"""Unit tests for security.py"""
+import hashlib
+import unittest
+
+from eduplatform.utils.security import (
+    DEFAULT_HASH_COST,
+    hash_password,
+    hash_passwords_bulk,
+    needs_rehash,
+    verify_password,
+    verify_password_bulk,
+)
+
+# A low scrypt cost keeps the tests fast
+_TEST_COST = 2 ** 10
+
+
+class TestSecurity(unittest.TestCase):
+    """Test cases for the password hashing helpers."""
+
+    def test_hash_round_trip(self):
+        """Test a hashed password verifies and a wrong one doesn't."""
+        hashed, salt = hash_password("Password123!", cost=_TEST_COST)
+
+        self.assertTrue(hashed.startswith(f"scrypt$n={_TEST_COST}$"))
+        self.assertTrue(verify_password(hashed, salt, "Password123!"))
+        self.assertFalse(verify_password(hashed, salt, "password123!"))
+
+    def test_bulk_round_trip(self):
+        """Test bulk hashing and verification agree with the single versions."""
+        stored = hash_passwords_bulk(["first", "second", "first"], cost=_TEST_COST)
+
+        self.assertEqual(verify_password_bulk(stored, "first"), [True, False, True])
+        self.assertEqual(len({salt for _, salt in stored}), 3)
+
+    def test_verify_legacy_sha256(self):
+        """Test salted SHA-256 hashes from before scrypt still verify."""
+        salt = "0123456789abcdef"
+        legacy = hashlib.sha256(("Password123!" + salt).encode('utf-8')).hexdigest()
+
+        self.assertTrue(verify_password(legacy, salt, "Password123!"))
+        self.assertFalse(verify_password(legacy, salt, "wrong"))
+        self.assertTrue(needs_rehash(legacy))
+
+    def test_needs_rehash(self):
+        """Test only hashes below the required cost need rehashing."""
+        hashed, _ = hash_password("Password123!", cost=_TEST_COST)
+
+        self.assertFalse(needs_rehash(hashed, cost=_TEST_COST))
+        self.assertTrue(needs_rehash(hashed, cost=DEFAULT_HASH_COST))
+
+    def test_invalid_input(self):
+        """Test empty passwords are rejected."""
+        with self.assertRaises(ValueError):
+            hash_password("  ")
+        self.assertFalse(verify_password("", "salt", "Password123!"))
+
+
+if __name__ == '__main__':
+    unittest.main()